@@ -0,0 +1,226 @@
+import csv
+import datetime
+import glob
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from empatica import NativeEdaEngine, ReportWriter, Subjects, TimingsIndex, synthetic
+from empatica.acc_reader import AccReader
+from empatica.eda_reader import EdaReader
+from empatica.empatica_reader import EmpaticaReader
+from empatica.enums import ActivityType, DataType
+from empatica.hr_bpm_reader import HrBpmReader
+from empatica.hr_ibi_reader import HrIbiReader
+
+duration_in_hours = 8
+n_subjects = 4
+n_dates = 2
+eda_segment_width = 600  # in second, None for a single segment
+n_repeats = 3
+
+
+class _CsvOnlyReader(EmpaticaReader):
+    """Minimal reader that only exercises the csv loading engine"""
+
+    use_raw_cache = False
+
+    def extra_labels(self) -> tuple[str, ...]:
+        return ("",)
+
+    def _table_columns(self) -> str:
+        return ""
+
+    def _print_table_header(self, report: ReportWriter) -> None:
+        pass
+
+    def get_table_value(self, activity_type: ActivityType = ActivityType.All, **options) -> tuple:
+        return ()
+
+    def print_table(
+        self,
+        activity_type: ActivityType = ActivityType.All,
+        values: tuple = None,
+        report: ReportWriter = None,
+        **options,
+    ) -> None:
+        pass
+
+
+class _CachedCsvOnlyReader(_CsvOnlyReader):
+    use_raw_cache = True
+
+
+class _LegacyCsvOnlyReader(_CsvOnlyReader):
+    """Row by row loader with a list of datetime, as it was before the bulk loading engine, kept as a reference"""
+
+    def _read_csv_data(self) -> tuple[np.ndarray, np.ndarray]:
+        daytime_data = []
+        t_data = []
+        data = []
+        with open(self.path) as file:
+            read = csv.reader(file, delimiter="\n")
+            for row in read:
+                if not row:
+                    continue
+                if self.initial_t is None and self._has_initial_time_stamp:
+                    self.initial_t = self._read_initial_time_stamp(row)
+                elif self.rate is None and self._has_rate:
+                    self.rate = self._read_rate(row)
+                else:
+                    t_data.append(0 if not t_data else (t_data[-1] + 1 / self.rate))
+                    daytime_data.append(datetime.timedelta(seconds=t_data[-1]) + self.initial_t)
+                    data.append([float(value) for value in row[0].split(",")])
+        self.legacy_daytime_data = daytime_data
+        return np.array(t_data), np.array(data)
+
+
+def measure(name: str, function, setup=None, repeats: int = n_repeats) -> float:
+    """Print the best time of repeats calls of function (setup is called before each of them, untimed) and the peak
+    memory allocated during a call, returns the best time. The memory is traced on a separate call since tracing
+    slows down the allocations"""
+    timings = []
+    for _ in range(repeats + 1):
+        if setup is not None:
+            setup()
+        if len(timings) == repeats:
+            tracemalloc.start()
+            function()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            tic = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - tic)
+    print(f"  {name}: {min(timings):0.4f} s, peak memory {peak_memory / 2**20:0.1f} MiB")
+    return min(timings)
+
+
+def time_reader(reader_type: type, path: str, n_cols: int) -> float:
+    """Returns the best time of n_repeats loads of the file"""
+    timings = []
+    for _ in range(n_repeats):
+        tic = time.perf_counter()
+        reader_type(path, n_cols=n_cols)
+        timings.append(time.perf_counter() - tic)
+    return min(timings)
+
+
+def benchmark_csv_loading(folder: str) -> None:
+    """Compare the bulk csv loading engine and the raw cache to the legacy row by row loader"""
+    print(f"csv loading ({duration_in_hours} h)")
+    rng = np.random.default_rng(42)
+    initial_t = datetime.datetime(2022, 6, 28, 8)
+    for data_type, n_cols in ((DataType.EDA, 1), (DataType.ACC, 3)):
+        rate = synthetic.rates[data_type]
+        path = os.path.join(folder, f"01_2022-06-28_Empatica_{data_type.value}.csv")
+        data = rng.normal(size=(int(duration_in_hours * 3600 * rate), n_cols))
+        synthetic.write_empatica_csv(path, initial_t, data, rate=rate)
+
+        legacy = _LegacyCsvOnlyReader(path, n_cols=n_cols)
+        bulk = _CsvOnlyReader(path, n_cols=n_cols)
+        if (
+            not np.allclose(legacy.actual_data, bulk.actual_data)
+            or not np.allclose(legacy.t_data, bulk.t_data)
+            or legacy.legacy_daytime_data[-1] != bulk.daytime_data[-1].item()
+        ):
+            raise RuntimeError(f"The bulk loader does not reproduce the legacy loader for {data_type.value}")
+
+        legacy_time = time_reader(_LegacyCsvOnlyReader, path, n_cols)
+        bulk_time = time_reader(_CsvOnlyReader, path, n_cols)
+        _CachedCsvOnlyReader(path, n_cols=n_cols)  # Cold load, writes the raw cache
+        cached_time = time_reader(_CachedCsvOnlyReader, path, n_cols)
+        print(
+            f"  {data_type.value} ({rate} Hz, {bulk.t_data.size} samples): "
+            f"legacy {legacy_time:0.3f} s, bulk {bulk_time:0.3f} s, speedup {legacy_time / bulk_time:0.1f}x, "
+            f"cached {cached_time:0.4f} s"
+        )
+
+
+def benchmark_cohort(folder: str) -> None:
+    """Time each stage of the processing of a synthetic cohort, from the csv files to the tables"""
+    print(f"cohort ({n_subjects} subjects, {n_dates} dates, {duration_in_hours} h)")
+    tic = time.perf_counter()
+    cohort = synthetic.write_synthetic_cohort(folder, n_subjects, n_dates, duration_in_hours)
+    print(f"  generating the cohort: {time.perf_counter() - tic:0.2f} s")
+    subject, dates = next(iter(cohort.items()))
+    timing_path = os.path.join(folder, "timings.xlsx")
+
+    def subjects_factory() -> Subjects:
+        # Subjects concatenates the file names to the folder
+        subjects = Subjects(
+            os.path.join(folder, ""),
+            load_eda=False,
+            eda_segment_width=eda_segment_width,
+            eda_engine=NativeEdaEngine(),
+            load_hr_bpm=False,
+            load_hr_ibi=False,
+            fast_load=True,
+        )
+        for id_number, subject_dates in cohort.items():
+            subjects.add(id_number, subject_dates)
+        return subjects
+
+    def load_cohort() -> None:
+        subjects = subjects_factory()
+        for data_type in DataType:
+            subjects.load(data_type)
+
+    def remove_caches() -> None:
+        for cache in glob.glob(os.path.join(folder, "*_raw")) + glob.glob(os.path.join(folder, "*_processed")):
+            shutil.rmtree(cache)
+
+    measure("cohort load, cold", load_cohort, setup=remove_caches)
+    measure("cohort load, cached", load_cohort)
+
+    for data_type, reader_type in (
+        (DataType.ACC, AccReader),
+        (DataType.HR_BPM, HrBpmReader),
+        (DataType.HR_IBI, HrIbiReader),
+    ):
+        path = os.path.join(folder, f"{subject}_{dates[0]}_Empatica_{data_type.value}.csv")
+        reader_type.use_raw_cache = False
+        try:
+            measure(f"{data_type.value} csv parsing", lambda: reader_type(path, timing_path))
+        finally:
+            reader_type.use_raw_cache = True
+
+    timings_index = TimingsIndex(timing_path)
+    reader = EdaReader(
+        os.path.join(folder, f"{subject}_{dates[0]}_Empatica_EDA.csv"),
+        timing_path,
+        segment_width=eda_segment_width,
+        engine=NativeEdaEngine(),
+    )
+    measure("timing file parsing (TimingsIndex)", lambda: TimingsIndex(timing_path))
+    measure("_parse_timings", lambda: reader._parse_timings(timings_index))
+    measure("_parse_timings_indices", reader._parse_timings_indices)
+    measure("EdaReader._find_peaks", reader._find_peaks)
+
+    subjects = subjects_factory()
+    activity_types = (ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR)
+
+    def reset_metrics() -> None:
+        # Assigning the peaks forgets the memoized metrics, so each repeat computes the whole table
+        for eda_reader in (r for s in subjects for r in s.eda):
+            eda_reader.pyeda_peaks = eda_reader.pyeda_peaks
+
+    def print_table() -> None:
+        subjects.print_table(DataType.EDA, activity_types=activity_types, report=ReportWriter())
+
+    measure("Subjects.print_table", print_table, setup=reset_metrics)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        benchmark_csv_loading(folder)
+    with tempfile.TemporaryDirectory() as folder:
+        benchmark_cohort(folder)
+
+
+if __name__ == "__main__":
+    main()
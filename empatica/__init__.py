@@ -1,4 +1,13 @@
 from .subjects import Subjects
 from .enums import DataType, ActivityType, TimeAxis
-from .plot_utils import PlotUtils
+from .plot_utils import FigureSpec, LineSpec, PlotUtils
 from .table_utils import TableUtils
+from .timings_index import TimingsIndex
+from .eda_engines import EdaPeakEngine, PyEdaEngine, NativeEdaEngine
+from .eda_reader import EdaMetrics
+from .metrics_table import MetricsTable
+from .parquet_exporter import ParquetExporter
+from .profiler import Profiler
+from .resampler import AlignedSignals, Resampler
+from .pyramid import Pyramid
+from .report_writer import ReportWriter
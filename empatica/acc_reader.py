@@ -1,22 +1,88 @@
+import numpy as np
+
 from .empatica_vrcamp_reader import EmpaticaVrCampReader
 from .enums import ActivityType
+from .report_writer import ReportWriter
+from .timings_index import TimingsIndex
+from .window_features import window_statistics
 
 
 class AccReader(EmpaticaVrCampReader):
-    def __init__(self, data_path: str, timing_path: str):
-        super(AccReader, self).__init__(data_path=data_path, timing_path=timing_path, n_cols=3)
+    table_value_names = ("mean_norm", "std_norm", "max_norm", "activity_counts_per_minute")
+
+    # The accelerometer of the Empatica E4 reports the acceleration in 1/64 g
+    gravity: float = 64
+
+    def __init__(self, data_path: str, timing_path: str, timings_index: TimingsIndex = None, streaming: bool = False):
+        super(AccReader, self).__init__(
+            data_path=data_path, timing_path=timing_path, n_cols=3, timings_index=timings_index, streaming=streaming
+        )
+
+    def statistics(self, activity_type: ActivityType = None, chunk_size: int = None) -> dict[str, float | np.ndarray]:
+        """Compute the statistics of an activity (the whole recording if None) one chunk at a time, so the memory
+        is bounded by chunk_size. The activity counts are the sum of the norm above gravity (in g.s)"""
+        n_samples = 0
+        data_sum = np.zeros(self.n_cols)
+        norm_sum = 0.0
+        norm_max = -np.inf
+        activity_counts = 0.0
+        for _, data in self.chunks(activity_type, chunk_size):
+            norm = np.linalg.norm(data, axis=1)
+            n_samples += data.shape[0]
+            data_sum += np.sum(data, axis=0)
+            norm_sum += float(np.sum(norm))
+            norm_max = max(norm_max, float(np.max(norm))) if norm.size else norm_max
+            activity_counts += float(np.sum(np.maximum(norm - self.gravity, 0))) / self.gravity / self.rate
+
+        return {
+            "n_samples": n_samples,
+            "mean": data_sum / n_samples if n_samples else np.full(self.n_cols, np.nan),
+            "mean_norm": norm_sum / n_samples if n_samples else np.nan,
+            "max_norm": norm_max if n_samples else np.nan,
+            "activity_counts": activity_counts,
+        }
 
     def extra_labels(self) -> tuple[str, ...]:
         return "x", "y", "z"
 
+    def _window_features(self, windows: np.ndarray) -> dict[str, np.ndarray]:
+        """The statistics of the norm (in g) and the activity counts (in g.s) of each window"""
+        norm = np.linalg.norm(windows, axis=1) / self.gravity
+        features = {f"{name}_norm": value for name, value in window_statistics(norm).items()}
+        features["activity_counts"] = np.sum(np.maximum(norm - 1, 0), axis=-1) / self.rate
+        return features
+
     def _table_columns(self) -> str:
-        raise NotImplementedError("No table was implemented for AccReader data")
+        return "r|cccc"
 
-    def get_table_value(self, activity_type: ActivityType = ActivityType.All, **options) -> tuple:
-        raise NotImplementedError("No table was implemented for AccReader data")
+    def _print_table_header(self, report: ReportWriter) -> None:
+        report.write_line(
+            r"   Type of activity & \makecell{Mean norm\\(\SI{}{g})} & \makecell{Mean std of\\the norm (\SI{}{g})} "
+            r"& \makecell{Mean max of\\the norm (\SI{}{g})} & \makecell{Activity counts\\per minute (\SI{}{g.s})} \\"
+        )
 
-    def _print_table_header(self) -> None:
-        raise NotImplementedError("No table was implemented for AccReader data")
+    def get_table_value(self, activity_type: ActivityType = ActivityType.All, **options) -> tuple:
+        """The means over the windows (see window_features) of the activity"""
+        features = self.window_features(activity_type, **options)
+        return (
+            float(np.nanmean(features["mean_norm"])),
+            float(np.nanmean(features["std_norm"])),
+            float(np.nanmean(features["max_norm"])),
+            float(np.nanmean(features["activity_counts"])) * 60 / options.get("width", self.feature_window),
+        )
 
-    def print_table(self, activity_type: ActivityType = ActivityType.All, **options) -> None:
-        raise NotImplementedError("No table was implemented for AccReader data")
+    def print_table(
+        self,
+        activity_type: ActivityType = ActivityType.All,
+        values: tuple = None,
+        report: ReportWriter = None,
+        **options,
+    ) -> None:
+        report = ReportWriter.stdout() if report is None else report
+        if values is None:
+            mean_norm, std_norm, max_norm, counts_per_minute = self.get_table_value(activity_type, **options)
+        else:
+            mean_norm, std_norm, max_norm, counts_per_minute = values
+        report.write_line(
+            rf"   {activity_type.value} & {mean_norm:0.3f} & {std_norm:0.3f} & {max_norm:0.3f} & {counts_per_minute:0.2f} \\"
+        )
@@ -0,0 +1,110 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+from scipy import ndimage, signal
+
+
+class EdaPeakEngine(ABC):
+    """Find the skin conductance responses (peaks) of an EDA signal. The results follow the layout of pyEDA, that is
+    a tuple (summary, peaks) where summary holds the "number_of_peaks", "max_of_peaks" and "segment_indices" lists
+    and peaks holds the "peaklist", "indexlist" (relative to the segment) and "segment_indices" lists"""
+
+    name: str = ""
+
+    @property
+    def parameters(self) -> dict:
+        """The parameters that change the results, they are part of the key of the cached peaks"""
+        return {}
+
+    @abstractmethod
+    def process(self, data: np.ndarray, rate: int, segment_width: float) -> tuple[dict, dict]:
+        """Find the peaks of data, sampled at rate, split into segments of segment_width seconds (np.inf for one)"""
+
+    @staticmethod
+    def segment_indices(n_samples: int, rate: int, segment_width: float) -> list[tuple[int, int]]:
+        """Split n_samples into segments of segment_width seconds, the last one being possibly shorter"""
+        if segment_width == np.inf:
+            return [(0, n_samples)]
+        width = int(segment_width * rate)
+        return [(first, min(first + width, n_samples)) for first in range(0, n_samples, width)]
+
+
+class PyEdaEngine(EdaPeakEngine):
+    """Use the statistical processing of pyEDA (the pyEDA git submodule)"""
+
+    name = "pyEDA"
+
+    def __init__(self, use_scipy: bool = True):
+        self.use_scipy = use_scipy
+
+    @property
+    def parameters(self) -> dict:
+        return {"use_scipy": self.use_scipy}
+
+    def process(self, data: np.ndarray, rate: int, segment_width: float) -> tuple[dict, dict]:
+        # Imported here so the package can run with another engine when the submodule is not available
+        from pyEDA.main import process_statistical
+
+        return process_statistical(
+            data, use_scipy=self.use_scipy, sample_rate=rate, new_sample_rate=rate, segment_width=segment_width
+        )
+
+
+class NativeEdaEngine(EdaPeakEngine):
+    """Find the peaks with NumPy/SciPy only. The signal is low-pass filtered, the tonic component is estimated with a
+    moving median and the peaks are the maxima of the phasic component (signal minus tonic) that are prominent enough"""
+
+    name = "native"
+
+    def __init__(
+        self,
+        lowpass_cutoff: float = 1.0,
+        tonic_window: float = 16.0,
+        min_amplitude: float = 0.03,
+        min_distance: float = 1.0,
+    ):
+        self.lowpass_cutoff = lowpass_cutoff  # in Hz
+        self.tonic_window = tonic_window  # in second
+        self.min_amplitude = min_amplitude  # in microS
+        self.min_distance = min_distance  # in second
+
+    @property
+    def parameters(self) -> dict:
+        return {
+            "lowpass_cutoff": self.lowpass_cutoff,
+            "tonic_window": self.tonic_window,
+            "min_amplitude": self.min_amplitude,
+            "min_distance": self.min_distance,
+        }
+
+    def process(self, data: np.ndarray, rate: int, segment_width: float) -> tuple[dict, dict]:
+        filtered = self._lowpass(np.asarray(data, dtype=float).ravel(), rate)
+        phasic = filtered - self._tonic(filtered, rate)
+
+        segment_indices = self.segment_indices(phasic.size, rate, segment_width)
+        summary = {"number_of_peaks": [], "max_of_peaks": [], "segment_indices": segment_indices}
+        peaks = {"peaklist": [], "indexlist": [], "segment_indices": segment_indices}
+        for first, last in segment_indices:
+            indices, _ = signal.find_peaks(
+                phasic[first:last], prominence=self.min_amplitude, distance=max(1, int(self.min_distance * rate))
+            )
+            values = phasic[first:last][indices]
+            summary["number_of_peaks"].append(indices.size)
+            summary["max_of_peaks"].append(float(np.max(values)) if values.size else 0.0)
+            peaks["peaklist"].append(values.tolist())
+            peaks["indexlist"].append(indices)
+        return summary, peaks
+
+    def _lowpass(self, data: np.ndarray, rate: int) -> np.ndarray:
+        """Remove the high frequency noise, if the cutoff is below the Nyquist frequency"""
+        nyquist = rate / 2
+        if self.lowpass_cutoff >= nyquist:
+            return data
+        b, a = signal.butter(2, self.lowpass_cutoff / nyquist)
+        if data.size <= 3 * max(len(a), len(b)):
+            return data  # Too short to be filtered
+        return signal.filtfilt(b, a, data)
+
+    def _tonic(self, data: np.ndarray, rate: int) -> np.ndarray:
+        """Estimate the slowly varying tonic level with a moving median"""
+        return ndimage.median_filter(data, size=max(1, int(self.tonic_window * rate)), mode="nearest")
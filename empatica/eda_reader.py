@@ -1,41 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor
 import os
-import pickle
+from typing import NamedTuple
 
 from matplotlib import pyplot as plt
 import numpy as np
-from pyEDA.main import process_statistical
 
+from .eda_engines import EdaPeakEngine, PyEdaEngine
 from .empatica_vrcamp_reader import EmpaticaVrCampReader
 from .enums import ActivityType, TimeAxis
+from .peaks_cache import PeaksCache
+from .profiler import count, profile
+from .report_writer import ReportWriter
+from .timings_index import TimingsIndex
+
+
+class EdaMetrics(NamedTuple):
+    """The metrics of an activity, averaged over its segments"""
+
+    n_peaks: float
+    activity_time: float  # in second
+    peak_per_second: float
+    max_peak_value: float  # in microS
+
+    @property
+    def table_values(self) -> tuple[float, float, float, float]:
+        """The values printed in the tables (see EdaReader.table_value_names), times being in minute"""
+        return self.n_peaks, self.activity_time / 60, self.peak_per_second * 60, self.max_peak_value
 
 
 class EdaReader(EmpaticaVrCampReader):
-    def __init__(self, data_path: str, timing_path: str, segment_width: int, reprocess_eda: bool = True):
-        super(EdaReader, self).__init__(data_path=data_path, timing_path=timing_path, n_cols=1)
+    table_value_names = ("n_peaks", "total_time", "peak_per_minute", "max_peak_value")
 
-        self.baseline_value = self._compute_baseline()
-        self._apply_baseline()
+    def __init__(
+        self,
+        data_path: str,
+        timing_path: str,
+        segment_width: int,
+        reprocess_eda: bool = True,
+        timings_index: TimingsIndex = None,
+        n_workers: int = 1,
+        engine: EdaPeakEngine = None,
+        incremental: bool = False,
+    ):
+        super(EdaReader, self).__init__(
+            data_path=data_path, timing_path=timing_path, n_cols=1, timings_index=timings_index
+        )
+
+        with profile("apply baseline", self.path):
+            self.baseline_value = self._compute_baseline()
+            self._apply_baseline()
 
         self.segment_width = segment_width if segment_width is not None else np.inf
-        self.processed_data_path = f"{self.path[:self.path.index('.')]}_processed.pyeda"
-        if reprocess_eda or not os.path.isfile(self.processed_data_path):
-            self.pyeda_peaks = self._find_peaks()
-            with open(self.processed_data_path, "wb+") as file:
-                pickle.dump(self.pyeda_peaks, file)
-        else:
-            with open(self.processed_data_path, "rb") as file:
-                self.pyeda_peaks = pickle.load(file)
-
-                # sanity check to make sure one is not loading data different from the requested segment_width
-                if self.segment_width != np.inf and self.segment_width > self.t(self.longest_activity).size:
-                    self.segment_width = np.inf
-                data_segment_width = self._compute_segment_width_from_data(self.pyeda_peaks)
-                if data_segment_width != self.segment_width:
-                    raise RuntimeError(
-                        f"The requested segment_width ({segment_width}) does not match the one from the "
-                        f"preprocessed values ({data_segment_width}). Please use the same segment_width "
-                        f"or set reprocess_eda to True (or fast_load to False)."
-                    )
+        # The activities are sent to the workers, never their segments, as the engine (pyEDA filters and decomposes
+        # the whole signal it is given) would find different peaks at the edges of the segments processed separately.
+        # 1 finds the peaks in the current process, None uses all the cores
+        self.n_workers = n_workers
+        # When incremental, the results of each activity are cached so only the activities whose data changed since
+        # the last processing (e.g. the ones covering data appended to the recording) are processed again. The engine
+        # is given the same data as a full processing, so the peaks are the same
+        self.incremental = incremental
+        self.engine = PyEdaEngine() if engine is None else engine
+        self.peaks_cache = PeaksCache(f"{os.path.splitext(self.path)[0]}_processed")
+        parameters = {"engine": self.engine.name, **self.engine.parameters}
+        key = PeaksCache.key(
+            self.actual_data,
+            self.baseline_value,
+            self.segment_width,
+            self.rate,
+            activity_indices=[(activity.value, indices) for activity, indices in self.activity_indices.items()],
+            **parameters,
+        )
+        # The activities are identified by their own data, so their key only depends on the processing parameters
+        activities_key = f"{PeaksCache.key(np.zeros(0), 0, self.segment_width, self.rate, **parameters)}_activities"
+
+        with profile("load peaks cache", self.path):
+            self.pyeda_peaks = None if reprocess_eda else self.peaks_cache.load(key)
+        if self.pyeda_peaks is None:
+            with profile("load activities cache", self.path):
+                previous = self.peaks_cache.load(activities_key) if self.incremental and not reprocess_eda else None
+            with profile("find peaks", self.path):
+                self.pyeda_peaks, activities = self._find_peaks(previous)
+            with profile("save peaks cache", self.path):
+                self.peaks_cache.save(key, self.pyeda_peaks)
+                if self.incremental:
+                    self.peaks_cache.save(activities_key, activities)
+        self._remove_legacy_peaks()
+
+    def _remove_legacy_peaks(self) -> None:
+        """Remove the file the peaks were saved to before peaks_cache (<csv>_processed.pyeda), it is never read"""
+        legacy_path = f"{os.path.splitext(self.path)[0]}_processed.pyeda"
+        if os.path.isfile(legacy_path):
+            try:
+                os.remove(legacy_path)
+            except OSError:
+                pass  # It is removed next time
 
     def _compute_baseline(self) -> float:
         """Compute the baseline from the baseline trial"""
@@ -43,7 +101,11 @@ class EdaReader(EmpaticaVrCampReader):
 
     def _apply_baseline(self) -> None:
         """Apply the baseline values to all the data"""
-        self.actual_data -= self.baseline_value
+        self.actual_data = self.actual_data - self.baseline_value  # Not in place, the data may be memory mapped
+
+    @property
+    def _pyramid_offset(self) -> float:
+        return self.baseline_value
 
     def add_peaks_to_plot(
         self,
@@ -57,117 +119,182 @@ class EdaReader(EmpaticaVrCampReader):
             ax = plt.gca()
         t = self.t_peak(activity_type)
         if reset_time_to_zero:
-            t -= self.t(activity_type)[0]
-        t /= time_axis
+            t = t - self.t(activity_type)[0]
+        t = t / time_axis
         ax.plot(t, self.peak(activity_type), "ro")
 
+    @property
+    def pyeda_peaks(self) -> dict[ActivityType, tuple[dict, dict]]:
+        return self._pyeda_peaks
+
+    @pyeda_peaks.setter
+    def pyeda_peaks(self, value: dict[ActivityType, tuple[dict, dict]]) -> None:
+        self._pyeda_peaks = value
+        # The flat arrays and the metrics are computed again from the new peaks on the next access
+        self._peak_arrays = {}
+        self._metrics = {}
+        self._metrics_stamp = None
+
+    def peak_arrays(self, activity_type: ActivityType) -> dict[str, np.ndarray]:
+        """Get the peaks of an activity as flat arrays. "index" (in the activity), "t", "value" and "segment" have
+        one element per peak, the peaks of the segment i being at [segment_offsets[i]:segment_offsets[i + 1]]"""
+        if activity_type not in self._peak_arrays:
+            self._peak_arrays[activity_type] = self._build_peak_arrays(activity_type)
+        return self._peak_arrays[activity_type]
+
+    def _build_peak_arrays(self, activity_type: ActivityType) -> dict[str, np.ndarray]:
+        """Flatten the per-segment lists of pyEDA into one array per field"""
+        summary, peaks = self.pyeda_peaks[activity_type]
+        n_peaks_per_segment = [len(index) for index in peaks["indexlist"]]
+        segment_offsets = np.concatenate(([0], np.cumsum(n_peaks_per_segment))).astype(int)
+        segment = np.repeat(np.arange(len(n_peaks_per_segment)), n_peaks_per_segment)
+        segment_first_index = np.array([first for first, _ in summary["segment_indices"]], dtype=int)
+        index = (
+            np.concatenate([np.asarray(i, dtype=int) for i in peaks["indexlist"]]) + segment_first_index[segment]
+            if segment.size
+            else np.zeros(0, dtype=int)
+        )
+        value = (
+            np.concatenate([np.asarray(v, dtype=float) for v in peaks["peaklist"]])
+            if segment.size
+            else np.zeros(0, dtype=float)
+        )
+
+        arrays = {
+            "index": index,
+            "t": np.asarray(self.t(activity_type))[index],
+            "value": value,
+            "segment": segment,
+            "segment_offsets": segment_offsets,
+        }
+        for array in arrays.values():
+            array.flags.writeable = False  # They are shared by all the accessors
+        return arrays
+
     def n_segments(self, activity_type: ActivityType) -> int:
         """Get the number of segments used to compute the peaks"""
         return len(self.pyeda_peaks[activity_type][0]["segment_indices"])
 
-    def _compute_segment_width_from_data(self, data_peaks) -> int:
-        """Find the length of the segmentation"""
-        value = []
-        for key in data_peaks:
-            # Do not include last one, as it is of random size based on the length of the data acquisition
-            value.extend([v[1] - v[0] for v in data_peaks[key][0]["segment_indices"][:-1]])
-        if not all(v == value[0] for v in value):
-            raise RuntimeError("A single value could not be found")
-
-        # For all intend and purpose if the length of all the segment is the length of the segment,
-        # then assume np.inf (or None) was used
-        return int(value[0] / self.rate) if value else np.inf
-
     def t_per_segment(self, activity_type: ActivityType) -> list[np.ndarray, ...]:
         """Computes the time vector for each segment of the peaks"""
-        full_t = self.t(activity_type)
-        t_tp = []
-        for i in range(self.n_segments(activity_type)):
-            t_tp.append(
-                full_t[
-                    self.pyeda_peaks[activity_type][1]["indexlist"][i]
-                    + self.pyeda_peaks[activity_type][0]["segment_indices"][i][0]
-                ]
-            )
-        return t_tp
+        return self._split_per_segment(activity_type, self.peak_arrays(activity_type)["t"])
 
     def t_peak(self, activity_type: ActivityType) -> np.ndarray:
         """Returns the time vector for all the peak for all segments"""
-        return np.concatenate(self.t_per_segment(activity_type))
+        return self.peak_arrays(activity_type)["t"]
 
     def peak_per_segment(self, activity_type: ActivityType) -> list[np.ndarray, ...]:
         """Get the peak values per segment"""
-        return [np.array(data) for data in self.pyeda_peaks[activity_type][1]["peaklist"]]
+        return self._split_per_segment(activity_type, self.peak_arrays(activity_type)["value"])
 
     def peak(self, activity_type: ActivityType) -> np.ndarray:
         """Get the peak values for the full length of the activity"""
-        return np.concatenate(self.peak_per_segment(activity_type))
+        return self.peak_arrays(activity_type)["value"]
+
+    def _split_per_segment(self, activity_type: ActivityType, values: np.ndarray) -> list[np.ndarray, ...]:
+        """Split a flat per-peak array into views for each segment"""
+        offsets = self.peak_arrays(activity_type)["segment_offsets"]
+        return [values[first:last] for first, last in zip(offsets[:-1], offsets[1:])]
 
     def extra_labels(self) -> tuple[str, ...]:
         return ("",)
 
-    def _find_peaks(self):
-        """Use pyEDA to find the peaks for each of the activity"""
-        baseline = process_statistical(
-            self.data(ActivityType.BASELINE),
-            use_scipy=True,
-            sample_rate=self.rate,
-            new_sample_rate=self.rate,
-            segment_width=self.segment_width,
-        )
-        camp = process_statistical(
-            self.data(ActivityType.Camp),
-            use_scipy=True,
-            sample_rate=self.rate,
-            new_sample_rate=self.rate,
-            segment_width=self.segment_width,
-        )
-        vr = process_statistical(
-            self.data(ActivityType.VR),
-            use_scipy=True,
-            sample_rate=self.rate,
-            new_sample_rate=self.rate,
-            segment_width=self.segment_width,
+    def _find_peaks(self, previous: dict = None) -> tuple[dict, dict]:
+        """Use the peak engine (pyEDA by default) to find the peaks for each of the activity. The results of the
+        activities in previous (as returned by a previous call) whose data did not change are reused. Returns the peaks
+        and the results of each activity"""
+        previous = {} if previous is None else previous
+
+        # The activities are the ones of activity_timing_columns, so any activity added there gets its peaks
+        activities = list(self.activity_indices)
+        digests = [PeaksCache.key(self.data(activity), 0, self.segment_width, self.rate) for activity in activities]
+        results = [None] * len(activities)
+        for i, (activity, digest) in enumerate(zip(activities, digests)):
+            previous_digest, previous_result = previous.get(activity.value, (None, None))
+            if previous_digest == digest:
+                results[i] = previous_result
+
+        to_process = [i for i, result in enumerate(results) if result is None]
+        count("activities processed", len(to_process), self.path)
+        count("activities reused", len(activities) - len(to_process), self.path)
+        task_args = (
+            [self.data(activities[i]) for i in to_process],
+            [self.rate] * len(to_process),
+            [self.segment_width] * len(to_process),
         )
-        return {ActivityType.BASELINE: baseline, ActivityType.Camp: camp, ActivityType.VR: vr}
+        if self.n_workers == 1 or len(to_process) < 2:
+            processed = map(self.engine.process, *task_args)
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                processed = list(executor.map(self.engine.process, *task_args))
+        for i, result in zip(to_process, processed):
+            results[i] = result
+
+        cached = {activity.value: (digest, result) for activity, digest, result in zip(activities, digests, results)}
+        return dict(zip(activities, results)), cached
 
     def _table_columns(self) -> str:
         return "r|cccc"
 
-    def _print_table_header(self) -> None:
-        print(
+    def _print_table_header(self, report: ReportWriter) -> None:
+        report.write_line(
             r"   Type of activity & \makecell{Mean number\\of peaks} & \makecell{Mean segment\\time (\SI{}{\minute})} "
             r"& \makecell{Number of peaks\\per minute (\SI{}{1\per\minute})} "
             r"& \makecell{Mean max\\peak value (\SI{}{\micro\siemens})} \\"
         )
 
+    def metrics(self, activity_type: ActivityType) -> EdaMetrics:
+        """Get the metrics of an activity, computed once and reused until the peaks, the baseline or the segment
+        width change"""
+        stamp = (self.baseline_value, self.segment_width)
+        if self._metrics_stamp != stamp:
+            self._metrics = {}
+            self._metrics_stamp = stamp
+        if activity_type not in self._metrics:
+            self._metrics[activity_type] = self._compute_metrics(activity_type)
+        return self._metrics[activity_type]
+
+    def _compute_metrics(self, activity_type: ActivityType) -> EdaMetrics:
+        summary, peaks = self.pyeda_peaks[activity_type][0], self.pyeda_peaks[activity_type][1]
+        n_peaks = float(np.mean(summary["number_of_peaks"]))
+        activity_time = float(np.mean([v[1] - v[0] for v in peaks["segment_indices"]])) / self.rate
+        return EdaMetrics(
+            n_peaks=n_peaks,
+            activity_time=activity_time,
+            peak_per_second=n_peaks / activity_time,
+            max_peak_value=float(np.mean(summary["max_of_peaks"])),
+        )
+
     def n_peaks(self, activity_type: ActivityType) -> float:
         """Number of peaks in an activity"""
-        return float(np.mean(self.pyeda_peaks[activity_type][0]["number_of_peaks"]))
+        return self.metrics(activity_type).n_peaks
 
     def activity_time(self, activity_type: ActivityType) -> float:
         """Time of the activity in second"""
-        return float(np.mean([v[1] - v[0] for v in self.pyeda_peaks[activity_type][1]["segment_indices"]])) / self.rate
+        return self.metrics(activity_type).activity_time
 
     def peak_per_second(self, activity_type: ActivityType) -> float:
         """Number of peak per second during the activity"""
-        return self.n_peaks(activity_type) / self.activity_time(activity_type)
+        return self.metrics(activity_type).peak_per_second
 
     def maximum_peak_value(self, activity_type: ActivityType) -> float:
-        return float(np.mean(self.pyeda_peaks[activity_type][0]["max_of_peaks"]))
+        return self.metrics(activity_type).max_peak_value
 
     def get_table_value(self, activity_type: ActivityType = ActivityType.All, **options) -> tuple:
-        n_peaks = self.n_peaks(activity_type)
-        total_time = self.activity_time(activity_type) / 60
-        peak_per_minute = self.peak_per_second(activity_type) * 60
-        max_peak_value = self.maximum_peak_value(activity_type)
-        return n_peaks, total_time, peak_per_minute, max_peak_value
+        return self.metrics(activity_type).table_values
 
-    def print_table(self, activity_type: ActivityType = ActivityType.All, values: tuple = None, **options) -> None:
+    def print_table(
+        self,
+        activity_type: ActivityType = ActivityType.All,
+        values: tuple = None,
+        report: ReportWriter = None,
+        **options,
+    ) -> None:
+        report = ReportWriter.stdout() if report is None else report
         if values is None:
             n_peaks, total_time, peak_per_minute, max_peak_value = self.get_table_value(activity_type, **options)
         else:
             n_peaks, total_time, peak_per_minute, max_peak_value = values
-        print(
+        report.write_line(
             rf"   {activity_type.value} & {n_peaks:0.1f} & {total_time:0.1f} & {peak_per_minute:0.4f} & {max_peak_value:0.6f} \\"
         )
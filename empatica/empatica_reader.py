@@ -1,31 +1,121 @@
 from abc import ABC, abstractmethod
-import csv
 import datetime
+import hashlib
+import itertools
+import os
 from matplotlib import pyplot as plt
 import numpy as np
 
 from .enums import ActivityType, TimeAxis
+from .plot_utils import PlotUtils
+from .profiler import count, profile
+from .pyramid import Pyramid
+from .report_writer import ReportWriter
 
 
 class EmpaticaReader(ABC):
-    def __init__(self, data_path: str, n_cols: int):
+    # If the parsed csv files are cached next to them as .npy files, which are memory mapped on the next loads
+    use_raw_cache: bool = True
+
+    # The name of each value returned by get_table_value
+    table_value_names: tuple[str, ...] = ()
+    # The number of samples per chunk when the data are streamed
+    default_chunk_size: int = 32 * 60 * 10
+    # If add_to_plot reduces the data to their min/max per pixel, so the plots do not grow with the recordings
+    decimate_plots: bool = True
+
+    def __init__(self, data_path: str, n_cols: int, streaming: bool = False):
         self.path = data_path
         self.subject, self.date = self._parse_name_and_date(self.path)
         self.initial_t: datetime.datetime | None = None
         self.rate: int | None = None
         self.n_cols = n_cols
 
-        self.t_data, self.daytime_data, self.actual_data = self._read_csv_data()
+        # When streaming, the csv file is never loaded in memory. The data are either memory mapped from the raw
+        # cache (if it is up to date) or read chunk by chunk (see iter_chunks), in which case t_data is None
+        self.streaming = streaming
+        self._n_streamed_samples = 0
+        self._decimated: dict[tuple, tuple[np.ndarray, np.ndarray]] = {}  # Per activity, norm and number of buckets
+        self._pyramids: dict[bool, Pyramid] = {}  # Per norm
+        if self.streaming:
+            with profile("read raw cache", self.path):
+                cached = self._read_raw_cache() if self.use_raw_cache else None
+            self.t_data, self.actual_data = cached if cached is not None else (None, None)
+            if cached is None:
+                with profile("count csv samples", self.path):
+                    self._n_streamed_samples = self._count_csv_samples()
+        else:
+            self.t_data, self.actual_data = self._load_data()
+        count("samples", self.n_samples, self.path)
+
+    @property
+    def n_samples(self) -> int:
+        """The number of samples in the recording"""
+        return self._n_streamed_samples if self.t_data is None else self.t_data.shape[0]
+
+    def iter_chunks(self, first: int = 0, last: int = None, chunk_size: int = None):
+        """Yield (t, data) chunks of at most chunk_size samples, from the sample first to last (excluded)"""
+        last = self.n_samples if last is None else last
+        chunk_size = self.default_chunk_size if chunk_size is None else chunk_size
+        if self.t_data is not None:
+            for start in range(first, last, chunk_size):
+                stop = min(start + chunk_size, last)
+                yield np.asarray(self.t_data[start:stop]), np.asarray(self.actual_data[start:stop, :])
+            return
+
+        with open(self.path) as file:
+            self._read_csv_header(file)
+            lines = itertools.islice(file, first, last)
+            for start in range(first, last, chunk_size):
+                stop = min(start + chunk_size, last)
+                raw_data = self._parse_csv_rows(itertools.islice(lines, stop - start))
+                yield self._compute_t(raw_data, first_index=start), self._extract_data(raw_data)
 
     def t(self, activity_type: ActivityType = None):
+        self._check_in_memory()
         return self.t_data
 
+    @property
+    def daytime_data(self) -> np.ndarray:
+        """The time of the day of each sample, computed on demand from initial_t and t_data"""
+        self._check_in_memory()
+        return self._to_daytime(self.t_data)
+
     def daytime(self, activity_type: ActivityType = None):
         return self.daytime_data
 
     def data(self, activity_type: ActivityType = None):
+        self._check_in_memory()
         return self.actual_data
 
+    def _check_in_memory(self) -> None:
+        """Raise if the data are streamed from the csv file, as they can then only be read with iter_chunks"""
+        if self.t_data is None:
+            raise ValueError(f"The data of {self.path} are streamed from the csv file, read them with iter_chunks")
+
+    def _read_samples(self, first: int, last: int, norm: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """Get the time and the data (their norm, as a single column, if norm) of the samples first to last
+        (excluded), from memory or from the csv file if the data are streamed"""
+        if self.t_data is not None:
+            t, data = np.asarray(self.t_data[first:last]), np.asarray(self.actual_data[first:last, :])
+        else:
+            chunks = list(self.iter_chunks(first, last))
+            t = np.concatenate([t for t, _ in chunks]) if chunks else np.zeros(0)
+            data = np.concatenate([data for _, data in chunks]) if chunks else np.zeros((0, self.n_cols))
+        return t, np.linalg.norm(data, axis=1)[:, np.newaxis] if norm else data
+
+    def _t_at(self, indices: int | np.ndarray) -> float | np.ndarray:
+        """Get the time of samples from their indices. The streamed readers have a constant rate, so it is computed"""
+        if self.t_data is not None:
+            return np.asarray(self.t_data[indices])
+        return np.asarray(indices) / self.rate
+
+    def _index_at(self, t: float, side: str = "left") -> int:
+        """Get the index where t would be inserted in the time vector (see numpy.searchsorted)"""
+        if self.t_data is not None:
+            return int(np.searchsorted(self.t_data, t, side=side))
+        return int(np.ceil(t * self.rate)) if side == "left" else int(np.floor(t * self.rate)) + 1
+
     @abstractmethod
     def extra_labels(self) -> tuple[str, ...]:
         """Returns the name of the data"""
@@ -37,53 +127,202 @@ class EmpaticaReader(ABC):
         reset_time_to_zero: bool = True,
         ax: plt.axes = None,
         norm: bool = False,
+        n_buckets: int = None,
+        zoomable: bool = False,
         **options,
     ) -> plt.axes:
-        """Add the current data to a predefined matplotlib.pyplot figure"""
-        t_data = self.t(activity_type)
-        data = self.data(activity_type)
-        data = np.linalg.norm(data, axis=1) if norm else data
-
-        t = t_data / time_axis
-        if reset_time_to_zero:
-            t -= t[0]
-
+        """Add the current data to a predefined matplotlib.pyplot figure. Unless decimate_plots is False, the data are
+        reduced to their min and max in n_buckets buckets (one per pixel of the saved figure if None). If zoomable, the
+        level of the pyramid matching the x limits is plotted instead, and reloaded each time they change"""
         if ax is None:
             ax = plt.gca()
 
         label = f"{self.subject} / {self.date} / {activity_type.value}"
         if norm is None and self.extra_labels() is not None:
             label = [f"{label} / {extra_label}" for extra_label in self.extra_labels()]
+        if zoomable:
+            self._add_zoomable_to_plot(activity_type, time_axis, reset_time_to_zero, ax, bool(norm), label, **options)
+            return ax
+
+        first, last = self._sample_range(activity_type)
+        if self.decimate_plots:
+            n_buckets = self._plot_buckets(ax) if n_buckets is None else n_buckets
+            key = (activity_type, bool(norm), n_buckets)
+            if key not in self._decimated:
+                self._decimated[key] = self._decimate(first, last, bool(norm), n_buckets)
+            t, data = self._decimated[key]
+        else:
+            t, data = self._read_samples(first, last, bool(norm))
+        t_first = self._t_at(first)
+
+        t = t / time_axis
+        if reset_time_to_zero:
+            t = t - t_first / time_axis
+
         ax.plot(t, data, label=label, **options)
         return ax
 
+    def _add_zoomable_to_plot(
+        self,
+        activity_type: ActivityType,
+        time_axis: TimeAxis,
+        reset_time_to_zero: bool,
+        ax: plt.axes,
+        norm: bool,
+        label: str | list[str],
+        **options,
+    ) -> None:
+        """Plot the min/max envelope of the pyramid level that has about one block per pixel of ax, between its x
+        limits. An xlim_changed callback replaces the lines with the matching level each time the plot is zoomed or
+        panned, so only the visible blocks are ever read from the memory mapped pyramid"""
+        pyramid = self.pyramid(norm)
+        offset = 0 if norm else self._pyramid_offset
+        first, last = self._sample_range(activity_type)
+        origin = float(self._t_at(first)) if reset_time_to_zero else 0.0
+
+        def view(start: int, stop: int) -> tuple[np.ndarray, np.ndarray]:
+            level = pyramid.level_for(stop - start, int(ax.get_window_extent().width))
+            if level == 0:
+                t, values = self._read_samples(start, stop, norm)
+            else:
+                indices, values = pyramid.envelope(level, start, stop)
+                t, values = self._t_at(np.clip(indices, first, last - 1)), values - offset
+            return (t - origin) / time_axis, values
+
+        lines = ax.plot(*view(first, last), label=label, **options)
+
+        def on_xlim_changed(changed_ax: plt.axes) -> None:
+            t_min, t_max = (np.asarray(changed_ax.get_xlim()) * time_axis) + origin
+            start = int(np.clip(self._index_at(t_min) - 1, first, last))
+            stop = int(np.clip(self._index_at(t_max, side="right") + 1, start, last))
+            t, values = view(start, stop)
+            for i, line in enumerate(lines):
+                line.set_data(t, values[:, i])
+
+        ax.callbacks.connect("xlim_changed", on_xlim_changed)
+
+    def pyramid(self, norm: bool = False) -> Pyramid:
+        """Get the level of detail pyramid of the data (of their norm if norm). It is memory mapped from the raw cache
+        folder if it is newer than the csv file, otherwise it is computed chunk by chunk and saved there"""
+        norm = bool(norm)
+        if norm not in self._pyramids:
+            self._pyramids[norm] = self._load_pyramid(norm)
+        return self._pyramids[norm]
+
+    @property
+    def _pyramid_offset(self) -> float:
+        """The value added to the data before computing the pyramid, so it matches the data of the raw cache"""
+        return 0.0
+
+    def _sample_range(self, activity_type: ActivityType = None) -> tuple[int, int]:
+        """Get the first and last (excluded) indices of the samples of an activity"""
+        return 0, self.n_samples
+
+    def _load_pyramid(self, norm: bool) -> Pyramid:
+        """Read the pyramid from the raw cache folder, or compute it (and save it there if use_raw_cache)"""
+        # The pyramid of the norm cannot be shifted back to the csv data, so it is not saved if there is an offset
+        folder = os.path.join(self._raw_cache_folder, "pyramid_norm" if norm else "pyramid")
+        persist = self.use_raw_cache and not (norm and self._pyramid_offset)
+        if persist:
+            with profile("read pyramid", self.path):
+                pyramid = Pyramid.load(folder, self.path)
+            if pyramid is not None:
+                return pyramid
+
+        with profile("build pyramid", self.path):
+            if persist:
+                try:
+                    return self._build_pyramid(norm, folder)
+                except OSError:
+                    pass  # The pyramid is only an optimization, it is kept in memory and computed again next time
+            return self._build_pyramid(norm)
+
+    def _build_pyramid(self, norm: bool, folder: str = None) -> Pyramid:
+        """Compute the pyramid from chunks of whole blocks, so the data are never all read at once when streamed"""
+        multiple = Pyramid.chunk_multiple(self.n_samples)
+        chunks = (
+            np.linalg.norm(data, axis=1)[:, np.newaxis] if norm else data + self._pyramid_offset
+            for _, data in self.iter_chunks(chunk_size=multiple * max(self.default_chunk_size // multiple, 1))
+        )
+        return Pyramid.build_from_chunks(chunks, self.n_samples, 1 if norm else self.n_cols, folder)
+
     @staticmethod
-    def print_document_header():
-        print(r"\documentclass{article}")
-        print(r"\usepackage[utf8]{inputenc}")
-        print(r"\usepackage{makecell}")
-        print(r"\usepackage{siunitx}")
-        print("")
-        print(r"\begin{document}")
+    def _plot_buckets(ax: plt.axes) -> int:
+        """Get the number of pixels along the x axis of ax, once the figure is saved by PlotUtils.savefig"""
+        fig = ax.get_figure()
+        width = max(fig.get_figwidth(), PlotUtils.figure_size[0]) * max(fig.dpi, PlotUtils.dpi)
+        return max(int(np.ceil(ax.get_position().width * width)), 1)
+
+    def _decimate(self, first: int, last: int, norm: bool, n_buckets: int) -> tuple[np.ndarray, np.ndarray]:
+        """Decimate the samples first to last (excluded) with _min_max_decimate. The streamed data are decimated chunk
+        by chunk, each chunk holding whole buckets, so they are never all read at once"""
+        if self.t_data is not None or last - first <= 2 * n_buckets:
+            return self._min_max_decimate(*self._read_samples(first, last, norm), n_buckets)
+
+        size = int(np.ceil((last - first) / n_buckets))
+        decimated_t, decimated_data = [], []
+        for t, data in self.iter_chunks(first, last, chunk_size=size * max(self.default_chunk_size // size, 1)):
+            data = np.linalg.norm(data, axis=1)[:, np.newaxis] if norm else data
+            t, data = self._min_max_buckets(t, data, size)
+            decimated_t.append(t)
+            decimated_data.append(data)
+        return np.concatenate(decimated_t), np.concatenate(decimated_data)
+
+    @staticmethod
+    def _min_max_decimate(t: np.ndarray, data: np.ndarray, n_buckets: int) -> tuple[np.ndarray, np.ndarray]:
+        """Reduce data (one row per element of t) to the min and max of n_buckets buckets of consecutive samples, in
+        the order they occur so the peaks keep their shape. As the order differs between the columns, t is returned
+        with one column per column of data"""
+        n_samples = t.shape[0]
+        if n_samples <= 2 * n_buckets:
+            return t, data
+        return EmpaticaReader._min_max_buckets(t, data, int(np.ceil(n_samples / n_buckets)))
+
+    @staticmethod
+    def _min_max_buckets(t: np.ndarray, data: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """Reduce each bucket of size consecutive samples to its min and max (see _min_max_decimate)"""
+        # The last bucket is completed by repeating the last sample, which changes neither its min nor its max
+        n_padding = -t.shape[0] % size
+        t = np.pad(t, (0, n_padding), mode="edge").reshape(-1, size)
+        data = np.pad(data, ((0, n_padding), (0, 0)), mode="edge").reshape(t.shape[0], size, -1)
+
+        i_min, i_max = np.argmin(data, axis=1), np.argmax(data, axis=1)
+        indices = np.stack((np.minimum(i_min, i_max), np.maximum(i_min, i_max)), axis=1)  # (n_buckets, 2, n_cols)
+        buckets = np.arange(t.shape[0])[:, np.newaxis, np.newaxis]
+        decimated_t = t[buckets, indices].reshape(-1, data.shape[2])
+        decimated_data = np.take_along_axis(data, indices, axis=1).reshape(-1, data.shape[2])
+        return decimated_t, decimated_data
+
+    @staticmethod
+    def print_document_header(report: ReportWriter = None):
+        report = ReportWriter.stdout() if report is None else report
+        report.write_line(r"\documentclass{article}")
+        report.write_line(r"\usepackage[utf8]{inputenc}")
+        report.write_line(r"\usepackage{makecell}")
+        report.write_line(r"\usepackage{siunitx}")
+        report.write_line("")
+        report.write_line(r"\begin{document}")
 
     @staticmethod
-    def print_document_tail():
-        print(r"\end{document}")
+    def print_document_tail(report: ReportWriter = None):
+        report = ReportWriter.stdout() if report is None else report
+        report.write_line(r"\end{document}")
 
-    def print_table_header(self):
-        """Prepare a LaTeX table with tabular{columns}"""
-        print(r" \begin{table}[!h]")
-        print(r"  \centering")
-        print(r"  \begin{tabular}{" + self._table_columns() + r"}")
-        self._print_table_header()
-        print(r"   \hline")
+    def print_table_header(self, report: ReportWriter = None):
+        """Prepare a LaTeX table with tabular{columns}, in report (the standard output if None)"""
+        report = ReportWriter.stdout() if report is None else report
+        report.write_line(r" \begin{table}[!h]")
+        report.write_line(r"  \centering")
+        report.write_line(r"  \begin{tabular}{" + self._table_columns() + r"}")
+        self._print_table_header(report)
+        report.write_line(r"   \hline")
 
     @abstractmethod
     def _table_columns(self) -> str:
         """Get the columns of a LaTeX table"""
 
     @abstractmethod
-    def _print_table_header(self) -> None:
+    def _print_table_header(self, report: ReportWriter) -> None:
         """Print the actual header"""
 
     @abstractmethod
@@ -91,16 +330,23 @@ class EmpaticaReader(ABC):
         """Returns all the elements that print_table will print"""
 
     @abstractmethod
-    def print_table(self, activity_type: ActivityType = ActivityType.All, values: tuple = None, **options) -> None:
-        """Print the relevant information as a LaTeX table"""
+    def print_table(
+        self,
+        activity_type: ActivityType = ActivityType.All,
+        values: tuple = None,
+        report: ReportWriter = None,
+        **options,
+    ) -> None:
+        """Print the relevant information as a LaTeX table row, in report (the standard output if None)"""
 
     @staticmethod
-    def print_table_tail(caption):
+    def print_table_tail(caption, report: ReportWriter = None):
         """Prepare the tail of a LaTeX table"""
-        print(r"   \hline")
-        print(r"  \end{tabular}")
-        print(r"  \caption{" + caption + r"}")
-        print(r" \end{table}")
+        report = ReportWriter.stdout() if report is None else report
+        report.write_line(r"   \hline")
+        report.write_line(r"  \end{tabular}")
+        report.write_line(r"  \caption{" + caption + r"}")
+        report.write_line(r" \end{table}")
 
     @property
     def _has_initial_time_stamp(self) -> bool:
@@ -111,15 +357,17 @@ class EmpaticaReader(ABC):
         """Reads the initial time stamp from a row of the csv file"""
         return datetime.datetime.fromtimestamp(self._to_int(row))
 
-    def _next_t(self, _: list, t_data) -> float:
-        """Determinate the next t based on the readings"""
-        return 0 if not t_data else (t_data[-1] + 1 / self.rate)
+    def _compute_t(self, raw_data: np.ndarray, first_index: int = 0) -> np.ndarray:
+        """Compute the time vector from the raw values of the csv file, starting at the sample first_index"""
+        return np.arange(first_index, first_index + raw_data.shape[0]) / self.rate
 
-    def _next_daytime(self, _: list, t_data) -> datetime.datetime:
-        return datetime.timedelta(seconds=t_data[-1]) + self.initial_t
+    def _to_daytime(self, t: np.ndarray) -> np.ndarray:
+        """Convert a time vector (in seconds from initial_t) to a datetime64 vector"""
+        return np.datetime64(self.initial_t, "us") + np.round(t * 1e6).astype("timedelta64[us]")
 
-    def _next_data(self, row) -> list[float]:
-        return self._to_float(row)
+    def _extract_data(self, raw_data: np.ndarray) -> np.ndarray:
+        """Extract the actual data from the raw values of the csv file"""
+        return raw_data
 
     @property
     def _has_rate(self) -> bool:
@@ -130,38 +378,151 @@ class EmpaticaReader(ABC):
         """Reads the acquisition rate from a row of the csv file"""
         return self._to_int(row)
 
-    def _read_csv_data(self) -> tuple[np.ndarray, list[datetime], np.ndarray]:
+    def _load_data(self) -> tuple[np.ndarray, np.ndarray]:
+        """Load the data from the raw cache if it is up to date, otherwise parse the csv file and cache it"""
+        if not self.use_raw_cache:
+            with profile("parse csv", self.path):
+                return self._read_csv_data()
+
+        with profile("read raw cache", self.path):
+            cached = self._read_raw_cache()
+        if cached is not None:
+            return cached
+
+        with profile("parse appended csv", self.path):
+            appended = self._read_appended_csv_data()
+        if appended is not None:
+            t_data, data = appended
+        else:
+            with profile("parse csv", self.path):
+                t_data, data = self._read_csv_data()
+        with profile("write raw cache", self.path):
+            self._write_raw_cache(t_data, data)
+        return t_data, data
+
+    @property
+    def _raw_cache_folder(self) -> str:
+        return f"{os.path.splitext(self.path)[0]}_raw"
+
+    def _read_raw_cache(self, allow_outdated: bool = False) -> tuple[np.ndarray, np.ndarray] | None:
+        """Memory map the cached t and data, or returns None if the cache is missing or older than the csv file"""
+        header_path = os.path.join(self._raw_cache_folder, "header.npy")
+        if not os.path.isfile(header_path):
+            return None
+        if not allow_outdated and os.path.getmtime(header_path) < os.path.getmtime(self.path):
+            return None
+
+        initial_time_stamp, rate = np.load(header_path)
+        if self._has_initial_time_stamp:
+            self.initial_t = datetime.datetime.fromtimestamp(int(initial_time_stamp))
+        if self._has_rate:
+            self.rate = int(rate)
+        t_data = np.load(os.path.join(self._raw_cache_folder, "t.npy"), mmap_mode="r")
+        data = np.load(os.path.join(self._raw_cache_folder, "data.npy"), mmap_mode="r")
+        return t_data, data
+
+    def _write_raw_cache(self, t_data: np.ndarray, data: np.ndarray) -> None:
+        """Save t and data next to the csv file. The header is written last so a partial cache is never read"""
+        try:
+            if not os.path.isdir(self._raw_cache_folder):
+                os.makedirs(self._raw_cache_folder)
+            np.save(os.path.join(self._raw_cache_folder, "t.npy"), t_data)
+            np.save(os.path.join(self._raw_cache_folder, "data.npy"), data)
+            header = (
+                self.initial_t.timestamp() if self.initial_t is not None else np.nan,
+                self.rate if self.rate is not None else np.nan,
+            )
+            with open(self.path, "rb") as file:
+                size, digest, _ = self._hash_file(file)
+            with open(os.path.join(self._raw_cache_folder, "source.txt"), "w") as file:
+                file.write(f"{size} {digest}")
+            np.save(os.path.join(self._raw_cache_folder, "header.npy"), np.array(header))
+        except OSError:
+            pass  # The cache is only an optimization, the csv file is parsed again next time
+
+    @staticmethod
+    def _hash_file(file, size: int = None, block_size: int = 1024 * 1024) -> tuple[int, str, bytes]:
+        """Compute the SHA-256 of the next size bytes of a binary file (up to its end if None), reading them in blocks
+        so the file is never in memory as a whole. Returns the number of bytes read, their digest and the last byte"""
+        digest = hashlib.sha256()
+        n_read, last_byte = 0, b""
+        while size is None or n_read < size:
+            block = file.read(block_size if size is None else min(block_size, size - n_read))
+            if not block:
+                break
+            digest.update(block)
+            n_read += len(block)
+            last_byte = block[-1:]
+        return n_read, digest.hexdigest(), last_byte
+
+    def _read_appended_csv_data(self) -> tuple[np.ndarray, np.ndarray] | None:
+        """If the csv file only grew since the raw cache was written, parse the appended rows only and concatenate
+        them to the cached data. Returns None if the cache is missing or if the beginning of the file changed"""
+        source_path = os.path.join(self._raw_cache_folder, "source.txt")
+        if not os.path.isfile(source_path):
+            return None
+        with open(source_path) as file:
+            size, digest = file.read().split()
+        size = int(size)
+        if os.path.getsize(self.path) <= size:
+            return None
+
+        with open(self.path, "rb") as file:
+            _, prefix_digest, last_byte = self._hash_file(file, size)
+            if last_byte != b"\n" or prefix_digest != digest:
+                return None
+            appended_rows = file.read().decode().splitlines()
+
+        cached = self._read_raw_cache(allow_outdated=True)
+        if cached is None:
+            return None
+        t_data, data = cached
+        raw_data = self._parse_csv_rows(appended_rows)
+        t_data = np.concatenate((t_data, self._compute_t(raw_data, first_index=t_data.shape[0])))
+        data = np.concatenate((data, self._extract_data(raw_data)))
+        return t_data, data
+
+    def _read_csv_data(self) -> tuple[np.ndarray, np.ndarray]:
         """Read data from a CSV file. The values must all collected at the same time at the same rate"""
-        daytime_data = []
-        t_data = []
-        data = []
         with open(self.path) as file:
-            read = csv.reader(file, delimiter="\n")
-            for row in read:
-                if not row:
-                    continue
-                if self.initial_t is None and self._has_initial_time_stamp:
-                    self.initial_t = self._read_initial_time_stamp(row)
-                elif self.rate is None and self._has_rate:
-                    self.rate = self._read_rate(row)
-                else:
-                    t_data.append(self._next_t(row, t_data))
-                    daytime_data.append(self._next_daytime(row, t_data))
-                    data.append(self._next_data(row))
-        return np.array(t_data), daytime_data, np.array(data)
+            self._read_csv_header(file)
+            raw_data = self._parse_csv_rows(file)
+
+        return self._compute_t(raw_data), self._extract_data(raw_data)
+
+    def _parse_csv_rows(self, rows) -> np.ndarray:
+        """Parse the numeric rows of the csv file (any iterable of lines) into a 2d array"""
+        return np.loadtxt(rows, delimiter=",", dtype=float, ndmin=2).reshape(-1, self.n_cols)
+
+    def _count_csv_samples(self) -> int:
+        """Count the data rows of the csv file without parsing them"""
+        with open(self.path) as file:
+            self._read_csv_header(file)
+            return sum(1 for line in file if line.strip())
+
+    def _read_csv_header(self, file) -> None:
+        """Read the header rows (initial time stamp and rate) leaving the file positioned on the first data row"""
+        rows = []
+        while len(rows) < int(self._has_initial_time_stamp) + int(self._has_rate):
+            line = file.readline()
+            if not line:
+                raise ValueError(f"The header of {self.path} is incomplete")
+            if line.strip():
+                rows.append([line.strip()])
+
+        if self._has_initial_time_stamp:
+            self.initial_t = self._read_initial_time_stamp(rows.pop(0))
+        if self._has_rate:
+            self.rate = self._read_rate(rows.pop(0))
 
     @staticmethod
     def _to_int(row: list[str]) -> int:
         """Convert a str to an int"""
         return int(row[0][: row[0].find(".")])
 
-    @staticmethod
-    def _to_float(row: list[str]) -> list[float]:
-        """Convert a str to a float"""
-        return [float(value) for value in row[0].split(",")]
-
     @staticmethod
     def _parse_name_and_date(path: str) -> tuple[str, str]:
-        subject = path.split("_")[0].split("\\")[-1]
-        date = path.split("_")[1]
+        file_name = os.path.basename(path.replace("\\", "/"))
+        subject = file_name.split("_")[0]
+        date = file_name.split("_")[1]
         return subject, date
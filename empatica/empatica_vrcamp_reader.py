@@ -1,153 +1,156 @@
 from abc import ABC
 import datetime
 
-import openpyxl
+import numpy as np
 
 from .empatica_reader import EmpaticaReader
 from .enums import ActivityType, ActivityTypeNotImplementedError
+from .profiler import profile
+from .timings_index import TimingsIndex
+from .window_features import sliding_windows, window_statistics
 
 
 class EmpaticaVrCampReader(EmpaticaReader, ABC):
-    def __init__(self, data_path: str, n_cols: int, timing_path: str):
-        super(EmpaticaVrCampReader, self).__init__(data_path, n_cols)
-        self.timings = self._parse_timings(timing_path)
-        self.vr_index, self.camp_index, self.baseline_index = self._parse_timings_indices()
+    # The columns of the timing file that delimit each activity, new protocols can add their own windows
+    activity_timing_columns: dict[ActivityType, tuple[str, str]] = {
+        ActivityType.VR: ("Time start VR", "Time end VR"),
+        ActivityType.Camp: ("Time start camp", "Time end camp"),
+        ActivityType.BASELINE: ("Time start baseline", "Time end baseline"),
+    }
+    # The width of the windows of window_features (in second)
+    feature_window: float = 60
+
+    def __init__(
+        self,
+        data_path: str,
+        n_cols: int,
+        timing_path: str,
+        timings_index: TimingsIndex = None,
+        streaming: bool = False,
+    ):
+        super(EmpaticaVrCampReader, self).__init__(data_path, n_cols, streaming=streaming)
+        if timings_index is None:
+            timings_index = TimingsIndex.from_file(timing_path)
+        with profile("parse timings", self.path):
+            self.timings = self._parse_timings(timings_index)
+        with profile("parse timings indices", self.path):
+            self.activity_indices = self._parse_timings_indices()
+
+    def activity_index(self, activity_type: ActivityType) -> tuple[int, int]:
+        """Get the first and last (excluded) indices of an activity"""
+        if activity_type not in self.activity_indices:
+            raise ActivityTypeNotImplementedError(activity_type)
+        return self.activity_indices[activity_type]
+
+    def _sample_range(self, activity_type: ActivityType = None) -> tuple[int, int]:
+        return (0, self.n_samples) if activity_type is None else self.activity_index(activity_type)
+
+    def chunks(self, activity_type: ActivityType = None, chunk_size: int = None):
+        """Yield (t, data) chunks covering an activity (the whole recording if None)"""
+        first, last = self._sample_range(activity_type)
+        return self.iter_chunks(first, last, chunk_size)
+
+    def window_features(
+        self, activity_type: ActivityType = None, width: float = None, step: float = None
+    ) -> dict[str, np.ndarray]:
+        """Compute the features of the windows of width seconds (feature_window if None), every step seconds (width if
+        None), of an activity (the whole recording if None). "t" is the time of the beginning of each window, the
+        other features have one row per window. The windows are strided views of the data, or of each chunk of it if
+        the reader streams, so the data are never copied"""
+        width = self.feature_window if width is None else width
+        step = width if step is None else step
+        n_samples, n_step = max(int(round(width * self.rate)), 1), max(int(round(step * self.rate)), 1)
+        first = 0 if activity_type is None else self.activity_index(activity_type)[0]
+
+        starts = []
+        features = []
+        for offset, windows in self._iter_windows(activity_type, n_samples, n_step):
+            starts.append(first + offset + np.arange(windows.shape[0]) * n_step)
+            features.append(self._window_features(windows))
+
+        if not features:
+            features.append(self._window_features(np.zeros((0, self.n_cols, n_samples))))
+        results = {"t": np.concatenate(starts) / self.rate if starts else np.zeros(0)}
+        for name in features[0]:
+            results[name] = np.concatenate([chunk[name] for chunk in features])
+        return results
+
+    def _iter_windows(self, activity_type: ActivityType, n_samples: int, n_step: int):
+        """Yield the index (in the activity) of the first window and the windows, of each chunk of the data"""
+        if self.t_data is not None:
+            yield 0, sliding_windows(self.data(activity_type), n_samples, n_step)
+            return
+
+        # The samples after the last full step of a chunk start the windows of the next one
+        offset = 0
+        remaining = None
+        chunk_size = n_step * max(self.default_chunk_size // n_step, 1)
+        for _, data in self.chunks(activity_type, chunk_size):
+            data = data if remaining is None else np.concatenate((remaining, data))
+            windows = sliding_windows(data, n_samples, n_step)
+            if windows.shape[0]:
+                yield offset, windows
+            remaining = data[windows.shape[0] * n_step :]
+            offset += windows.shape[0] * n_step
+
+    def _window_features(self, windows: np.ndarray) -> dict[str, np.ndarray]:
+        """Compute the features of windows of shape (n_windows, n_cols, n_samples)"""
+        return window_statistics(windows)
 
     def t(self, activity_type: ActivityType = None):
         if activity_type is None:
             return super(EmpaticaVrCampReader, self).t()
-        elif activity_type == ActivityType.Camp:
-            return self.t_data[self.camp_index[0] : self.camp_index[1]]
-        elif activity_type == ActivityType.VR:
-            return self.t_data[self.vr_index[0] : self.vr_index[1]]
-        elif activity_type == ActivityType.BASELINE:
-            return self.t_data[self.baseline_index[0]: self.baseline_index[1]]
-        else:
-            raise ActivityTypeNotImplementedError(activity_type)
+        self._check_in_memory()
+        first, last = self.activity_index(activity_type)
+        return self.t_data[first:last]
 
     def daytime(self, activity_type: ActivityType = None):
-        if activity_type is None:
-            return super(EmpaticaVrCampReader, self).daytime()
-        elif activity_type == ActivityType.Camp:
-            return self.daytime_data[self.camp_index[0] : self.camp_index[1]]
-        elif activity_type == ActivityType.VR:
-            return self.daytime_data[self.vr_index[0] : self.vr_index[1]]
-        elif activity_type == ActivityType.BASELINE:
-            return self.daytime_data[self.baseline_index[0]: self.baseline_index[1]]
-        else:
-            raise ActivityTypeNotImplementedError(activity_type)
+        return self._to_daytime(self.t(activity_type))
 
     def data(self, activity_type: ActivityType = None):
         if activity_type is None:
             return super(EmpaticaVrCampReader, self).data()
-        elif activity_type == ActivityType.Camp:
-            return self.actual_data[self.camp_index[0] : self.camp_index[1], :]
-        elif activity_type == ActivityType.VR:
-            return self.actual_data[self.vr_index[0] : self.vr_index[1], :]
-        elif activity_type == ActivityType.BASELINE:
-            return self.actual_data[self.baseline_index[0]: self.baseline_index[1], :]
-        else:
-            raise ActivityTypeNotImplementedError(activity_type)
+        self._check_in_memory()
+        first, last = self.activity_index(activity_type)
+        return self.actual_data[first:last, :]
 
     @property
     def longest_activity(self) -> ActivityType:
         """Find the longest activity"""
         current_length = -1
         current_activity = ActivityType.All
-        for activity in (ActivityType.BASELINE, ActivityType.Camp, ActivityType.BASELINE):
+        for activity in self.activity_indices:
             t = self.t(activity)
             if t[-1] - t[0] > current_length:
                 current_length = t[-1] - t[0]
                 current_activity = activity
         return current_activity
 
-    def _parse_timings(self, timing_filepath: str) -> tuple[datetime, ...]:
-        """Get the timing data for VR and Camp, based on the data in the timing file"""
-        desired_columns = (
-            "Time start VR",
-            "Time end VR",
-            "Time start camp",
-            "Time end camp",
-            "Time start baseline",
-            "Time end baseline",
-        )
-        worksheet = openpyxl.load_workbook(timing_filepath).active
-
-        is_header_parsed = False
-        is_subject_found = False
-        is_date_found = False
-        are_data_found = False
-        columns_mapping = []
-        timings = [None] * len(desired_columns)
-        for row in worksheet.iter_rows():
-            for i_col, col in enumerate(row):
-                if not is_header_parsed:
-                    if col.value in desired_columns:
-                        columns_mapping.append(i_col)
-                    continue  # Go to next column
-
-                if not is_subject_found:  # This assumes ID is before Date
-                    if col.value != self.subject:
-                        break  # We know we are not on the right row
-                    is_subject_found = True
-                    continue  # Go to next column
-
-                if not is_date_found:  # This assumes Date is before the data
-                    if str(col.value.date()) != self.date:
-                        is_subject_found = False
-                        break  # We know we are not on the right row
-                    is_date_found = True
-                    continue  # Go to next column
-
-                # From now on, the data are sorted according to the desired_columns
-                if i_col not in columns_mapping:
-                    continue  # Go to next column
-                are_data_found = True
-                timings[columns_mapping.index(i_col)] = col.value
-            is_header_parsed = True
-            if are_data_found:
-                break  # We already found the timings so no need to parse next rows
-
-        return tuple(timings)
-
-    def _parse_timings_indices(self) -> tuple[tuple[int, int], tuple[int, int], tuple[int, int]]:
-        """Split the data into VR and camp"""
-
-        vr_starting_index = -1
-        vr_ending_index = -1
-        camp_starting_index = -1
-        camp_ending_index = -1
-        baseline_starting_index = -1
-        baseline_ending_index = -1
-        for i, daytime in enumerate(self.daytime_data):
-            # Reminder, self.timings is organised as such: Time start VR, Time end VR, Time start camp,
-            # Time end camp, Time start baseline, Time end baseline
-            daytime_time = daytime.time()
-            if vr_starting_index < 0 and self.timings[0] < daytime_time:
-                vr_starting_index = i
-            elif vr_ending_index < 0 and self.timings[1] < daytime_time:
-                vr_ending_index = i
-            elif camp_starting_index < 0 and self.timings[2] < daytime_time:
-                camp_starting_index = i
-            elif camp_ending_index < 0 and self.timings[3] < daytime_time:
-                camp_ending_index = i
-            elif baseline_starting_index < 0 and self.timings[4] < daytime_time:
-                baseline_starting_index = i
-            elif baseline_ending_index < 0 and self.timings[5] < daytime_time:
-                baseline_ending_index = i
-
-        if (
-            vr_starting_index < 0
-            or vr_ending_index < 0
-            or camp_starting_index < 0
-            or camp_ending_index < 0
-            or baseline_starting_index < 0
-            or baseline_ending_index < 0
-        ):
+    def _parse_timings(self, timings_index: TimingsIndex) -> dict[ActivityType, tuple[datetime.time, datetime.time]]:
+        """Get the timing data for each activity, based on the data in the timing file"""
+        timings = timings_index.get(self.subject, self.date)
+        return {
+            activity: (timings.get(start_column), timings.get(end_column))
+            for activity, (start_column, end_column) in self.activity_timing_columns.items()
+        }
+
+    def _parse_timings_indices(self) -> dict[ActivityType, tuple[int, int]]:
+        """Find the first and last indices of each activity by a binary search of its timings in the time vector"""
+        boundaries = [boundary for timings in self.timings.values() for boundary in timings]
+        if any(boundary is None for boundary in boundaries):
+            raise ValueError("The timings could not be read for the current subject and date")
+
+        # The timings are times of the day, convert them to seconds since the beginning of the recording
+        offsets = [
+            (datetime.datetime.combine(self.initial_t.date(), boundary) - self.initial_t).total_seconds()
+            for boundary in boundaries
+        ]
+        if self.t_data is None:
+            # Streamed data are not in memory, but with a constant rate the time vector is simply arange(n) / rate
+            indices = np.clip(np.floor(np.array(offsets) * self.rate).astype(int) + 1, 0, None)
+        else:
+            indices = np.searchsorted(self.t_data, offsets, side="right")
+        if np.any(indices >= self.n_samples):
             raise ValueError("The timings could not be read for the current subject and date")
 
-        return (
-            (vr_starting_index, vr_ending_index),
-            (camp_starting_index, camp_ending_index),
-            (baseline_starting_index, baseline_ending_index),
-        )
+        return {activity: (int(indices[2 * i]), int(indices[2 * i + 1])) for i, activity in enumerate(self.timings)}
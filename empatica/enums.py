@@ -13,7 +13,7 @@ class DataTypeNotImplementedError(NotImplementedError):
         super(DataTypeNotImplementedError, self).__init__(f"This datatype ({data_type.value}) is not implemented yet")
 
 
-class DataTypeNotLoadedError(RuntimeError):
+class DataLoadingError(RuntimeError):
     pass
 
 
@@ -1,22 +1,48 @@
+import numpy as np
+
 from .empatica_vrcamp_reader import EmpaticaVrCampReader
 from .enums import ActivityType
+from .report_writer import ReportWriter
+from .timings_index import TimingsIndex
 
 
 class HrBpmReader(EmpaticaVrCampReader):
-    def __init__(self, data_path: str, timing_path: str):
-        super(HrBpmReader, self).__init__(data_path=data_path, timing_path=timing_path, n_cols=1)
+    table_value_names = ("mean_hr", "std_hr", "min_hr", "max_hr")
+
+    def __init__(self, data_path: str, timing_path: str, timings_index: TimingsIndex = None):
+        super(HrBpmReader, self).__init__(
+            data_path=data_path, timing_path=timing_path, n_cols=1, timings_index=timings_index
+        )
 
     def extra_labels(self) -> tuple[str, ...]:
         return ("hr bpm",)
 
     def _table_columns(self) -> str:
-        raise NotImplementedError("No table was implemented for HrBpmReader data")
+        return "r|cccc"
 
-    def get_table_value(self, activity_type: ActivityType = ActivityType.All, **options) -> tuple:
-        raise NotImplementedError("No table was implemented for HrBpmReader data")
+    def _print_table_header(self, report: ReportWriter) -> None:
+        report.write_line(
+            r"   Type of activity & \makecell{Mean heart\\rate (bpm)} & \makecell{Mean std of the\\heart rate (bpm)} "
+            r"& \makecell{Mean min of the\\heart rate (bpm)} & \makecell{Mean max of the\\heart rate (bpm)} \\"
+        )
 
-    def _print_table_header(self) -> None:
-        raise NotImplementedError("No table was implemented for HrBpmReader data")
+    def get_table_value(self, activity_type: ActivityType = ActivityType.All, **options) -> tuple:
+        """The means over the windows (see window_features) of the activity"""
+        features = self.window_features(activity_type, **options)
+        return tuple(float(np.nanmean(features[name])) for name in ("mean", "std", "min", "max"))
 
-    def print_table(self, activity_type: ActivityType = ActivityType.All, **options) -> None:
-        raise NotImplementedError("No table was implemented for HrBpmReader data")
+    def print_table(
+        self,
+        activity_type: ActivityType = ActivityType.All,
+        values: tuple = None,
+        report: ReportWriter = None,
+        **options,
+    ) -> None:
+        report = ReportWriter.stdout() if report is None else report
+        if values is None:
+            mean_hr, std_hr, min_hr, max_hr = self.get_table_value(activity_type, **options)
+        else:
+            mean_hr, std_hr, min_hr, max_hr = values
+        report.write_line(
+            rf"   {activity_type.value} & {mean_hr:0.1f} & {std_hr:0.2f} & {min_hr:0.1f} & {max_hr:0.1f} \\"
+        )
@@ -1,31 +1,78 @@
+import numpy as np
+
 from .empatica_vrcamp_reader import EmpaticaVrCampReader
 from .enums import ActivityType
+from .report_writer import ReportWriter
+from .timings_index import TimingsIndex
+from .window_features import interbeat_statistics
 
 
 class HrIbiReader(EmpaticaVrCampReader):
-    def __init__(self, data_path: str, timing_path: str):
-        super(HrIbiReader, self).__init__(data_path=data_path, n_cols=2, timing_path=timing_path)
+    table_value_names = ("mean_ibi", "sdnn", "rmssd", "beats_per_window")
+
+    def __init__(self, data_path: str, timing_path: str, timings_index: TimingsIndex = None):
+        super(HrIbiReader, self).__init__(
+            data_path=data_path, n_cols=2, timing_path=timing_path, timings_index=timings_index
+        )
 
     def extra_labels(self) -> tuple[str, ...]:
         return ("hr ibi",)
 
+    @property
     def _has_rate(self) -> bool:
         return False
 
-    def _next_t(self, row, t_data) -> float:
-        return self._to_float(row)[0]
+    def _compute_t(self, raw_data: np.ndarray, first_index: int = 0) -> np.ndarray:
+        return raw_data[:, 0]
+
+    def _extract_data(self, raw_data: np.ndarray) -> np.ndarray:
+        return raw_data[:, 1:2]
 
-    def _next_data(self, row) -> list[float]:
-        return [super(HrIbiReader, self)._next_data(row)[1]]
+    def window_features(
+        self, activity_type: ActivityType = None, width: float = None, step: float = None
+    ) -> dict[str, np.ndarray]:
+        """The interbeats are irregular, so the windows are in time rather than in number of samples. The features
+        are the mean interbeat interval, SDNN and RMSSD (in ms) and the number of beats of each window"""
+        width = self.feature_window if width is None else width
+        step = width if step is None else step
+        t = np.asarray(self.t(activity_type))
+        starts = np.arange(t[0], t[-1] - width + 1e-9, step) if t.shape[0] else np.zeros(0)
+        features = interbeat_statistics(t, np.asarray(self.data(activity_type))[:, 0], starts, width)
+        return {
+            "t": starts,
+            "mean": features["mean"] * 1000,
+            "sdnn": features["sdnn"] * 1000,
+            "rmssd": features["rmssd"] * 1000,
+            "n_beats": features["n_beats"],
+        }
 
     def _table_columns(self) -> str:
-        raise NotImplementedError("No table was implemented for HrIbiReader data")
+        return "r|cccc"
 
-    def get_table_value(self, activity_type: ActivityType = ActivityType.All, **options) -> tuple:
-        raise NotImplementedError("No table was implemented for HrIbiReader data")
+    def _print_table_header(self, report: ReportWriter) -> None:
+        report.write_line(
+            r"   Type of activity & \makecell{Mean interbeat\\interval (\SI{}{\milli\second})} "
+            r"& \makecell{Mean SDNN\\(\SI{}{\milli\second})} & \makecell{Mean RMSSD\\(\SI{}{\milli\second})} "
+            r"& \makecell{Mean number of\\beats per window} \\"
+        )
 
-    def _print_table_header(self) -> None:
-        raise NotImplementedError("No table was implemented for HrIbiReader data")
+    def get_table_value(self, activity_type: ActivityType = ActivityType.All, **options) -> tuple:
+        """The means over the windows (see window_features) of the activity"""
+        features = self.window_features(activity_type, **options)
+        return tuple(float(np.nanmean(features[name])) for name in ("mean", "sdnn", "rmssd", "n_beats"))
 
-    def print_table(self, activity_type: ActivityType = ActivityType.All, **options) -> None:
-        raise NotImplementedError("No table was implemented for HrIbiReader data")
+    def print_table(
+        self,
+        activity_type: ActivityType = ActivityType.All,
+        values: tuple = None,
+        report: ReportWriter = None,
+        **options,
+    ) -> None:
+        report = ReportWriter.stdout() if report is None else report
+        if values is None:
+            mean_ibi, sdnn, rmssd, n_beats = self.get_table_value(activity_type, **options)
+        else:
+            mean_ibi, sdnn, rmssd, n_beats = values
+        report.write_line(
+            rf"   {activity_type.value} & {mean_ibi:0.1f} & {sdnn:0.1f} & {rmssd:0.1f} & {n_beats:0.1f} \\"
+        )
@@ -0,0 +1,95 @@
+import numpy as np
+from numpy.lib import recfunctions
+
+from .enums import ActivityType, DataType
+
+
+class MetricsTable:
+    # The columns that identify a recording, the table can be grouped by any of them
+    key_names: tuple[str, ...] = ("subject", "date", "activity")
+
+    def __init__(self, metric_names: tuple[str, ...], rows: list[tuple[str, str, str, tuple[float, ...]]] = ()):
+        """Collect the metrics (values of get_table_value) of each (subject, date, activity) in a structured array"""
+        self.metric_names = tuple(metric_names)
+        dtype = [(name, "U32") for name in self.key_names] + [("values", float, (len(self.metric_names),))]
+        self.data = np.array([tuple(row) for row in rows], dtype=dtype)
+
+    @classmethod
+    def from_subjects(
+        cls,
+        subjects,
+        data_type: DataType,
+        activity_types: tuple[ActivityType, ...],
+        date_indices: tuple[int, ...] = None,
+    ) -> "MetricsTable":
+        """Compute the metrics of every recording of the subjects (any iterable of Subject), once"""
+        rows = []
+        metric_names = None
+        for subject in subjects:
+            data = subject.data(data_type)
+            for date in range(subject.n_dates) if date_indices is None else date_indices:
+                if metric_names is None:
+                    metric_names = data[date].table_value_names
+                for activity_type in activity_types:
+                    values = data[date].get_table_value(activity_type)
+                    rows.append((subject.id_number, subject.dates[date], activity_type.value, values))
+        return cls(metric_names if metric_names is not None else (), rows)
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def get(self, subject: str, date: str, activity_type: ActivityType) -> tuple[float, ...]:
+        """Get the metrics of one recording"""
+        mask = (
+            (self.data["subject"] == subject)
+            & (self.data["date"] == date)
+            & (self.data["activity"] == activity_type.value)
+        )
+        if not np.any(mask):
+            raise KeyError(f"No metrics for subject {subject} on date {date} during {activity_type.value}")
+        return tuple(self.data["values"][np.argmax(mask)])
+
+    def column(self, metric_name: str) -> np.ndarray:
+        """Get all the values of a metric"""
+        return self.data["values"][:, self.metric_names.index(metric_name)]
+
+    def reduce(
+        self, by: tuple[str, ...] = ("activity",), reduction: str = "mean", percentile: float = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Reduce the metrics of the recordings sharing the same values of the key columns in by (an empty by reduces
+        the whole table). reduction is one of "mean", "median", "std", "count" or "percentile" (then percentile, in
+        [0, 100], must be given). Returns the keys of each group (a structured array) and the reduced values"""
+        if any(name not in self.key_names for name in by):
+            raise ValueError(f"by must only contain {self.key_names}")
+
+        values = self.data["values"]
+        if by:
+            keys, inverse = np.unique(recfunctions.repack_fields(self.data[list(by)]), return_inverse=True)
+            inverse = inverse.ravel()
+        else:
+            keys, inverse = np.zeros(1 if len(self) else 0, dtype=[]), np.zeros(len(self), dtype=int)
+        n_groups = keys.shape[0]
+        if n_groups == 0:
+            return keys, np.zeros((0, values.shape[1]))
+
+        counts = np.bincount(inverse, minlength=n_groups).astype(float)
+        if reduction == "count":
+            return keys, np.repeat(counts[:, np.newaxis], values.shape[1], axis=1)
+        if reduction in ("mean", "std"):
+            sums = np.zeros((n_groups, values.shape[1]))
+            np.add.at(sums, inverse, values)
+            means = sums / counts[:, np.newaxis]
+            if reduction == "mean":
+                return keys, means
+            squares = np.zeros((n_groups, values.shape[1]))
+            np.add.at(squares, inverse, (values - means[inverse]) ** 2)
+            return keys, np.sqrt(squares / counts[:, np.newaxis])
+        if reduction in ("median", "percentile"):
+            if reduction == "median":
+                percentile = 50
+            elif percentile is None:
+                raise ValueError("percentile must be given for the percentile reduction")
+            order = np.argsort(inverse, kind="stable")
+            groups = np.split(values[order], np.cumsum(counts[:-1]).astype(int))
+            return keys, np.array([np.percentile(group, percentile, axis=0) for group in groups])
+        raise ValueError(f"Unknown reduction ({reduction})")
@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+
+from .eda_reader import EdaReader
+from .empatica_vrcamp_reader import EmpaticaVrCampReader
+from .enums import DataType
+
+
+class ParquetExporter:
+    # The name of the files written in each partition
+    signal_file_name: str = "signal.parquet"
+    peaks_file_name: str = "peaks.parquet"
+
+    def __init__(self, folder: str, chunk_size: int = None, compression: str = "zstd"):
+        """Write the readers into a dataset of parquet files partitioned (hive style) by subject, date and modality,
+        i.e. <folder>/subject=<id>/date=<date>/modality=<data type>/. The signals are written one chunk (a row group)
+        at a time, so the memory does not depend on the length of the recordings"""
+        # Imported here so the package can run without pyarrow when nothing is exported
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("pyarrow must be installed to export to parquet (conda install pyarrow)") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+
+        self.folder = folder
+        self.chunk_size = chunk_size  # None uses the default chunk size of each reader
+        self.compression = compression
+
+    def partition(self, subject: str, date: str, data_type: DataType) -> str:
+        """Get the folder of a partition"""
+        return os.path.join(self.folder, f"subject={subject}", f"date={date}", f"modality={data_type.value}")
+
+    def export(self, reader: EmpaticaVrCampReader, data_type: DataType) -> list[str]:
+        """Write the signal of a reader (and its peaks for EDA), returns the paths of the written files"""
+        partition = self.partition(reader.subject, reader.date, data_type)
+        os.makedirs(partition, exist_ok=True)
+        paths = [self._write_signal(reader, data_type, os.path.join(partition, self.signal_file_name))]
+        if isinstance(reader, EdaReader):
+            paths.append(self._write_peaks(reader, os.path.join(partition, self.peaks_file_name)))
+        return paths
+
+    def _write_signal(self, reader: EmpaticaVrCampReader, data_type: DataType, path: str) -> str:
+        """Write t, the time of the day, the activity of each sample and the data columns of a reader. A reader without
+        samples is written as an empty table, so every exported partition has its file"""
+        labels = reader.extra_labels()
+        names = [data_type.value] if len(labels) == 1 else [f"{data_type.value}_{label}" for label in labels]
+        activities = self._pa.array([activity.value for activity in reader.activity_indices], type=self._pa.string())
+
+        writer = None
+        first = 0
+        try:
+            for t, data in reader.iter_chunks(chunk_size=self.chunk_size):
+                table = self._signal_table(reader, t, data, first, names, activities)
+                if writer is None:
+                    writer = self._pq.ParquetWriter(path, table.schema, compression=self.compression)
+                writer.write_table(table)
+                first += t.shape[0]
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            table = self._signal_table(reader, np.zeros(0), np.zeros((0, reader.n_cols)), 0, names, activities)
+            self._pq.write_table(table, path, compression=self.compression)
+        return path
+
+    def _signal_table(
+        self, reader: EmpaticaVrCampReader, t: np.ndarray, data: np.ndarray, first: int, names: list[str], activities
+    ):
+        """Build the table of a chunk of samples starting at the sample first"""
+        columns = {
+            "t": self._pa.array(t, type=self._pa.float64()),
+            "daytime": self._pa.array(reader._to_daytime(t), type=self._pa.timestamp("us")),
+            "activity": self._activity_column(reader, first, t.shape[0], activities),
+        }
+        columns.update({name: self._pa.array(data[:, i], type=self._pa.float64()) for i, name in enumerate(names)})
+        return self._pa.table(columns)
+
+    def _activity_column(self, reader: EmpaticaVrCampReader, first: int, n_samples: int, activities):
+        """Label the samples [first, first + n_samples[ with their activity (null outside of the activities)"""
+        codes = np.full(n_samples, -1, dtype=np.int8)
+        for code, (start, end) in enumerate(reader.activity_indices.values()):
+            codes[max(start - first, 0) : max(min(end - first, n_samples), 0)] = code
+        indices = self._pa.array(codes, mask=codes < 0, type=self._pa.int8())
+        return self._pa.DictionaryArray.from_arrays(indices, activities)
+
+    def _write_peaks(self, reader: EdaReader, path: str) -> str:
+        """Write one row per EDA peak, for every activity"""
+        activities, index, t, value, segment = [], [], [], [], []
+        for activity in reader.activity_indices:
+            arrays = reader.peak_arrays(activity)
+            activities.append(np.full(arrays["index"].shape[0], activity.value))
+            index.append(arrays["index"] + reader.activity_index(activity)[0])  # in the recording
+            t.append(arrays["t"])
+            value.append(arrays["value"])
+            segment.append(arrays["segment"])
+
+        t = np.concatenate(t)
+        table = self._pa.table(
+            {
+                "activity": self._pa.array(np.concatenate(activities), type=self._pa.string()),
+                "index": self._pa.array(np.concatenate(index), type=self._pa.int64()),
+                "t": self._pa.array(t, type=self._pa.float64()),
+                "daytime": self._pa.array(reader._to_daytime(t), type=self._pa.timestamp("us")),
+                "value": self._pa.array(np.concatenate(value), type=self._pa.float64()),
+                "segment": self._pa.array(np.concatenate(segment), type=self._pa.int64()),
+            }
+        )
+        self._pq.write_table(table, path, compression=self.compression)
+        return path
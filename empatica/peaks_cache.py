@@ -0,0 +1,73 @@
+import hashlib
+import os
+import pickle
+
+import numpy as np
+
+
+class PeaksCache:
+    # Bump when the layout of the cached peaks changes, so stale entries are never read back
+    version = 1
+
+    def __init__(self, folder: str, max_size: int = 50 * 1024 * 1024):
+        self.folder = folder
+        self.max_size = max_size  # in bytes, the oldest entries are evicted when the folder grows larger
+
+    @classmethod
+    def key(cls, data: np.ndarray, baseline_value: float, segment_width: float, rate: int, **parameters) -> str:
+        """Compute the key of the peaks of a signal processed with a given set of parameters"""
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(data, dtype=float).tobytes())
+        digest.update(repr((cls.version, baseline_value, segment_width, rate, sorted(parameters.items()))).encode())
+        return digest.hexdigest()
+
+    def load(self, key: str):
+        """Get the peaks stored under key, or None if they are not in the cache"""
+        path = self._entry_path(key)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "rb") as file:
+                peaks = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None  # A corrupted entry is simply recomputed
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass  # A read-only cache is still read
+        return peaks
+
+    def save(self, key: str, peaks) -> None:
+        """Store the peaks under key, evicting the least recently used entries if the cache is too large. Nothing is
+        stored if the folder cannot be written (read-only or full)"""
+        path = self._entry_path(key)
+        try:
+            if not os.path.isdir(self.folder):
+                os.makedirs(self.folder)
+            with open(path, "wb") as file:
+                pickle.dump(peaks, file)
+            self._evict(keep=key)
+        except OSError:
+            # The cache is only an optimization, the peaks are computed again next time. A partial entry would be
+            # ignored when read back, but is removed if possible so it does not take space
+            if os.path.isfile(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.folder, f"{key}.pyeda")
+
+    def _evict(self, keep: str) -> None:
+        """Remove the least recently used entries (except keep) until the cache fits in max_size"""
+        entries = [entry for entry in os.scandir(self.folder) if entry.name.endswith(".pyeda")]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if size <= self.max_size:
+                break
+            if entry.path == self._entry_path(keep):
+                continue
+            size -= entry.stat().st_size
+            os.remove(entry.path)
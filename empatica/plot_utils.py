@@ -1,21 +1,156 @@
+from concurrent.futures import ProcessPoolExecutor
 import os
+from typing import NamedTuple
 
 from matplotlib import pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
 
 from .enums import DataType
+from .profiler import profile
+
+
+class LineSpec(NamedTuple):
+    """A line of a figure, as the arguments of ax.plot"""
+
+    x: np.ndarray | list
+    y: np.ndarray
+    options: dict  # color, linestyle, marker, label, ...
+
+
+class FigureSpec(NamedTuple):
+    """Everything needed to render a figure to a file, without any matplotlib object so it can be sent to a worker"""
+
+    path: str
+    lines: list[LineSpec]
+    title: str = ""
+    x_label: str = ""
+    y_label: str = ""
+    x_lim: tuple[float, float] | None = None  # None for automatic limits
+    y_lim: tuple[float, float] | None = None
+    legend: bool = True
+    size: tuple[float, float] = (16, 9)  # in inches
+    dpi: int = 300
+
+    @staticmethod
+    def can_describe(fig: plt.figure) -> bool:
+        """If a spec holds everything drawn on a figure, that is a single axes (on linear scales) with only lines"""
+        axes = fig.get_axes()
+        if len(axes) != 1:
+            return False
+        ax = axes[0]
+        drawn = (ax.collections, ax.patches, ax.images, ax.texts, ax.tables, fig.legends, fig.texts, fig.images)
+        return (
+            not any(drawn) and ax.get_legend() is None and ax.get_xscale() == "linear" and ax.get_yscale() == "linear"
+        )
+
+    @classmethod
+    def from_figure(cls, fig: plt.figure, path: str, **options) -> "FigureSpec":
+        """Describe the lines and the labels of a figure, which must have a single axes with only lines (see
+        can_describe), otherwise a ValueError is raised"""
+        if not cls.can_describe(fig):
+            raise ValueError("Only the figures with a single axes holding lines can be described")
+        ax = fig.gca()
+        lines = [
+            LineSpec(
+                x=line.get_xdata(orig=True),
+                y=np.asarray(line.get_ydata(orig=True)),
+                options={
+                    "color": line.get_color(),
+                    "linestyle": line.get_linestyle(),
+                    "linewidth": line.get_linewidth(),
+                    "marker": line.get_marker(),
+                    "markersize": line.get_markersize(),
+                    "alpha": line.get_alpha(),
+                    "label": line.get_label(),
+                },
+            )
+            for line in ax.get_lines()
+        ]
+        return cls(
+            path=path,
+            lines=lines,
+            title=ax.get_title(),
+            x_label=ax.get_xlabel(),
+            y_label=ax.get_ylabel(),
+            x_lim=None if ax.get_autoscalex_on() else ax.get_xlim(),
+            y_lim=None if ax.get_autoscaley_on() else ax.get_ylim(),
+            **options,
+        )
+
+
+def _render_figure(spec: FigureSpec) -> str:
+    """Render a figure spec with the Agg canvas, which needs no display and leaves pyplot untouched"""
+    fig = Figure(figsize=spec.size)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for line in spec.lines:
+        ax.plot(line.x, line.y, **line.options)
+    ax.set_title(spec.title)
+    ax.set_xlabel(spec.x_label)
+    ax.set_ylabel(spec.y_label)
+    if spec.x_lim is not None:
+        ax.set_xlim(spec.x_lim)
+    if spec.y_lim is not None:
+        ax.set_ylim(spec.y_lim)
+    if spec.legend:
+        fig.legend()
+
+    os.makedirs(os.path.dirname(spec.path) or ".", exist_ok=True)
+    fig.savefig(spec.path, dpi=spec.dpi)
+    return spec.path
 
 
 class PlotUtils:
+    # The size (in inches) and resolution of the saved figures
+    figure_size: tuple[float, float] = (16, 9)
+    dpi: int = 300
+
     @staticmethod
     def savefig(path_folder: str, fig: plt.figure, data_type: DataType, postfix: str = ""):
         if fig is None:
             return
 
         fig.legend()
-        fig.set_size_inches(16, 9)
+        fig.set_size_inches(*PlotUtils.figure_size)
         if not os.path.isdir(path_folder):
             os.mkdir(path_folder)
-        fig.savefig(f"{path_folder}/{data_type.value}{('_' + postfix) if postfix else ''}.png", dpi=300)
+        path = PlotUtils.figure_path(path_folder, data_type, postfix)
+        with profile("save figure", path):
+            fig.savefig(path, dpi=PlotUtils.dpi)
+
+    @staticmethod
+    def figure_path(path_folder: str, data_type: DataType, postfix: str = "") -> str:
+        """Get the path savefig writes a figure to"""
+        return f"{path_folder}/{data_type.value}{('_' + postfix) if postfix else ''}.png"
+
+    @staticmethod
+    def figure_spec(path_folder: str, fig: plt.figure, data_type: DataType, postfix: str = "") -> FigureSpec | None:
+        """Describe a figure to render it later with render_figures, at the path savefig would write it to. A figure
+        that cannot be described (see FigureSpec.can_describe) is saved right away with savefig and None is returned"""
+        if fig is None:
+            return None
+        if not FigureSpec.can_describe(fig):
+            PlotUtils.savefig(path_folder, fig, data_type, postfix)
+            return None
+        return FigureSpec.from_figure(
+            fig, PlotUtils.figure_path(path_folder, data_type, postfix), size=PlotUtils.figure_size, dpi=PlotUtils.dpi
+        )
+
+    @staticmethod
+    def render_figures(specs: list[FigureSpec | None, ...], n_workers: int = None) -> dict[str, str]:
+        """Render figure specs to their files, in a pool of n_workers processes (None uses all the cores, 1 renders
+        them in the current process). The None specs are skipped. Returns the path of each figure, indexed by its
+        file name without extension"""
+        specs = [spec for spec in specs if spec is not None]
+        with profile("render figures"):
+            if n_workers == 1 or len(specs) < 2:
+                paths = [_render_figure(spec) for spec in specs]
+            else:
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    paths = list(executor.map(_render_figure, specs))
+        return {os.path.splitext(os.path.basename(path))[0]: path for path in paths}
 
     @staticmethod
     def add_legend(fig: plt.figure):
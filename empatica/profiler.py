@@ -0,0 +1,155 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class Profiler:
+    # The profiler that collects the stages, None when profiling is off (the default)
+    active: "Profiler | None" = None
+
+    def __init__(self, track_memory: bool = False):
+        """Collect the time (and the memory if track_memory) spent in each stage of the loading pipeline, per stage
+        and per file. Only the stages run in the current process are collected (not the ones of the workers)"""
+        self.track_memory = track_memory
+        self.stages: dict[tuple[str, str], dict[str, float]] = {}
+        self.counters: dict[tuple[str, str], float] = {}
+        self.events: list[dict] = []
+
+        self._lock = threading.Lock()
+        self._stack = threading.local()
+        self._origin = time.perf_counter()
+        self._previous: Profiler | None = None
+        self._started_tracemalloc = False
+
+    def start(self) -> "Profiler":
+        """Make this profiler the active one"""
+        self._previous = Profiler.active
+        Profiler.active = self
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self
+
+    def stop(self) -> None:
+        """Restore the profiler that was active before start"""
+        Profiler.active = self._previous
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, path: str = None):
+        """Time the body of the with statement as the stage name on the file path (or any other label)"""
+        stack = self._stack.__dict__.setdefault("frames", [])
+        memory = self._enter_memory(stack)
+        tic = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - tic
+            peak_memory = self._exit_memory(stack, memory)
+            self._record(name, path, tic, elapsed, peak_memory)
+
+    def count(self, name: str, value: float = 1, path: str = None) -> None:
+        """Add value to the counter name of the file path"""
+        with self._lock:
+            key = (name, "" if path is None else os.path.basename(path))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def _enter_memory(self, stack: list) -> list | None:
+        if not self.track_memory or not tracemalloc.is_tracing():
+            return None
+        # The peak so far belongs to the enclosing stage, the counter is reset to measure the peak of this one
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, 0]
+        stack.append(frame)
+        return frame
+
+    def _exit_memory(self, stack: list, frame: list | None) -> float:
+        if frame is None or not tracemalloc.is_tracing():
+            return 0
+        peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+        stack.pop()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        return peak - frame[0]
+
+    def _record(self, name: str, path: str | None, tic: float, elapsed: float, peak_memory: float) -> None:
+        file_name = "" if path is None else os.path.basename(path)
+        with self._lock:
+            stage = self.stages.setdefault((name, file_name), {"calls": 0, "time": 0.0, "peak_memory": 0.0})
+            stage["calls"] += 1
+            stage["time"] += elapsed
+            stage["peak_memory"] = max(stage["peak_memory"], peak_memory)
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (tic - self._origin) * 1e6,
+                    "dur": elapsed * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {"file": file_name, "peak_memory": peak_memory},
+                }
+            )
+
+    def per_stage(self) -> dict[str, dict[str, float]]:
+        """Aggregate the stages of all the files"""
+        stages = {}
+        for (name, _), values in self.stages.items():
+            stage = stages.setdefault(name, {"calls": 0, "time": 0.0, "peak_memory": 0.0})
+            stage["calls"] += values["calls"]
+            stage["time"] += values["time"]
+            stage["peak_memory"] = max(stage["peak_memory"], values["peak_memory"])
+        return stages
+
+    def summary(self, per_file: bool = False) -> str:
+        """Get a report of the time (and memory) spent in each stage, sorted by total time. The time of a stage
+        includes the stages nested in it (e.g. "load readers" includes "parse csv")"""
+        if per_file:
+            rows = {f"{name} [{file_name}]" if file_name else name: v for (name, file_name), v in self.stages.items()}
+        else:
+            rows = self.per_stage()
+        width = max((len(name) for name in rows), default=5)
+        lines = [
+            f"{'stage':<{width}}  {'calls':>6}  {'time (s)':>10}" + ("  peak memory (MiB)" if self.track_memory else "")
+        ]
+        for name, values in sorted(rows.items(), key=lambda item: -item[1]["time"]):
+            line = f"{name:<{width}}  {values['calls']:>6}  {values['time']:>10.4f}"
+            if self.track_memory:
+                line += f"  {values['peak_memory'] / 2**20:>17.1f}"
+            lines.append(line)
+        for (name, path), value in sorted(self.counters.items()):
+            lines.append(f"{name}{f' [{path}]' if path else ''}: {value:g}")
+        return "\n".join(lines)
+
+    def save_trace(self, path: str) -> None:
+        """Save the stages as a JSON trace (Trace Event Format, readable by chrome://tracing or Perfetto)"""
+        counters = [{"name": name, "file": file, "value": value} for (name, file), value in self.counters.items()]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.events, "counters": counters}, file)
+
+
+def profile(name: str, path: str = None):
+    """Time a stage with the active profiler, does nothing when profiling is off"""
+    if Profiler.active is None:
+        return contextlib.nullcontext()
+    return Profiler.active.stage(name, path)
+
+
+def count(name: str, value: float = 1, path: str = None) -> None:
+    """Add value to a counter of the active profiler, does nothing when profiling is off"""
+    if Profiler.active is not None:
+        Profiler.active.count(name, value, path)
@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+
+
+class Pyramid:
+    # The levels are built until the coarsest one has less than twice that number of blocks
+    min_blocks: int = 256
+
+    def __init__(self, levels: list[np.ndarray, ...]):
+        """Level of detail of a signal. levels[k - 1] holds the min, max and mean of the blocks of 2**k samples, in an
+        array of shape (n_blocks, 3, n_cols), the level 0 being the signal itself"""
+        self.levels = levels
+
+    @property
+    def n_levels(self) -> int:
+        return len(self.levels)
+
+    @classmethod
+    def n_levels_for(cls, n_samples: int) -> int:
+        """Get the number of levels of the pyramid of n_samples samples"""
+        n_levels = 0
+        while n_samples / 2 ** (n_levels + 1) >= cls.min_blocks:
+            n_levels += 1
+        return n_levels
+
+    @classmethod
+    def build(cls, data: np.ndarray, n_levels: int = None) -> "Pyramid":
+        """Compute the levels of data (one row per sample), n_levels_for its number of samples if None. Each level is
+        reduced from the previous one, the last block of a level being shorter if the number of samples is not a
+        multiple of its size"""
+        n_samples = data.shape[0]
+        n_levels = cls.n_levels_for(n_samples) if n_levels is None else n_levels
+        cumulative = np.concatenate((np.zeros((1, data.shape[1])), np.cumsum(data, axis=0)))
+        minimum, maximum = data, data
+        size = 1
+        levels = []
+        for _ in range(n_levels):
+            size *= 2
+            if minimum.shape[0] % 2:
+                minimum = np.concatenate((minimum, minimum[-1:]))
+                maximum = np.concatenate((maximum, maximum[-1:]))
+            minimum = np.minimum(minimum[0::2], minimum[1::2])
+            maximum = np.maximum(maximum[0::2], maximum[1::2])
+
+            # The means are computed from the samples, so the shorter blocks are not biased
+            starts = np.arange(0, n_samples, size)
+            ends = np.minimum(starts + size, n_samples)
+            mean = (cumulative[ends] - cumulative[starts]) / (ends - starts)[:, np.newaxis]
+            levels.append(np.stack((minimum, maximum, mean), axis=1))
+        return cls(levels)
+
+    @classmethod
+    def build_from_chunks(cls, chunks, n_samples: int, n_cols: int, folder: str = None) -> "Pyramid":
+        """Compute the levels of data given as consecutive chunks (n_samples in total), whose sizes are multiples of
+        chunk_multiple(n_samples) except for the last one, so no block spans two chunks. If folder is not None, the
+        levels are written to memory mapped files there (see save) as they are computed, otherwise they are kept in
+        memory. Either way, only one chunk is read at a time"""
+        n_levels = cls.n_levels_for(n_samples)
+        if folder is not None:
+            cls._clear(folder)
+        levels = []
+        for k in range(1, n_levels + 1):
+            shape = (-(-n_samples // 2**k), 3, n_cols)
+            if folder is None:
+                levels.append(np.empty(shape))
+            else:
+                levels.append(np.lib.format.open_memmap(os.path.join(folder, f"level_{k}.npy"), mode="w+", shape=shape))
+
+        offset = 0
+        for chunk in chunks:
+            for k, level in enumerate(cls.build(chunk, n_levels).levels, start=1):
+                levels[k - 1][offset // 2**k : offset // 2**k + level.shape[0]] = level
+            offset += chunk.shape[0]
+
+        if folder is not None:
+            for level in levels:
+                level.flush()
+            cls._write_n_levels(folder, n_levels)
+        return cls(levels)
+
+    @classmethod
+    def chunk_multiple(cls, n_samples: int) -> int:
+        """The number of samples the chunks given to build_from_chunks must be a multiple of"""
+        return 2 ** cls.n_levels_for(n_samples)
+
+    def level_for(self, n_samples: int, n_pixels: int) -> int:
+        """Get the coarsest level that still has a block per pixel when n_samples samples are displayed"""
+        if n_samples <= n_pixels:
+            return 0
+        return int(min(np.floor(np.log2(n_samples / max(n_pixels, 1))), self.n_levels))
+
+    def envelope(self, level: int, first: int, last: int) -> tuple[np.ndarray, np.ndarray]:
+        """Get the index of the first sample of each block covering the samples first to last (excluded) at a level
+        (above 0) and the min and max of these blocks, interleaved (min then max of each block)"""
+        size = 2**level
+        blocks = self.levels[level - 1][first // size : -(-last // size)]
+        indices = np.repeat(np.arange(first // size, first // size + blocks.shape[0]) * size, 2)
+        return indices, blocks[:, :2, :].reshape(-1, blocks.shape[2])
+
+    def save(self, folder: str) -> None:
+        """Save each level as a .npy file. The number of levels is written last so a partial pyramid is never read"""
+        self._clear(folder)
+        for k, level in enumerate(self.levels):
+            np.save(os.path.join(folder, f"level_{k + 1}.npy"), level)
+        self._write_n_levels(folder, self.n_levels)
+
+    @staticmethod
+    def _clear(folder: str) -> None:
+        os.makedirs(folder, exist_ok=True)
+        for entry in os.scandir(folder):
+            os.remove(entry.path)
+
+    @staticmethod
+    def _write_n_levels(folder: str, n_levels: int) -> None:
+        with open(os.path.join(folder, "levels.txt"), "w") as file:
+            file.write(str(n_levels))
+
+    @classmethod
+    def load(cls, folder: str, reference_path: str) -> "Pyramid | None":
+        """Memory map the levels saved in folder, or returns None if they are missing or older than reference_path
+        (the file they were computed from)"""
+        levels_path = os.path.join(folder, "levels.txt")
+        if not os.path.isfile(levels_path) or os.path.getmtime(levels_path) < os.path.getmtime(reference_path):
+            return None
+        with open(levels_path) as file:
+            n_levels = int(file.read())
+        return cls([np.load(os.path.join(folder, f"level_{k + 1}.npy"), mmap_mode="r") for k in range(n_levels)])
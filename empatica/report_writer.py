@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+import sys
+from typing import Callable, Iterable, TextIO
+
+
+class ReportWriter:
+    # The number of characters kept in memory before they are written to the sink
+    default_buffer_size: int = 64 * 1024
+
+    def __init__(self, sink: TextIO = None, buffer_size: int = None):
+        """Write a text report line by line into a sink (any object with a write method). If sink is None, the text is
+        kept in memory (see getvalue), which is how the sections rendered concurrently are built"""
+        self.sink = sink if sink is not None else io.StringIO()
+        self.buffer_size = self.default_buffer_size if buffer_size is None else buffer_size
+        self._buffer: list[str] = []
+        self._buffered = 0  # The number of characters in the buffer
+        self._owns_sink = False  # If close closes the sink
+
+    @classmethod
+    def open(cls, path: str, buffer_size: int = None) -> "ReportWriter":
+        """Write the report to a file, which is closed with the writer"""
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        report = cls(open(path, "w"), buffer_size=buffer_size)
+        report._owns_sink = True
+        return report
+
+    @classmethod
+    def stdout(cls) -> "ReportWriter":
+        """Write the report to the current standard output, unbuffered so it interleaves with the prints"""
+        return cls(sys.stdout, buffer_size=0)
+
+    def write_line(self, line: str = "") -> None:
+        self.write(line + "\n")
+
+    def write(self, text: str) -> None:
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def section(self) -> "ReportWriter":
+        """Get an in memory writer whose text can be written to this one with write_section"""
+        return ReportWriter(buffer_size=self.buffer_size)
+
+    def write_section(self, section: "ReportWriter") -> None:
+        self.write(section.getvalue())
+
+    def render_sections(self, render: Callable[["ReportWriter", object], None], items: Iterable, n_workers: int = None):
+        """Call render(section, item) for each item, each into its own section, and write the sections in the order of
+        items. With n_workers other than 1, the sections are rendered concurrently in a pool of threads (None lets the
+        pool decide its size) and each one is written as soon as the previous ones are"""
+
+        def render_section(item) -> str:
+            section = self.section()
+            render(section, item)
+            return section.getvalue()
+
+        if n_workers == 1:
+            for item in items:
+                self.write(render_section(item))
+            return
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            for text in executor.map(render_section, items):
+                self.write(text)
+
+    def getvalue(self) -> str:
+        """Get the text written so far, if the writer has no sink"""
+        self.flush()
+        return self.sink.getvalue()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.sink.write("".join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._owns_sink:
+            self.sink.close()
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
@@ -0,0 +1,99 @@
+import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+from .empatica_reader import EmpaticaReader
+from .enums import DataType
+
+
+class AlignedSignals(NamedTuple):
+    """Signals of several modalities on a shared time grid"""
+
+    initial_t: datetime.datetime  # The origin of t
+    t: np.ndarray  # in second from initial_t
+    signals: dict[DataType, np.ndarray]  # One row per element of t, nan where a signal has no sample
+
+    @property
+    def daytime(self) -> np.ndarray:
+        """The time of the day of each element of t"""
+        return np.datetime64(self.initial_t, "us") + np.round(self.t * 1e6).astype("timedelta64[us]")
+
+
+class Resampler:
+    def __init__(self, rate: float = 4, method: str = "auto", max_gap: float = 3.0):
+        """Resample the signals of the readers on a regular grid. method is "interpolate" (linear), "mean" (mean of
+        the samples closest to each grid point) or "auto" (mean for the signals faster than the grid, interpolation
+        otherwise). The irregular signals (IBI) are always interpolated"""
+        if method not in ("auto", "interpolate", "mean"):
+            raise ValueError(f"Unknown method ({method})")
+        self.rate = rate  # of the grid, in Hz
+        self.method = method
+        # in second, the grid points farther than that from any sample of an irregular signal are nan
+        self.max_gap = max_gap
+
+    @property
+    def key(self) -> tuple:
+        """The parameters that change the results, to cache them"""
+        return self.rate, self.method, self.max_gap
+
+    def grid(self, first: float, last: float) -> np.ndarray:
+        """Get the grid points from first to last (included if it falls on the grid)"""
+        return first + np.arange(int(np.floor((last - first) * self.rate + 1e-9)) + 1) / self.rate
+
+    def resample(self, reader: EmpaticaReader, grid: np.ndarray, offset: float = 0) -> np.ndarray:
+        """Resample the data of a reader on the grid. offset is the time of the beginning of the recording on the
+        grid time axis (in second). Only the samples around the grid are read, chunk by chunk if the reader streams"""
+        padding = max(0.5 / self.rate, self.max_gap if reader.rate is None else 1 / reader.rate)
+        t, data = self._samples(reader, grid[0] - offset - padding, grid[-1] - offset + padding)
+        t = t + offset
+
+        if reader.rate is None:
+            return self.interpolate(t, data, grid, max_gap=self.max_gap)
+        if self.method == "mean" or (self.method == "auto" and reader.rate > self.rate):
+            return self.mean(t, data, grid, self.rate)
+        return self.interpolate(t, data, grid)
+
+    @staticmethod
+    def interpolate(t: np.ndarray, data: np.ndarray, grid: np.ndarray, max_gap: float = None) -> np.ndarray:
+        """Linearly interpolate data (one row per element of t) on the grid, nan outside of t or, if max_gap is not
+        None, farther than max_gap from any sample"""
+        resampled = np.full((grid.shape[0], data.shape[1]), np.nan)
+        if t.shape[0] == 0:
+            return resampled
+        for i in range(data.shape[1]):
+            resampled[:, i] = np.interp(grid, t, data[:, i], left=np.nan, right=np.nan)
+
+        if max_gap is not None:
+            after = np.clip(np.searchsorted(t, grid), 1, max(t.shape[0] - 1, 1))
+            distance = np.minimum(np.abs(grid - t[after - 1]), np.abs(t[np.minimum(after, t.shape[0] - 1)] - grid))
+            resampled[distance > max_gap, :] = np.nan
+        return resampled
+
+    @staticmethod
+    def mean(t: np.ndarray, data: np.ndarray, grid: np.ndarray, rate: float) -> np.ndarray:
+        """Average the samples of data closest to each point of the grid (sampled at rate), nan if there is none"""
+        bins = np.floor((t - grid[0]) * rate + 0.5).astype(int)
+        valid = (bins >= 0) & (bins < grid.shape[0])
+        bins = bins[valid]
+        counts = np.bincount(bins, minlength=grid.shape[0]).astype(float)
+        counts[counts == 0] = np.nan
+        return np.column_stack(
+            [np.bincount(bins, weights=data[valid, i], minlength=grid.shape[0]) / counts for i in range(data.shape[1])]
+        )
+
+    @staticmethod
+    def _samples(reader: EmpaticaReader, first: float, last: float) -> tuple[np.ndarray, np.ndarray]:
+        """Get the samples of a reader from first to last (in second), plus one sample on each side"""
+        if reader.t_data is not None:
+            start = max(int(np.searchsorted(reader.t_data, first)) - 1, 0)
+            stop = int(np.searchsorted(reader.t_data, last, side="right")) + 1
+            return np.asarray(reader.t_data[start:stop]), np.asarray(reader.data()[start:stop, :])
+
+        # The streamed readers have a constant rate, so the indices are known without the time vector
+        start = max(int(np.floor(first * reader.rate)) - 1, 0)
+        stop = min(max(int(np.ceil(last * reader.rate)) + 2, start), reader.n_samples)
+        chunks = list(reader.iter_chunks(start, stop))
+        if not chunks:
+            return np.zeros(0), np.zeros((0, reader.n_cols))
+        return np.concatenate([t for t, _ in chunks]), np.concatenate([data for _, data in chunks])
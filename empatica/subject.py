@@ -1,17 +1,34 @@
+from concurrent.futures import Executor, Future
+import datetime
+
 from matplotlib import pyplot as plt
 
 from .enums import (
+    DataLoadingError,
     DataType,
-    DataTypeNotLoadedError,
     DataTypeNotImplementedError,
     ActivityType,
     ActivityTypeNotImplementedError,
 )
 from .acc_reader import AccReader
+from .eda_engines import EdaPeakEngine
 from .eda_reader import EdaReader
 from .empatica_reader import EmpaticaReader
 from .hr_bpm_reader import HrBpmReader
 from .hr_ibi_reader import HrIbiReader
+from .metrics_table import MetricsTable
+from .profiler import profile
+from .report_writer import ReportWriter
+from .resampler import AlignedSignals, Resampler
+from .timings_index import TimingsIndex
+
+
+def _load_reader(reader_type: type, **kwargs) -> EmpaticaReader:
+    """Build a reader, reporting which file failed if it cannot be loaded"""
+    try:
+        return reader_type(**kwargs)
+    except Exception as e:
+        raise DataLoadingError(f"Could not load {kwargs['data_path']}: {e}") from e
 
 
 class Subject:
@@ -23,52 +40,177 @@ class Subject:
         load_acc: bool = False,
         load_eda: bool = True,
         eda_segment_width: int = None,
+        eda_n_workers: int = 1,
+        eda_engine: EdaPeakEngine = None,
+        eda_incremental: bool = False,
         load_hr_bpm: bool = True,
         load_hr_ibi: bool = True,
         fast_load: bool = False,
+        executor: Executor = None,
+        acc_streaming: bool = False,
     ):
+        """The readers are built on the first access to their data. The load_* flags preload them right away, so
+        with all of them False nothing is read until the data are used"""
         self.id_number = id_number
         self.dates = dates
         self.data_path_folder = data_path_folder
+        self.timing_path = self.data_path_folder + "timings.xlsx"
+        self._timings_index: TimingsIndex | None = None
+        self.acc_streaming = acc_streaming
+        self.eda_segment_width = eda_segment_width
+        self.eda_n_workers = eda_n_workers
+        self.eda_engine = eda_engine
+        self.eda_incremental = eda_incremental
+        self.fast_load = fast_load
+        self.executor = executor
+
+        self._readers: dict[DataType, list[EmpaticaReader, ...]] = {}
+        self._pending_readers: dict[DataType, list[Future, ...]] = {}
+        self._aligned: dict[tuple, AlignedSignals] = {}  # The results of aligned, per date, activity and grid
+        for data_type, should_load in (
+            (DataType.ACC, load_acc),
+            (DataType.EDA, load_eda),
+            (DataType.HR_BPM, load_hr_bpm),
+            (DataType.HR_IBI, load_hr_ibi),
+        ):
+            if should_load:
+                self.load(data_type)
+
+    @property
+    def timings_index(self) -> TimingsIndex:
+        """The parsed timing file, read on the first load of a reader"""
+        if self._timings_index is None:
+            self._timings_index = TimingsIndex.from_file(self.timing_path)
+        return self._timings_index
 
-        self.acc = []
-        self.eda = []
-        self.hr_bpm = []
-        self.hr_ibi = []
-        for i in range(self.n_dates):
-            if load_acc:
-                self.acc.append(
-                    AccReader(
-                        data_path=self.data_path_folder + self.acc_filename(i),
-                        timing_path=self.data_path_folder + "timings.xlsx",
-                    )
-                )
-
-            if load_eda:
-                self.eda.append(
-                    EdaReader(
-                        data_path=self.data_path_folder + self.eda_filename(i),
-                        timing_path=self.data_path_folder + "timings.xlsx",
-                        segment_width=eda_segment_width,
-                        reprocess_eda=not fast_load,
-                    )
-                )
-
-            if load_hr_bpm:
-                self.hr_bpm.append(
-                    HrBpmReader(
-                        data_path=self.data_path_folder + self.hr_bpm_filename(i),
-                        timing_path=self.data_path_folder + "timings.xlsx",
-                    )
-                )
-
-            if load_hr_ibi:
-                self.hr_ibi.append(
-                    HrIbiReader(
-                        data_path=self.data_path_folder + self.hr_ibi_filename(i),
-                        timing_path=self.data_path_folder + "timings.xlsx",
-                    )
-                )
+    @property
+    def acc(self) -> list[AccReader, ...]:
+        return self.data(DataType.ACC)
+
+    @property
+    def eda(self) -> list[EdaReader, ...]:
+        return self.data(DataType.EDA)
+
+    @property
+    def hr_bpm(self) -> list[HrBpmReader, ...]:
+        return self.data(DataType.HR_BPM)
+
+    @property
+    def hr_ibi(self) -> list[HrIbiReader, ...]:
+        return self.data(DataType.HR_IBI)
+
+    def load(self, data_type: DataType) -> None:
+        """Start loading the readers of a data type for all the dates, if they are not already loaded or loading.
+        Without an executor they are built right away, otherwise they are collected on first access to the data"""
+        if data_type in self._readers or data_type in self._pending_readers:
+            return
+
+        arguments = [self._reader_arguments(data_type, i) for i in range(self.n_dates)]
+        if self.executor is None:
+            with profile("load readers", f"{self.id_number} {data_type.value}"):
+                self._readers[data_type] = [_load_reader(reader_type, **kwargs) for reader_type, kwargs in arguments]
+        else:
+            self._pending_readers[data_type] = [
+                self.executor.submit(_load_reader, reader_type, **kwargs) for reader_type, kwargs in arguments
+            ]
+
+    def is_loaded(self, data_type: DataType) -> bool:
+        """If the readers of a data type are loaded (or loading)"""
+        return data_type in self._readers or data_type in self._pending_readers
+
+    def release(self, data_type: DataType = None) -> None:
+        """Forget the readers of a data type (all of them if None) so their arrays can be freed. They are built
+        again on the next access to their data"""
+        for loaded in (self._readers, self._pending_readers):
+            if data_type is None:
+                loaded.clear()
+            else:
+                loaded.pop(data_type, None)
+        self._aligned.clear()
+
+    def iter_readers(self, data_type: DataType):
+        """Yield the readers of a data type for all the dates. The loaded readers are reused, the others are built one
+        at a time and not kept, so only one of them is in memory at once"""
+        if self.is_loaded(data_type):
+            yield from self.data(data_type)
+            return
+        for date_index in range(self.n_dates):
+            reader_type, kwargs = self._reader_arguments(data_type, date_index)
+            yield _load_reader(reader_type, **kwargs)
+
+    def aligned(
+        self,
+        date_index: int,
+        activity_type: ActivityType = None,
+        data_types: tuple[DataType, ...] = None,
+        resampler: Resampler = None,
+    ) -> AlignedSignals:
+        """Get the signals of several data types (the loaded ones if None) at date_index on a shared time grid,
+        covering an activity (the time all the signals overlap if None). The time axis starts at the beginning of the
+        recording of the first data type. The results are cached per grid until the readers are released"""
+        if data_types is None:
+            data_types = tuple(data_type for data_type in DataType if self.is_loaded(data_type))
+        if not data_types:
+            raise ValueError("No data type is loaded, data_types must be given")
+        resampler = Resampler() if resampler is None else resampler
+
+        key = (date_index, activity_type, tuple(data_types), resampler.key)
+        if key not in self._aligned:
+            readers = [self.data(data_type)[date_index] for data_type in data_types]
+            initial_t = readers[0].initial_t
+            offsets = [(reader.initial_t - initial_t).total_seconds() for reader in readers]
+
+            if activity_type is None:
+                spans = [self._time_span(reader) for reader in readers]
+                first = max(offset + span[0] for offset, span in zip(offsets, spans))
+                last = min(offset + span[1] for offset, span in zip(offsets, spans))
+            else:
+                start, end = readers[0].timings[activity_type]
+                first = (datetime.datetime.combine(initial_t.date(), start) - initial_t).total_seconds()
+                last = (datetime.datetime.combine(initial_t.date(), end) - initial_t).total_seconds()
+            if last < first:
+                raise ValueError(f"The signals do not overlap for subject {self.id_number} at date index {date_index}")
+
+            grid = resampler.grid(first, last)
+            signals = {
+                data_type: resampler.resample(reader, grid, offset)
+                for data_type, reader, offset in zip(data_types, readers, offsets)
+            }
+            self._aligned[key] = AlignedSignals(initial_t, grid, signals)
+        return self._aligned[key]
+
+    @staticmethod
+    def _time_span(reader: EmpaticaReader) -> tuple[float, float]:
+        """Get the time of the first and last samples of a reader"""
+        if reader.t_data is None:
+            return 0.0, (reader.n_samples - 1) / reader.rate
+        return float(reader.t_data[0]), float(reader.t_data[-1])
+
+    def _reader_arguments(self, data_type: DataType, date_index: int) -> tuple[type, dict]:
+        """Get the reader type and its construction arguments for a data type at date_index"""
+        kwargs = {"timing_path": self.timing_path, "timings_index": self.timings_index}
+        if data_type == DataType.ACC:
+            return AccReader, {
+                "data_path": self.data_path_folder + self.acc_filename(date_index),
+                "streaming": self.acc_streaming,
+                **kwargs,
+            }
+        elif data_type == DataType.EDA:
+            return EdaReader, {
+                "data_path": self.data_path_folder + self.eda_filename(date_index),
+                "segment_width": self.eda_segment_width,
+                "n_workers": self.eda_n_workers,
+                "engine": self.eda_engine,
+                "incremental": self.eda_incremental,
+                "reprocess_eda": not self.fast_load,
+                **kwargs,
+            }
+        elif data_type == DataType.HR_BPM:
+            return HrBpmReader, {"data_path": self.data_path_folder + self.hr_bpm_filename(date_index), **kwargs}
+        elif data_type == DataType.HR_IBI:
+            return HrIbiReader, {"data_path": self.data_path_folder + self.hr_ibi_filename(date_index), **kwargs}
+        else:
+            raise DataTypeNotImplementedError(data_type)
 
     def acc_filename(self, date_index):
         """Get the ACC file name associated to date_index"""
@@ -87,25 +229,17 @@ class Subject:
         return f"{self.id_number}_{self.dates[date_index]}_Empatica_{DataType.HR_IBI.value}.csv"
 
     def data(self, data_type: DataType) -> list[EmpaticaReader, ...]:
-        if data_type == DataType.ACC:
-            if not self.acc:
-                raise DataTypeNotLoadedError("Acceleration data were not loaded for this subject")
-            return self.acc
-        elif data_type == DataType.EDA:
-            if not self.eda:
-                raise DataTypeNotLoadedError("EDA data were not loaded for this subject")
-            return self.eda
-        elif data_type == DataType.HR_BPM:
-            if not self.hr_bpm:
-                raise DataTypeNotLoadedError("HR (BPM) data were not loaded for this subject")
-            return self.hr_bpm
-        elif data_type == DataType.HR_IBI:
-            if not self.hr_ibi:
-                raise DataTypeNotLoadedError("HR (IBI) data were not loaded for this subject")
-            return self.hr_ibi
-        else:
+        """Get the readers of a data type for all the dates, loading them on first access"""
+        if data_type not in (DataType.ACC, DataType.EDA, DataType.HR_BPM, DataType.HR_IBI):
             raise DataTypeNotImplementedError(data_type)
 
+        self.load(data_type)
+        if data_type in self._pending_readers:
+            # The readers are loaded by the workers, so only the time spent waiting for them is seen here
+            with profile("wait for readers", f"{self.id_number} {data_type.value}"):
+                self._readers[data_type] = [future.result() for future in self._pending_readers.pop(data_type)]
+        return self._readers[data_type]
+
     @property
     def n_dates(self):
         """Get the number of files there is for this subject"""
@@ -189,7 +323,7 @@ class Subject:
                 data = self.data(data_type)
                 ax = data[date].add_to_plot(ax=ax, activity_type=activity_type, color=color, **options)
                 if data_type == DataType.EDA and plot_eda_peaks:
-                    self.eda[date].add_peaks_to_plot(ax=ax, activity_type=activity_type, **options)
+                    self.data(DataType.EDA)[date].add_peaks_to_plot(ax=ax, activity_type=activity_type, **options)
 
         ax = figure.gca()
         ax.set_title(title)
@@ -229,7 +363,7 @@ class Subject:
             if x_axis:
                 ax.plot(x_axis, [0] * len(x_axis), "w")
 
-            peaks_per_minute = [self.eda[date].peak_per_second(activity_type) * 60 for date in date_indices]
+            peaks_per_minute = [self.data(DataType.EDA)[date].peak_per_second(activity_type) * 60 for date in date_indices]
             ax.plot([self.dates[d] for d in date_indices], peaks_per_minute, "-o", label=activity_type if not has_other_subject else None, color=color, **options)
 
         ax = figure.gca()
@@ -245,8 +379,12 @@ class Subject:
         activity_types: tuple[ActivityType, ...] = None,
         activity_type: ActivityType = None,
         date_indices: tuple[int, ...] = None,
+        table: MetricsTable = None,
+        report: ReportWriter = None,
     ) -> None:
-        """Print relevant tables for the requested DataType and dates"""
+        """Print relevant tables for the requested DataType and dates, in report (the standard output if None). table
+        can be given to reuse the values that were already computed"""
+        report = ReportWriter.stdout() if report is None else report
 
         data = self.data(data_type)
         date_indices = range(self.n_dates) if date_indices is None else date_indices
@@ -255,7 +393,23 @@ class Subject:
         )
 
         for date in date_indices:
-            data[date].print_table_header()
+            data[date].print_table_header(report)
             for activity_type in activity_types:
-                data[date].print_table(activity_type)
-            data[date].print_table_tail(f"Table for subject {self.id_number} on date {self.dates[date]}")
+                values = None if table is None else table.get(self.id_number, self.dates[date], activity_type)
+                data[date].print_table(activity_type, values=values, report=report)
+            data[date].print_table_tail(f"Table for subject {self.id_number} on date {self.dates[date]}", report)
+
+    def print_section(
+        self,
+        report: ReportWriter,
+        data_type: DataType,
+        activity_types: tuple[ActivityType, ...] = None,
+        activity_type: ActivityType = None,
+        date_indices: tuple[int, ...] = None,
+        table: MetricsTable = None,
+    ) -> None:
+        """Print the section of the subject in a report, on a new page: its title and the tables of print_table"""
+        report.write_line(r" \newpage")
+        report.write_line(r" \section*{Values of subject " + self.id_number + "}")
+        self.print_table(data_type, activity_types, activity_type, date_indices, table, report)
+        report.write_line("")
@@ -1,8 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor
 import datetime
 
-import numpy as np
-
+from .eda_engines import EdaPeakEngine
 from .enums import DataType, ActivityType
+from .metrics_table import MetricsTable
+from .parquet_exporter import ParquetExporter
+from .report_writer import ReportWriter
 from .subject import Subject
 
 
@@ -12,18 +15,31 @@ class Subjects:
         load_acc: bool = False,
         load_eda: bool = True,
         eda_segment_width: int = None,
+        eda_n_workers: int = 1,
+        eda_engine: EdaPeakEngine = None,
+        eda_incremental: bool = False,
         load_hr_bpm: bool = True,
         load_hr_ibi: bool = True,
         fast_load: bool = False,
+        parallel_load: bool = False,
+        n_workers: int = None,
+        acc_streaming: bool = False,
      ):
         self.subjects: list[Subject] = []
         self.data_path_folder = data_path_folder
         self.load_acc = load_acc
+        self.acc_streaming = acc_streaming
         self.load_eda = load_eda
         self.eda_segment_width = eda_segment_width
+        self.eda_n_workers = eda_n_workers
+        self.eda_engine = eda_engine
+        self.eda_incremental = eda_incremental
         self.load_hr_bpm = load_hr_bpm
         self.load_hr_ibi = load_hr_ibi
         self.fast_load = fast_load
+        self.parallel_load = parallel_load
+        self.n_workers = n_workers  # None uses all the cores
+        self._executor: ProcessPoolExecutor | None = None
 
         self._iter_index = 0
 
@@ -31,8 +47,49 @@ class Subjects:
         id_number: str,
         dates: list[str],
     ):
-        self.subjects.append(Subject(id_number=id_number, dates=dates, data_path_folder=self.data_path_folder, load_acc=self.load_acc,
-                load_eda=self.load_eda, eda_segment_width=self.eda_segment_width, load_hr_bpm=self.load_hr_bpm, load_hr_ibi=self.load_hr_ibi, fast_load=self.fast_load))
+        if self.parallel_load and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.n_workers)
+
+        self.subjects.append(
+            Subject(
+                id_number=id_number,
+                dates=dates,
+                data_path_folder=self.data_path_folder,
+                load_acc=self.load_acc,
+                load_eda=self.load_eda,
+                eda_segment_width=self.eda_segment_width,
+                eda_n_workers=self.eda_n_workers,
+                eda_engine=self.eda_engine,
+                eda_incremental=self.eda_incremental,
+                load_hr_bpm=self.load_hr_bpm,
+                load_hr_ibi=self.load_hr_ibi,
+                fast_load=self.fast_load,
+                executor=self._executor,
+                acc_streaming=self.acc_streaming,
+            )
+        )
+
+    def load(self, data_type: DataType) -> None:
+        """Start loading a data type for all the subjects (in parallel if parallel_load is set)"""
+        for subject in self.subjects:
+            subject.load(data_type)
+
+    def release(self, data_type: DataType = None) -> None:
+        """Forget the readers of a data type (all of them if None) for all the subjects"""
+        for subject in self.subjects:
+            subject.release(data_type)
+
+    def close(self) -> None:
+        """Shut down the pool of processes of parallel_load, once the readers it is loading are done"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "Subjects":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
 
     def __getitem__(self, item) -> Subject:
         return self.subjects[item]
@@ -59,36 +116,84 @@ class Subjects:
             labels.append(str((init + datetime.timedelta(days=day)).date()))
         return tuple(labels)
 
+    def metrics_table(
+        self,
+        data_type: DataType,
+        activity_types: tuple[ActivityType, ...] = None,
+        activity_type: ActivityType = None,
+        date_indices: tuple[int, ...] = None,
+    ) -> MetricsTable:
+        """Compute the table values of every subject, date and activity once, so they can be reduced and printed"""
+        activity_types = Subject.check_and_dispatch_declaration(
+            activity_types, activity_type, "activity_type", len(activity_types) if activity_types is not None else 1
+        )
+        return MetricsTable.from_subjects(self.subjects, data_type, activity_types, date_indices)
+
+    def export_parquet(self, folder: str, data_types: tuple[DataType, ...] = None, chunk_size: int = None) -> list[str]:
+        """Export the signals, activity labels and EDA peaks to parquet files partitioned by subject, date and
+        modality (see ParquetExporter). By default the data types that are loaded are exported, the readers of the
+        other requested data types are built and exported one at a time. Returns the paths of the written files"""
+        exporter = ParquetExporter(folder, chunk_size=chunk_size)
+        paths = []
+        for subject in self.subjects:
+            types = data_types
+            if types is None:
+                types = tuple(data_type for data_type in DataType if subject.is_loaded(data_type))
+            for data_type in types:
+                for reader in subject.iter_readers(data_type):
+                    paths += exporter.export(reader, data_type)
+        return paths
+
     def print_table(
             self,
             data_type: DataType,
             activity_types: tuple[ActivityType, ...] = None,
             activity_type: ActivityType = None,
             date_indices: tuple[int, ...] = None,
+            table: MetricsTable = None,
+            reduction: str = "mean",
+            report: ReportWriter = None,
     ) -> None:
-        """Print relevant tables for the requested DataType and dates"""
+        """Print relevant tables for the requested DataType and dates, in report (the standard output if None). The
+        values are reduced over all the subjects and dates (see MetricsTable.reduce), table can be given to reuse the
+        values that were already computed"""
 
         # Prepare some values
+        report = ReportWriter.stdout() if report is None else report
         activity_types = Subject.check_and_dispatch_declaration(
             activity_types, activity_type, "activity_type", len(activity_types) if activity_types is not None else 1
         )
-        data_to_print_mean = {}
-        data_to_print_all_values = {}
-        for activity_type in activity_types:
-            data_to_print_all_values[activity_type] = []
+        if table is None:
+            table = self.metrics_table(data_type, activity_types=activity_types, date_indices=date_indices)
+        keys, values = table.reduce(by=("activity",), reduction=reduction)
+        reduced = {key["activity"]: tuple(value) for key, value in zip(keys, values)}
 
         # Print the header of the table
-        self.subjects[0].data(data_type)[0].print_table_header()
-
-        for subject in self.subjects:
-            data = subject.data(data_type)
-            for date in range(subject.n_dates) if date_indices is None else date_indices:
-                for activity_type in activity_types:
-                    data_to_print_all_values[activity_type].append(data[date].get_table_value(activity_type))
+        reader = self.subjects[0].data(data_type)[0]
+        reader.print_table_header(report)
 
-        # Compute the mean of all values and print them
+        # Print the reduced values
         for activity_type in activity_types:
-            self.subjects[0].data(data_type)[0].print_table(activity_type, values=tuple(np.mean(data_to_print_all_values[activity_type], axis=0)))
+            reader.print_table(activity_type, values=reduced[activity_type.value], report=report)
 
         # Print the tail of the table
-        self.subjects[0].data(data_type)[0].print_table_tail(f"Mean table for all the subjects")
+        reader.print_table_tail(f"{reduction.capitalize()} table for all the subjects", report)
+
+    def print_sections(
+            self,
+            report: ReportWriter,
+            data_type: DataType,
+            activity_types: tuple[ActivityType, ...] = None,
+            activity_type: ActivityType = None,
+            date_indices: tuple[int, ...] = None,
+            table: MetricsTable = None,
+            n_workers: int = None,
+    ) -> None:
+        """Print the section of each subject (see Subject.print_section) in a report. The sections are rendered
+        concurrently by n_workers threads (1 renders them one after the other), so the subjects that are still loading
+        do not hold back the others, and they are written in the order of the subjects"""
+
+        def print_section(section: ReportWriter, subject: Subject) -> None:
+            subject.print_section(section, data_type, activity_types, activity_type, date_indices, table)
+
+        report.render_sections(print_section, self.subjects, n_workers=n_workers)
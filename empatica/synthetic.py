@@ -0,0 +1,149 @@
+import datetime
+import os
+
+import numpy as np
+import openpyxl
+
+from .empatica_vrcamp_reader import EmpaticaVrCampReader
+from .enums import ActivityType, DataType
+
+# The position of each activity in a synthetic recording, as fractions of its duration
+activity_fractions: dict[ActivityType, tuple[float, float]] = {
+    ActivityType.BASELINE: (0.05, 0.10),
+    ActivityType.VR: (0.20, 0.40),
+    ActivityType.Camp: (0.50, 0.90),
+}
+
+# The acquisition rate of each data type of the Empatica E4 (IBI is irregular)
+rates: dict[DataType, int] = {DataType.ACC: 32, DataType.EDA: 4, DataType.HR_BPM: 1}
+
+
+def synthetic_eda(
+    rate: int, duration: float, rng: np.random.Generator, n_responses_per_minute: float = 4
+) -> tuple[np.ndarray, np.ndarray]:
+    """Generate an EDA signal in microS (tonic drift, skin conductance responses and noise) of duration seconds and
+    the time of its true peaks. Each response is a Bateman function (difference of exponentials)"""
+    t = np.arange(int(duration * rate)) / rate
+    tonic = 2 + 0.5 * np.sin(2 * np.pi * t / (20 * 60))
+
+    n_responses = int(duration / 60 * n_responses_per_minute)
+    onsets = np.sort(rng.uniform(0, max(t[-1] - 20, 0), n_responses))
+    amplitudes = rng.uniform(0.05, 0.5, n_responses)
+    tau_rise, tau_decay = 0.75, 2.0
+    time_to_peak = np.log(tau_decay / tau_rise) * tau_rise * tau_decay / (tau_decay - tau_rise)
+    peak_of_kernel = np.exp(-time_to_peak / tau_decay) - np.exp(-time_to_peak / tau_rise)
+
+    # A response is negligible after 15 time constants, so it is only added on the samples that follow its onset
+    phasic = np.zeros_like(t)
+    n_kernel_samples = int(15 * tau_decay * rate)
+    for onset, amplitude in zip(onsets, amplitudes):
+        first = int(np.ceil(onset * rate))
+        dt = t[first : first + n_kernel_samples] - onset
+        phasic[first : first + n_kernel_samples] += (
+            amplitude * (np.exp(-dt / tau_decay) - np.exp(-dt / tau_rise)) / peak_of_kernel
+        )
+
+    noise = rng.normal(0, 0.005, t.size)
+    return (tonic + phasic + noise)[:, np.newaxis], onsets + time_to_peak
+
+
+def synthetic_acc(rate: int, duration: float, rng: np.random.Generator) -> np.ndarray:
+    """Generate an acceleration in 1/64 g (gravity, slow changes of orientation and bursts of movements)"""
+    n_samples = int(duration * rate)
+    tilt = np.cumsum(rng.normal(0, 0.002, n_samples))
+    data = np.column_stack((64 * np.sin(tilt), np.zeros(n_samples), 64 * np.cos(tilt)))
+
+    # Bursts of movements of a few seconds
+    n_bursts = int(duration / 60)
+    for first in rng.integers(0, max(n_samples - 10 * rate, 1), n_bursts):
+        last = first + int(rng.uniform(1, 10) * rate)
+        data[first:last, :] += rng.normal(0, 30, (last - first, 3))
+    return np.round(data + rng.normal(0, 1, data.shape))
+
+
+def synthetic_hr(rate: int, duration: float, rng: np.random.Generator) -> np.ndarray:
+    """Generate a heart rate in bpm, drifting around 75 bpm"""
+    n_samples = int(duration * rate)
+    drift = np.convolve(rng.normal(0, 1, n_samples), np.ones(60) / np.sqrt(60), mode="same")
+    return np.clip(75 + 2 * drift, 45, 180)[:, np.newaxis]
+
+
+def synthetic_ibi(duration: float, rng: np.random.Generator, dropout: float = 0.3) -> np.ndarray:
+    """Generate the interbeat intervals (in second) of duration seconds. Like the E4, a part of the beats are
+    missing, the remaining rows being the time of the beat (from the beginning of the recording) and its interval"""
+    n_beats = int(duration / 0.8)
+    intervals = np.clip(0.8 + np.convolve(rng.normal(0, 0.02, n_beats), np.ones(5), mode="same"), 0.3, 1.5)
+    beats = np.cumsum(intervals)
+    kept = (beats < duration) & (rng.uniform(size=n_beats) > dropout)
+    return np.column_stack((beats[kept], intervals[kept]))
+
+
+def write_empatica_csv(path: str, initial_t: datetime.datetime, data: np.ndarray, rate: int = None) -> None:
+    """Write a csv file in the Empatica format: the initial time stamp, the rate (unless None, as for IBI) then the
+    data, the header values being repeated for each column"""
+    n_cols = data.shape[1]
+    with open(path, "w") as file:
+        if rate is None:
+            file.write(f"{initial_t.timestamp():.6f}, IBI\n")
+        else:
+            file.write(", ".join([f"{initial_t.timestamp():.6f}"] * n_cols) + "\n")
+            file.write(", ".join([f"{rate:.6f}"] * n_cols) + "\n")
+        np.savetxt(file, data, fmt="%.6f", delimiter=",")
+
+
+def write_timings(path: str, timings: dict[tuple[str, str], dict[ActivityType, tuple[datetime.time, datetime.time]]]):
+    """Write a timing file with one row per subject and date, in the layout that TimingsIndex parses"""
+    columns = list(EmpaticaVrCampReader.activity_timing_columns.items())
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["ID", "Date"] + [name for _, names in columns for name in names])
+    for (subject, date), activities in timings.items():
+        row = [subject, datetime.datetime.strptime(date, "%Y-%m-%d")]
+        for activity, _ in columns:
+            row += list(activities[activity])
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_synthetic_cohort(
+    folder: str,
+    n_subjects: int,
+    n_dates: int,
+    duration_in_hours: float,
+    data_types: tuple[DataType, ...] = tuple(DataType),
+    seed: int = 42,
+) -> dict[str, list[str]]:
+    """Write the csv files of n_subjects subjects recorded on n_dates dates for duration_in_hours hours, along with
+    the matching timings.xlsx, in folder. Returns the dates of each subject"""
+    rng = np.random.default_rng(seed)
+    duration = duration_in_hours * 3600
+    first_date = datetime.date(2022, 6, 27)
+
+    cohort = {}
+    timings = {}
+    for i in range(n_subjects):
+        subject = f"{i + 1:02d}"
+        cohort[subject] = []
+        for j in range(n_dates):
+            date = first_date + datetime.timedelta(days=i + j)
+            initial_t = datetime.datetime.combine(date, datetime.time(8))
+            cohort[subject].append(str(date))
+            timings[(subject, str(date))] = {
+                activity: tuple((initial_t + datetime.timedelta(seconds=int(f * duration))).time() for f in fractions)
+                for activity, fractions in activity_fractions.items()
+            }
+
+            prefix = os.path.join(folder, f"{subject}_{date}_Empatica_")
+            for data_type in data_types:
+                if data_type == DataType.ACC:
+                    data = synthetic_acc(rates[data_type], duration, rng)
+                elif data_type == DataType.EDA:
+                    data, _ = synthetic_eda(rates[data_type], duration, rng)
+                elif data_type == DataType.HR_BPM:
+                    data = synthetic_hr(rates[data_type], duration, rng)
+                else:
+                    data = synthetic_ibi(duration, rng)
+                write_empatica_csv(f"{prefix}{data_type.value}.csv", initial_t, data, rate=rates.get(data_type))
+
+    write_timings(os.path.join(folder, "timings.xlsx"), timings)
+    return cohort
@@ -1,33 +1,26 @@
 import os
-import sys
 
 from .empatica_reader import EmpaticaReader
+from .report_writer import ReportWriter
 
 
 class TableUtils:
     @staticmethod
-    def print_document_header(path_folder: str):
-        elements = TableUtils.prepare_to_print(path_folder)
-        EmpaticaReader.print_document_header()
-        return elements
+    def print_document_header(path_folder: str) -> ReportWriter:
+        report = TableUtils.prepare_to_print(path_folder)
+        EmpaticaReader.print_document_header(report)
+        return report
 
     @staticmethod
-    def print_document_tail(elements):
-        EmpaticaReader.print_document_tail()
-        TableUtils.finish_to_print(*elements)
+    def print_document_tail(report: ReportWriter):
+        EmpaticaReader.print_document_tail(report)
+        TableUtils.finish_to_print(report)
 
     @staticmethod
-    def prepare_to_print(path_folder):
-        orig_stdout = sys.stdout
-
-        if not os.path.isdir(path_folder):
-            os.mkdir(path_folder)
-
-        f = open(f"{path_folder}/tables.tex", 'w')
-        sys.stdout = f
-        return f, orig_stdout
+    def prepare_to_print(path_folder) -> ReportWriter:
+        """Open the report that writes the tables to {path_folder}/tables.tex"""
+        return ReportWriter.open(os.path.join(path_folder, "tables.tex"))
 
     @staticmethod
-    def finish_to_print(f, orig_stdout):
-        sys.stdout = orig_stdout
-        f.close()
+    def finish_to_print(report: ReportWriter):
+        report.close()
@@ -0,0 +1,49 @@
+import datetime
+import os
+
+import openpyxl
+
+from .profiler import profile
+
+
+class TimingsIndex:
+    # Already parsed timing files, indexed by their path, so the same workbook is parsed once per run
+    _cache: dict[str, "TimingsIndex"] = {}
+
+    def __init__(self, timing_path: str):
+        self.path = timing_path
+        self.mtime = os.path.getmtime(self.path)
+        with profile("parse timing file", self.path):
+            self.timings = self._parse_workbook()
+
+    @classmethod
+    def from_file(cls, timing_path: str) -> "TimingsIndex":
+        """Get the index of a timing file, parsing it only if it was not already parsed or if it changed since"""
+        index = cls._cache.get(timing_path)
+        if index is None or index.mtime != os.path.getmtime(timing_path):
+            index = cls(timing_path)
+            cls._cache[timing_path] = index
+        return index
+
+    def get(self, subject: str, date: str) -> dict[str, object]:
+        """Get the values of all the columns of the timing file for a subject at a date (empty if not found)"""
+        return self.timings.get((subject, date), {})
+
+    def _parse_workbook(self) -> dict[tuple[str, str], dict[str, object]]:
+        """Parse the whole timing file in a single pass. This assumes ID is the first column and Date the second"""
+        workbook = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, ())
+
+            timings = {}
+            for row in rows:
+                if len(row) < 2 or row[0] is None or not isinstance(row[1], datetime.datetime):
+                    continue  # Empty or incomplete row
+                key = (str(row[0]), str(row[1].date()))
+                if key in timings:
+                    continue  # Only the first row of a subject at a date is used
+                timings[key] = {name: value for name, value in zip(header[2:], row[2:]) if name is not None}
+        finally:
+            workbook.close()
+        return timings
@@ -0,0 +1,57 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(data: np.ndarray, n_samples: int, step: int) -> np.ndarray:
+    """Get a read-only view of the windows of n_samples samples, every step samples, of data (one row per sample).
+    The result is of shape (n_windows, n_cols, n_samples), no data is copied"""
+    if data.shape[0] < n_samples:
+        return np.zeros((0, data.shape[1], n_samples))
+    return sliding_window_view(data, n_samples, axis=0)[::step]
+
+
+def window_statistics(windows: np.ndarray) -> dict[str, np.ndarray]:
+    """Compute the mean, std, min and max of each window (as returned by sliding_windows) over its samples"""
+    return {
+        "mean": np.mean(windows, axis=-1),
+        "std": np.std(windows, axis=-1),
+        "min": np.min(windows, axis=-1),
+        "max": np.max(windows, axis=-1),
+    }
+
+
+def interbeat_statistics(
+    t: np.ndarray, ibi: np.ndarray, starts: np.ndarray, width: float, tolerance: float = 0.05
+) -> dict[str, np.ndarray]:
+    """Compute the mean interbeat interval, SDNN and RMSSD (all in second) and the number of beats of the windows
+    [starts, starts + width[ of an irregular interbeat signal (t the time of each beat, ibi its interval). The
+    successive differences are only computed between consecutive beats, i.e. when there is no missing beat between
+    them (the time between the beats matches the interval within tolerance second). The sums of the mean and RMSSD are
+    differences of cumulative sums, so their cost does not depend on the number of windows. SDNN is computed from the
+    deviations to the mean of each window, as the sum of the squares minus the squared mean cancels out for intervals
+    around one second"""
+    firsts = np.searchsorted(t, starts)
+    lasts = np.searchsorted(t, starts + width)
+    n_beats = lasts - firsts
+
+    def window_sum(values: np.ndarray, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+        cumulative = np.concatenate(([0], np.cumsum(values)))
+        first = np.minimum(first, values.shape[0])
+        return cumulative[np.clip(last, first, values.shape[0])] - cumulative[first]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = window_sum(ibi, firsts, lasts) / n_beats
+        # The beats of all the windows, one after the other (the beats of overlapping windows are repeated)
+        windows = np.repeat(np.arange(starts.shape[0]), n_beats)
+        beats = np.arange(windows.shape[0]) - np.repeat(np.cumsum(n_beats) - n_beats - firsts, n_beats)
+        squared_deviations = (ibi[beats] - mean[windows]) ** 2
+        sdnn = np.sqrt(np.bincount(windows, weights=squared_deviations, minlength=starts.shape[0]) / n_beats)
+
+        # The difference j is between the beats j and j + 1, so it is in the window if both beats are
+        consecutive = np.abs(np.diff(t) - ibi[1:]) <= tolerance
+        squared_differences = np.where(consecutive, np.diff(ibi) ** 2, 0)
+        n_differences = window_sum(consecutive, firsts, lasts - 1)
+        rmssd = np.sqrt(window_sum(squared_differences, firsts, lasts - 1) / n_differences)
+
+    sdnn[n_beats < 2] = np.nan
+    return {"mean": mean, "sdnn": sdnn, "rmssd": rmssd, "n_beats": n_beats}
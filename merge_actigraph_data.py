@@ -1,5 +1,11 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from functools import lru_cache
+import argparse
 import csv
+import glob
+import os
 
 
 class FolderSuffixe(Enum):
@@ -8,16 +14,14 @@ class FolderSuffixe(Enum):
     VR = "ActiGraph_VR"
 
 
-data_path_folder = (
-    "/home/pariterre/Documents/Documents/Technopole/Projets/DanielleLevac/Empatica data/Data/Actigraph"
-)
+data_path_folder = "/home/pariterre/Documents/Documents/Technopole/Projets/DanielleLevac/Empatica data/Data/Actigraph"
 trials = {
     "01": ["2022-06-28", "2022-06-30", "2022-07-04", "2022-07-06", "2022-07-08"],
     "02": ["2022-06-30", "2022-07-04", "2022-07-05", "2022-07-06", "2022-07-08"],
     "03": ["2022-06-27", "2022-06-29", "2022-07-05", "2022-07-07"],
     "04": ["2022-06-27", "2022-06-29", "2022-07-01", "2022-07-07", "2022-07-08"],
     "05": ["2022-06-27", "2022-06-29", "2022-07-01"],
-    "06": ["2022-06-28", "2022-06-30", "2022-07-04", "2022-07-06", "2022-07-07"]
+    "06": ["2022-06-28", "2022-06-30", "2022-07-04", "2022-07-06", "2022-07-07"],
 }
 
 output_header = [
@@ -35,47 +39,136 @@ output_header = [
     "Steps Counts",
     "Steps Average Counts",
     "Steps Max Counts",
-    "Steps Per Minute"
+    "Steps Per Minute",
 ]
 output_filename = "actigraph_compile_out.csv"
+n_workers = 8  # The files are read concurrently, the merge is bound by the disk rather than by the parsing
 
 
-def main():
+class ActigraphFile:
+    def __init__(self, path: str, subject: str, date: str, folder: FolderSuffixe):
+        self.path = path
+        self.subject = subject
+        self.date = date
+        self.folder = folder
+
+    @property
+    def sort_key(self) -> tuple:
+        return self.subject, self.date, list(FolderSuffixe).index(self.folder)
+
+
+def discover_files(input_folder: str, selected_trials: dict[str, list[str]] = None) -> list[ActigraphFile]:
+    """Find the {subject}_{date}_{folder}.csv files in the folder of each FolderSuffixe, sorted by subject, date and
+    folder. If selected_trials is not None, only the dates of its subjects are kept and they must all exist"""
+    files = []
+    for folder in FolderSuffixe:
+        for path in glob.glob(os.path.join(glob.escape(input_folder), folder.name, f"*_*_{folder.value}.csv")):
+            subject, date = os.path.basename(path)[: -len(f"_{folder.value}.csv")].split("_", 1)
+            if selected_trials is None or date in selected_trials.get(subject, ()):
+                files.append(ActigraphFile(path, subject, date, folder))
+
+    if selected_trials is not None:
+        found = {(file.subject, file.date, file.folder) for file in files}
+        missing = [
+            f"{subject}_{date}_{folder.value}.csv"
+            for subject, dates in selected_trials.items()
+            for date in dates
+            for folder in FolderSuffixe
+            if (subject, date, folder) not in found
+        ]
+        if missing:
+            raise FileNotFoundError(f"Missing files in {input_folder}: {', '.join(missing)}")
+    return sorted(files, key=lambda file: file.sort_key)
+
+
+@lru_cache(maxsize=None)
+def column_mapping(header: tuple[str, ...]) -> tuple[int | None, ...]:
+    """Get the column of each value of output_header in a csv header, None for the values that are not read from the
+    file (Type, and Subject and Date if the header has no such column). It is resolved once per distinct header"""
+    mapping = []
+    for val in output_header:
+        if val == "Type" or (val in ("Subject", "Date") and val not in header):
+            mapping.append(None)
+        elif val in header:
+            mapping.append(header.index(val))
+        else:
+            raise ValueError(f"The column {val} is missing")
+    return tuple(mapping)
+
+
+def read_rows(file: ActigraphFile) -> list[list[str]]:
+    """Read the data rows of a file, reordered as output_header"""
     # Note that data from 01_2022-06-30_ActiGraph_CAMP were collected on a french computer and were manually anglicised
-    data_out = []
-    for subject, dates in trials.items():
-        for date in dates:
-            for folder in FolderSuffixe:
-                filepath = f"{data_path_folder}/{folder.name}/{subject}_{date}_{folder.value}.csv"
-
-                with open(filepath, 'r', newline='') as csvfile:
-                    rows = csv.reader(csvfile)
-
-                    column_mapping = []
-                    for i, row in enumerate(rows):
-                        if i == 0:
-                            for val in output_header:
-                                column_mapping.append(None if val == "Type" else row.index(val))
-                            continue
-
-                        if i >= 2:
-                            raise RuntimeError(
-                                "This script is supposed to be used with CSV that has a header and one row of data"
-                            )
-
-                        data_tp = []
-                        for j, val in enumerate(output_header):
-                            if val == "Type":
-                                data_tp.append(folder.name)
-                            else:
-                                data_tp.append(row[column_mapping[j]])
-                        data_out.append(data_tp)
-
-    with open(output_filename, 'w') as csvfile:
+    defaults = {"Subject": file.subject, "Date": file.date, "Type": file.folder.name}
+    with open(file.path, "r", newline="") as csvfile:
+        rows = csv.reader(csvfile)
+        header = next(rows, None)
+        if header is None:
+            return []
+        try:
+            mapping = column_mapping(tuple(header))
+        except ValueError as e:
+            raise ValueError(f"{e} in {file.path}") from e
+
+        return [
+            [defaults[val] if j is None else row[j] for val, j in zip(output_header, mapping)] for row in rows if row
+        ]
+
+
+def merge(files: list[ActigraphFile], output_path: str, n_workers: int = None) -> int:
+    """Write the rows of the files to a single csv file, in the order of files. The files are read by a pool of
+    n_workers threads, and only about twice that many files are held in memory at once whatever the number of files.
+    Returns the number of rows written"""
+    n_workers = max(n_workers or os.cpu_count() or 1, 1)
+    n_rows = 0
+    with open(output_path, "w", newline="") as csvfile, ThreadPoolExecutor(max_workers=n_workers) as executor:
         csvwriter = csv.writer(csvfile)
         csvwriter.writerow(output_header)
-        for data in data_out:
-            csvwriter.writerow(data)
+
+        pending = deque()
+        for file in files:
+            pending.append(executor.submit(read_rows, file))
+            if len(pending) >= 2 * n_workers:
+                n_rows += _write_rows(csvwriter, pending.popleft().result())
+        while pending:
+            n_rows += _write_rows(csvwriter, pending.popleft().result())
+    return n_rows
+
+
+def _write_rows(csvwriter, rows: list[list[str]]) -> int:
+    csvwriter.writerows(rows)
+    return len(rows)
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Merge the ActiGraph exports of several subjects in a single csv file")
+    parser.add_argument("--input", default=data_path_folder, help="The folder containing one folder per FolderSuffixe")
+    parser.add_argument("--output", default=output_filename, help="The merged csv file")
+    parser.add_argument(
+        "--trial",
+        nargs="+",
+        action="append",
+        metavar=("SUBJECT", "DATE"),
+        help="A subject followed by its dates, can be repeated (default: the trials of this script)",
+    )
+    parser.add_argument("--all", action="store_true", help="Merge all the files of the input folder")
+    parser.add_argument("--n-workers", type=int, default=n_workers, help="The number of files read concurrently")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None):
+    args = parse_args(argv)
+    selected_trials = trials
+    if args.all:
+        selected_trials = None
+    elif args.trial:
+        selected_trials = {}
+        for subject, *dates in args.trial:
+            selected_trials.setdefault(subject, []).extend(dates)
+
+    files = discover_files(args.input, selected_trials)
+    n_rows = merge(files, args.output, n_workers=args.n_workers)
+    print(f"Merged {n_rows} rows from {len(files)} files into {args.output}")
 
 
 if __name__ == "__main__":
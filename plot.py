@@ -1,4 +1,4 @@
-from empatica import ActivityType, DataType, Subjects, PlotUtils, TableUtils
+from empatica import ActivityType, DataType, Subjects, PlotUtils, Profiler, TableUtils
 
 
 data_path_folder = (
@@ -6,6 +6,7 @@ data_path_folder = (
 )
 
 fast_load = True
+parallel_load = True
 eda_segment_width = None
 show_eda_fig = False
 plot_eda_peaks = False
@@ -14,109 +15,150 @@ show_eda_table = True
 show_hr_bpm_fig = False
 show_hr_ibi_fig = False
 should_savefig = True
+parallel_savefig = True  # Render the saved figures in a pool of processes
+zoomable_plots = False  # Reload the details of the shown figures when they are zoomed (see EmpaticaReader.pyramid)
 figure_per_subject = True
 date_indices = None  # (0,)
+profile_run = False  # Print where the time and memory went
+profile_trace_path = None  # "results/trace.json" to also save a JSON trace
 
 
 def main():
-    subjects = Subjects(
+    profiler = Profiler(track_memory=True).start() if profile_run else None
+
+    with Subjects(
         data_path_folder,
         fast_load=fast_load,
+        parallel_load=parallel_load,
         eda_segment_width=eda_segment_width,
-        load_eda=show_eda_fig or show_eda_table or show_eda_peak_fig,
-        load_hr_bpm=show_hr_bpm_fig,
-        load_hr_ibi=show_hr_ibi_fig,
-    )
-
-    subjects.add("01", ["2022-06-28", "2022-06-30", "2022-07-06", "2022-07-08"])
-    subjects.add("02", ["2022-07-04", "2022-07-05", "2022-07-06"])
-    subjects.add("03", ["2022-06-27", "2022-06-29", "2022-07-05"])  # "2022-07-07" <- No EDA peaks found
-    subjects.add("04", ["2022-06-29", "2022-07-07", "2022-07-08"])
-    subjects.add("05", ["2022-06-27", "2022-07-01"])
-    subjects.add("06", ["2022-06-30", "2022-07-04"])
-    date_labels = subjects.generate_date_axis_label()
-
-    if show_eda_table:
-        elements = TableUtils.print_document_header("results")
-        print(r" \section*{Mean of all subjects}")
-        subjects.print_table(
-            data_type=DataType.EDA,
-            activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
-            date_indices=date_indices,
-        )
-        print("")
-        for subject in subjects:
-            print(r" \newpage")
-            print(r" \section*{Values of subject " + subject.id_number + "}")
-            subject.print_table(
+    ) as subjects:
+
+        subjects.add("01", ["2022-06-28", "2022-06-30", "2022-07-06", "2022-07-08"])
+        subjects.add("02", ["2022-07-04", "2022-07-05", "2022-07-06"])
+        subjects.add("03", ["2022-06-27", "2022-06-29", "2022-07-05"])  # "2022-07-07" <- No EDA peaks found
+        subjects.add("04", ["2022-06-29", "2022-07-07", "2022-07-08"])
+        subjects.add("05", ["2022-06-27", "2022-07-01"])
+        subjects.add("06", ["2022-06-30", "2022-07-04"])
+
+        # Submit the loading of every subject up front so they load in parallel, not one at each first access
+        for data_type, is_needed in (
+            (DataType.EDA, show_eda_table or show_eda_fig or show_eda_peak_fig),
+            (DataType.HR_BPM, show_hr_bpm_fig),
+            (DataType.HR_IBI, show_hr_ibi_fig),
+        ):
+            if is_needed:
+                subjects.load(data_type)
+        date_labels = subjects.generate_date_axis_label()
+
+        if show_eda_table:
+            table = subjects.metrics_table(
                 data_type=DataType.EDA,
                 activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
                 date_indices=date_indices,
             )
-            print(r"")
-        TableUtils.print_document_tail(elements)
+            report = TableUtils.print_document_header("results")
+            report.write_line(r" \section*{Mean of all subjects}")
+            subjects.print_table(
+                data_type=DataType.EDA,
+                activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
+                date_indices=date_indices,
+                table=table,
+                report=report,
+            )
+            report.write_line("")
+            subjects.print_sections(
+                report,
+                data_type=DataType.EDA,
+                activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
+                date_indices=date_indices,
+                table=table,
+            )
+            TableUtils.print_document_tail(report)
+
+        if show_eda_fig or show_hr_bpm_fig or show_hr_ibi_fig or show_eda_peak_fig:
+            all_fig_eda = [None] * (len(subjects) if figure_per_subject else 1)
+            all_fig_eda_peaks = [None] * (len(subjects) if figure_per_subject else 1)
+            all_fig_hr_bpm = [None] * (len(subjects) if figure_per_subject else 1)
+            all_fig_hr_ibi = [None] * (len(subjects) if figure_per_subject else 1)
+            for i, subject in enumerate(subjects):
+                i_plot = i if figure_per_subject else 0
+
+                if show_eda_fig:
+                    all_fig_eda[i_plot] = subject.plot(
+                        data_type=DataType.EDA,
+                        activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
+                        figure=all_fig_eda[i_plot],
+                        date_indices=date_indices,
+                        colors=("g", "b", "r"),
+                        plot_eda_peaks=plot_eda_peaks,
+                        zoomable=zoomable_plots,
+                    )
+                if show_eda_peak_fig:
+                    all_fig_eda_peaks[i_plot] = subject.plot_eda_figures(
+                        activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
+                        figure=all_fig_eda_peaks[i_plot],
+                        date_indices=date_indices,
+                        colors=("g", "b", "r"),
+                        x_axis=date_labels,
+                        y_lim=(0, 10),
+                    )
+                if show_hr_bpm_fig:
+                    all_fig_hr_bpm[i_plot] = subject.plot(
+                        data_type=DataType.HR_BPM,
+                        activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
+                        figure=all_fig_hr_bpm[i_plot],
+                        date_indices=date_indices,
+                        colors=("g", "b", "r"),
+                        zoomable=zoomable_plots,
+                    )
+                if show_hr_ibi_fig:
+                    all_fig_hr_ibi[i_plot] = subject.plot(
+                        data_type=DataType.HR_IBI,
+                        activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
+                        figure=all_fig_hr_ibi[i_plot],
+                        date_indices=date_indices,
+                        colors=("g", "b", "r"),
+                        zoomable=zoomable_plots,
+                    )
+
+            if should_savefig and parallel_savefig:
+                specs = []
+                for i in range(len(all_fig_eda)):
+                    postfix = f"subject_{i}" if figure_per_subject else ""
+                    specs.append(PlotUtils.figure_spec("results", all_fig_eda[i], DataType.EDA, postfix=postfix))
+                    peaks_postfix = f"peaks_{postfix}" if postfix else "peaks"
+                    specs.append(
+                        PlotUtils.figure_spec("results", all_fig_eda_peaks[i], DataType.EDA, postfix=peaks_postfix)
+                    )
+                    specs.append(PlotUtils.figure_spec("results", all_fig_hr_bpm[i], DataType.HR_BPM, postfix=postfix))
+                    specs.append(PlotUtils.figure_spec("results", all_fig_hr_ibi[i], DataType.HR_IBI, postfix=postfix))
+                PlotUtils.render_figures(specs)
+            elif should_savefig:
+                if figure_per_subject:
+                    for i in range(len(subjects)):
+                        PlotUtils.savefig(path_folder="results", fig=all_fig_eda[i], data_type=DataType.EDA, postfix=f"subject_{i}")
+                        PlotUtils.savefig(path_folder="results", fig=all_fig_eda_peaks[i], data_type=DataType.EDA, postfix=f"peaks_subject_{i}")
+                        PlotUtils.savefig(path_folder="results", fig=all_fig_hr_bpm[i], data_type=DataType.HR_BPM, postfix=f"subject_{i}")
+                        PlotUtils.savefig(path_folder="results", fig=all_fig_hr_ibi[i], data_type=DataType.HR_IBI, postfix=f"subject_{i}")
+                else:
+                    PlotUtils.savefig(path_folder="results", fig=all_fig_eda[0], data_type=DataType.EDA)
+                    PlotUtils.savefig(path_folder="results", fig=all_fig_eda_peaks[0], data_type=DataType.EDA, postfix="peaks")
+                    PlotUtils.savefig(path_folder="results", fig=all_fig_hr_bpm[0], data_type=DataType.HR_BPM)
+                    PlotUtils.savefig(path_folder="results", fig=all_fig_hr_ibi[0], data_type=DataType.HR_IBI)
+
+            for fig_eda, fig_eda_peaks, fig_hr_bpm, fig_hr_ibi in zip(all_fig_eda, all_fig_eda_peaks, all_fig_hr_bpm, all_fig_hr_ibi):
+                PlotUtils.add_legend(fig_eda)
+                PlotUtils.add_legend(fig_eda_peaks)
+                PlotUtils.add_legend(fig_hr_bpm)
+                PlotUtils.add_legend(fig_hr_ibi)
+
+    if profiler is not None:
+        profiler.stop()
+        print(profiler.summary())
+        if profile_trace_path is not None:
+            profiler.save_trace(profile_trace_path)
 
     if show_eda_fig or show_hr_bpm_fig or show_hr_ibi_fig or show_eda_peak_fig:
-        all_fig_eda = [None] * (len(subjects) if figure_per_subject else 1)
-        all_fig_eda_peaks = [None] * (len(subjects) if figure_per_subject else 1)
-        all_fig_hr_bpm = [None] * (len(subjects) if figure_per_subject else 1)
-        all_fig_hr_ibi = [None] * (len(subjects) if figure_per_subject else 1)
-        for i, subject in enumerate(subjects):
-            i_plot = i if figure_per_subject else 0
-
-            if show_eda_fig:
-                all_fig_eda[i_plot] = subject.plot(
-                    data_type=DataType.EDA,
-                    activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
-                    figure=all_fig_eda[i_plot],
-                    date_indices=date_indices,
-                    colors=("g", "b", "r"),
-                    plot_eda_peaks=plot_eda_peaks,
-                )
-            if show_eda_peak_fig:
-                all_fig_eda_peaks[i_plot] = subject.plot_eda_figures(
-                    activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
-                    figure=all_fig_eda_peaks[i_plot],
-                    date_indices=date_indices,
-                    colors=("g", "b", "r"),
-                    x_axis=date_labels,
-                    y_lim=(0, 10),
-                )
-            if show_hr_bpm_fig:
-                all_fig_hr_bpm[i_plot] = subject.plot(
-                    data_type=DataType.HR_BPM,
-                    activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
-                    figure=all_fig_hr_bpm[i_plot],
-                    date_indices=date_indices,
-                    colors=("g", "b", "r"),
-                )
-            if show_hr_ibi_fig:
-                all_fig_hr_ibi[i_plot] = subject.plot(
-                    data_type=DataType.HR_IBI,
-                    activity_types=(ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR),
-                    figure=all_fig_hr_ibi[i_plot],
-                    date_indices=date_indices,
-                    colors=("g", "b", "r"),
-                )
-
-        if should_savefig:
-            if figure_per_subject:
-                for i in range(len(subjects)):
-                    PlotUtils.savefig(path_folder="results", fig=all_fig_eda[i], data_type=DataType.EDA, postfix=f"subject_{i}")
-                    PlotUtils.savefig(path_folder="results", fig=all_fig_eda_peaks[i], data_type=DataType.EDA, postfix=f"peaks_subject_{i}")
-                    PlotUtils.savefig(path_folder="results", fig=all_fig_hr_bpm[i], data_type=DataType.HR_BPM, postfix=f"subject_{i}")
-                    PlotUtils.savefig(path_folder="results", fig=all_fig_hr_ibi[i], data_type=DataType.HR_IBI, postfix=f"subject_{i}")
-            else:
-                PlotUtils.savefig(path_folder="results", fig=all_fig_eda[0], data_type=DataType.EDA)
-                PlotUtils.savefig(path_folder="results", fig=all_fig_eda_peaks[0], data_type=DataType.EDA, postfix="peaks")
-                PlotUtils.savefig(path_folder="results", fig=all_fig_hr_bpm[0], data_type=DataType.HR_BPM)
-                PlotUtils.savefig(path_folder="results", fig=all_fig_hr_ibi[0], data_type=DataType.HR_IBI)
-
-        for fig_eda, fig_eda_peaks, fig_hr_bpm, fig_hr_ibi in zip(all_fig_eda, all_fig_eda_peaks, all_fig_hr_bpm, all_fig_hr_ibi):
-            PlotUtils.add_legend(fig_eda)
-            PlotUtils.add_legend(fig_eda_peaks)
-            PlotUtils.add_legend(fig_hr_bpm)
-            PlotUtils.add_legend(fig_hr_ibi)
         PlotUtils.show()
 
 
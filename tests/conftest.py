@@ -0,0 +1,26 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from empatica import synthetic  # noqa: E402 (the package is found through the path above)
+
+
+@pytest.fixture(scope="session")
+def cohort_folder(tmp_path_factory) -> str:
+    """A synthetic cohort of two subjects recorded on two dates for half an hour, see synthetic.write_synthetic_cohort"""
+    folder = str(tmp_path_factory.mktemp("cohort"))
+    synthetic.write_synthetic_cohort(folder, n_subjects=2, n_dates=2, duration_in_hours=0.5, seed=0)
+    return folder
+
+
+@pytest.fixture
+def data_folder(cohort_folder, tmp_path) -> str:
+    """A fresh copy of the cohort (with a trailing separator, as Subjects expects), so the caches written by a test
+    are never read by another one"""
+    folder = os.path.join(str(tmp_path), "data")
+    shutil.copytree(cohort_folder, folder)
+    return os.path.join(folder, "")
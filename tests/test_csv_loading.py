@@ -0,0 +1,119 @@
+import csv
+import datetime
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+from empatica import ActivityType, ReportWriter, synthetic
+from empatica.empatica_reader import EmpaticaReader
+
+
+class _CsvOnlyReader(EmpaticaReader):
+    """Minimal reader that only exercises the csv loading"""
+
+    use_raw_cache = False
+
+    def extra_labels(self) -> tuple[str, ...]:
+        return ("",)
+
+    def _table_columns(self) -> str:
+        return ""
+
+    def _print_table_header(self, report: ReportWriter) -> None:
+        pass
+
+    def get_table_value(self, activity_type: ActivityType = ActivityType.All, **options) -> tuple:
+        return ()
+
+    def print_table(
+        self,
+        activity_type: ActivityType = ActivityType.All,
+        values: tuple = None,
+        report: ReportWriter = None,
+        **options,
+    ) -> None:
+        pass
+
+
+class _CachedCsvOnlyReader(_CsvOnlyReader):
+    use_raw_cache = True
+
+
+def _legacy_parse(path: str) -> tuple[datetime.datetime, int, np.ndarray, np.ndarray]:
+    """Parse the csv file row by row, as it was before the bulk loading"""
+    initial_t, rate = None, None
+    t_data, data = [], []
+    with open(path) as file:
+        for row in csv.reader(file, delimiter="\n"):
+            if not row:
+                continue
+            if initial_t is None:
+                initial_t = datetime.datetime.fromtimestamp(int(row[0][: row[0].find(".")]))
+            elif rate is None:
+                rate = int(row[0][: row[0].find(".")])
+            else:
+                t_data.append(0 if not t_data else (t_data[-1] + 1 / rate))
+                data.append([float(value) for value in row[0].split(",")])
+    return initial_t, rate, np.array(t_data), np.array(data)
+
+
+def _write_csv(folder: str, n_cols: int, n_samples: int = 5000, rate: int = 32) -> tuple[str, np.ndarray]:
+    path = os.path.join(folder, "01_2022-06-28_Empatica_ACC.csv")
+    data = np.random.default_rng(0).normal(size=(n_samples, n_cols))
+    synthetic.write_empatica_csv(path, datetime.datetime(2022, 6, 28, 8), data, rate=rate)
+    return path, data
+
+
+@pytest.mark.parametrize("n_cols", (1, 3))
+def test_bulk_parse_matches_legacy_parse(tmp_path, n_cols):
+    path, _ = _write_csv(str(tmp_path), n_cols)
+    initial_t, rate, t_data, data = _legacy_parse(path)
+
+    reader = _CsvOnlyReader(path, n_cols=n_cols)
+    assert reader.initial_t == initial_t
+    assert reader.rate == rate
+    np.testing.assert_allclose(reader.t_data, t_data)
+    np.testing.assert_allclose(reader.actual_data, data)
+    assert reader.daytime_data[-1].item() == initial_t + datetime.timedelta(seconds=t_data[-1])
+
+
+def test_raw_cache_matches_csv(tmp_path):
+    path, _ = _write_csv(str(tmp_path), 3)
+    parsed = _CsvOnlyReader(path, n_cols=3)
+    _CachedCsvOnlyReader(path, n_cols=3)  # Writes the raw cache
+    cached = _CachedCsvOnlyReader(path, n_cols=3)
+
+    assert isinstance(cached.actual_data, np.memmap)
+    assert cached.initial_t == parsed.initial_t and cached.rate == parsed.rate
+    np.testing.assert_allclose(cached.t_data, parsed.t_data)
+    np.testing.assert_allclose(cached.actual_data, parsed.actual_data)
+
+
+def test_appended_rows_are_added_to_the_raw_cache(tmp_path):
+    path, data = _write_csv(str(tmp_path), 3)
+    _CachedCsvOnlyReader(path, n_cols=3)  # Writes the raw cache
+    appended = np.random.default_rng(1).normal(size=(100, 3))
+    with open(path, "a") as file:
+        for row in appended:
+            file.write(",".join(repr(float(value)) for value in row) + "\n")
+    # The rows are appended within the resolution of the file times, move them as if it was done later
+    modified = os.path.getmtime(path) + 1
+    os.utime(path, (modified, modified))
+
+    reader = _CachedCsvOnlyReader(path, n_cols=3)
+    np.testing.assert_allclose(reader.actual_data, _legacy_parse(path)[3])
+    np.testing.assert_allclose(reader.t_data, np.arange(data.shape[0] + 100) / reader.rate)
+
+
+@pytest.mark.parametrize("size", (None, 0, 1000, 4096))
+def test_file_is_hashed_in_blocks(tmp_path, size):
+    path, _ = _write_csv(str(tmp_path), 3)
+    with open(path, "rb") as file:
+        content = file.read()[:size]
+    with open(path, "rb") as file:
+        n_read, digest, last_byte = EmpaticaReader._hash_file(file, size, block_size=100)
+    assert n_read == len(content)
+    assert digest == hashlib.sha256(content).hexdigest()
+    assert last_byte == content[-1:]
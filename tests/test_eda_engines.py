@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from empatica import NativeEdaEngine
+from empatica.synthetic import synthetic_eda
+
+rate = 4
+duration = 3600  # in second
+segment_width = 600  # in second
+tolerance = 2.0  # in second, the maximum distance between a detected and a true peak to be considered a match
+
+
+def _detected_peak_times(results: tuple[dict, dict]) -> np.ndarray:
+    """Get the time of every peak found by an engine, from the per-segment indices"""
+    summary, peaks = results
+    times = [
+        (np.asarray(index, dtype=int) + first) / rate
+        for index, (first, _) in zip(peaks["indexlist"], summary["segment_indices"])
+    ]
+    return np.concatenate(times) if times else np.zeros(0)
+
+
+def _match(reference: np.ndarray, detected: np.ndarray) -> int:
+    """Count the pairs of a reference and a detected peak within the tolerance, each peak being in at most one pair
+    (so the count is below the number of peaks of both). The closest pairs are matched first"""
+    detected = np.sort(detected)
+    firsts = np.searchsorted(detected, reference - tolerance)
+    lasts = np.searchsorted(detected, reference + tolerance, side="right")
+    pairs = sorted(
+        (abs(detected[j] - time), i, j) for i, time in enumerate(reference) for j in range(firsts[i], lasts[i])
+    )
+
+    matched_reference, matched_detected = set(), set()
+    for _, i, j in pairs:
+        if i not in matched_reference and j not in matched_detected:
+            matched_reference.add(i)
+            matched_detected.add(j)
+    return len(matched_reference)
+
+
+def test_match_pairs_each_peak_once():
+    assert _match(np.array((10.0, 10.5)), np.array((10.2,))) == 1
+    assert _match(np.array((10.0,)), np.array((9.0, 10.1, 11.0))) == 1
+    assert _match(np.array((10.0, 20.0)), np.array((10.0, 23.0))) == 1
+
+
+@pytest.mark.parametrize("seed", (0, 1))
+def test_native_engine_finds_the_true_peaks_of_the_synthetic_signal(seed):
+    data, true_peaks = synthetic_eda(rate, duration, np.random.default_rng(seed), n_responses_per_minute=4)
+    results = NativeEdaEngine().process(data, rate, segment_width)
+    summary, peaks = results
+    assert summary["segment_indices"] == [(first, first + 2400) for first in range(0, 14400, 2400)]
+    assert summary["number_of_peaks"] == [len(index) for index in peaks["indexlist"]]
+
+    times = _detected_peak_times(results)
+    n_matches = _match(true_peaks, times)
+    assert n_matches / true_peaks.size >= 0.85  # recall
+    assert n_matches / times.size >= 0.95  # precision
@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pytest
+
+from empatica import ActivityType, EdaPeakEngine, NativeEdaEngine, PyEdaEngine
+from empatica.eda_reader import EdaReader
+
+
+class _CountingEngine(NativeEdaEngine):
+    """Native engine that counts the signals it processes"""
+
+    def __init__(self):
+        super(_CountingEngine, self).__init__()
+        self.n_processed = 0
+
+    def process(self, data: np.ndarray, rate: int, segment_width: float) -> tuple[dict, dict]:
+        self.n_processed += 1
+        return super(_CountingEngine, self).process(data, rate, segment_width)
+
+
+def _read(data_folder: str, engine: EdaPeakEngine, reprocess_eda: bool = False, **options) -> EdaReader:
+    return EdaReader(
+        f"{data_folder}01_2022-06-27_Empatica_EDA.csv",
+        f"{data_folder}timings.xlsx",
+        segment_width=60,
+        reprocess_eda=reprocess_eda,
+        engine=engine,
+        **options,
+    )
+
+
+def _change_sample(path: str, index: int) -> None:
+    """Change the value of a data row of a csv file, as if it was edited later on"""
+    with open(path) as file:
+        lines = file.readlines()
+    lines[2 + index] = f"{float(lines[2 + index]) + 1:.6f}\n"
+    with open(path, "w") as file:
+        file.writelines(lines)
+    modified = os.path.getmtime(path) + 1  # Later than the raw cache, whatever the resolution of the file times
+    os.utime(path, (modified, modified))
+
+
+def _assert_same_peaks(reader: EdaReader, other: EdaReader) -> None:
+    for activity_type in reader.activity_indices:
+        for name, values in reader.peak_arrays(activity_type).items():
+            np.testing.assert_allclose(other.peak_arrays(activity_type)[name], values, err_msg=name)
+
+
+def test_incremental_processing_only_reprocesses_the_changed_activities(data_folder):
+    engine = _CountingEngine()
+    first = _read(data_folder, engine, incremental=True)
+    assert engine.n_processed == len(first.activity_indices)
+    _assert_same_peaks(_read(data_folder, _CountingEngine(), reprocess_eda=True), first)
+
+    # A sample of the camp activity changes, so it is the only activity processed again
+    camp_first, _ = first.activity_index(ActivityType.Camp)
+    _change_sample(first.path, camp_first + 10)
+    engine = _CountingEngine()
+    second = _read(data_folder, engine, incremental=True)
+    assert engine.n_processed == 1
+
+    # The peaks are the ones of a full processing of the changed data
+    reference = _read(data_folder, _CountingEngine(), reprocess_eda=True)
+    _assert_same_peaks(reference, second)
+    for activity_type in reference.activity_indices:
+        assert reference.metrics(activity_type) == second.metrics(activity_type)
+
+
+def test_appended_data_out_of_the_activities_are_not_processed(data_folder):
+    first = _read(data_folder, _CountingEngine(), incremental=True)
+    with open(first.path, "a") as file:
+        file.writelines(f"{value:.6f}\n" for value in np.linspace(1, 2, 100))
+    modified = os.path.getmtime(first.path) + 1
+    os.utime(first.path, (modified, modified))
+
+    engine = _CountingEngine()
+    second = _read(data_folder, engine, incremental=True)
+    assert second.n_samples == first.n_samples + 100
+    assert engine.n_processed == 0
+    _assert_same_peaks(_read(data_folder, _CountingEngine(), reprocess_eda=True), second)
+
+
+def test_unchanged_data_are_not_processed_again(data_folder):
+    first = _read(data_folder, _CountingEngine())
+    engine = _CountingEngine()
+    second = _read(data_folder, engine)
+    assert engine.n_processed == 0
+    _assert_same_peaks(first, second)
+
+
+@pytest.mark.parametrize("engine_type", (PyEdaEngine, NativeEdaEngine))
+def test_parallel_peaks_match_serial_peaks(data_folder, engine_type):
+    if engine_type is PyEdaEngine:
+        pytest.importorskip("pyEDA.main")
+    serial = _read(data_folder, engine_type(), n_workers=1)
+    parallel = _read(data_folder, engine_type(), n_workers=2, reprocess_eda=True)
+    assert sum(serial.peak(activity_type).size for activity_type in serial.activity_indices) > 0
+    _assert_same_peaks(serial, parallel)
+    for activity_type in serial.activity_indices:
+        assert parallel.n_segments(activity_type) == serial.n_segments(activity_type)
+        assert parallel.metrics(activity_type) == serial.metrics(activity_type)
+
+
+def test_metrics_are_computed_once_from_the_peaks(data_folder):
+    reader = _read(data_folder, _CountingEngine())
+    summary, peaks = reader.pyeda_peaks[ActivityType.Camp]
+    metrics = reader.metrics(ActivityType.Camp)
+    activity_time = np.mean([last - first for first, last in peaks["segment_indices"]]) / reader.rate
+    assert metrics.n_peaks == np.mean(summary["number_of_peaks"]) > 0
+    assert metrics.activity_time == pytest.approx(activity_time)
+    assert metrics.peak_per_second == pytest.approx(metrics.n_peaks / activity_time)
+    assert metrics.max_peak_value == pytest.approx(np.mean(summary["max_of_peaks"]))
+    assert metrics.table_values == pytest.approx(
+        (metrics.n_peaks, activity_time / 60, metrics.n_peaks / activity_time * 60, metrics.max_peak_value)
+    )
+    assert reader.metrics(ActivityType.Camp) is metrics
+
+    # New peaks are measured again
+    reader.pyeda_peaks = {**reader.pyeda_peaks, ActivityType.Camp: reader.pyeda_peaks[ActivityType.VR]}
+    assert reader.metrics(ActivityType.Camp) == reader.metrics(ActivityType.VR)
+
+
+def test_legacy_peaks_file_is_removed(data_folder):
+    legacy_path = f"{data_folder}01_2022-06-27_Empatica_EDA_processed.pyeda"
+    with open(legacy_path, "wb") as file:
+        file.write(b"peaks of a previous version")
+    _read(data_folder, _CountingEngine())
+    assert not os.path.exists(legacy_path)
@@ -0,0 +1,83 @@
+import csv
+import os
+
+import pytest
+
+import merge_actigraph_data
+from merge_actigraph_data import FolderSuffixe, output_header
+
+# The values of a file, without Subject, Date and Type which are filled by the merge
+value_names = [name for name in output_header if name not in ("Subject", "Date", "Type")]
+
+
+def _write_export(folder: str, subject: str, date: str, suffixe: FolderSuffixe, n_rows: int = 1, **columns) -> list:
+    """Write an ActiGraph export whose columns are in reverse order, returns its rows as the merge writes them"""
+    os.makedirs(os.path.join(folder, suffixe.name), exist_ok=True)
+    header = list(columns) + value_names[::-1]
+    rows = [
+        list(columns.values()) + [f"{subject} {date} {suffixe.name} {name} {i}" for name in value_names[::-1]]
+        for i in range(n_rows)
+    ]
+    with open(os.path.join(folder, suffixe.name, f"{subject}_{date}_{suffixe.value}.csv"), "w", newline="") as file:
+        csv.writer(file).writerows([header] + rows)
+
+    defaults = {"Subject": subject, "Date": date, "Type": suffixe.name}
+    return [[{**defaults, **dict(zip(header, row))}[name] for name in output_header] for row in rows]
+
+
+def _read(path: str) -> list[list[str]]:
+    with open(path, newline="") as file:
+        return list(csv.reader(file))
+
+
+def test_selected_trials_are_merged_in_order(tmp_path):
+    folder = str(tmp_path / "actigraph")
+    trials = (("01", "2022-06-28"), ("01", "2022-06-30"), ("02", "2022-06-28"))
+    written = {}
+    for subject, date in reversed(trials):
+        for suffixe in FolderSuffixe:
+            written[(subject, date, suffixe)] = _write_export(folder, subject, date, suffixe, n_rows=2)
+    # The Subject and Date columns are read from the file when it has them
+    written[("01", "2022-06-28", FolderSuffixe.VR)] = _write_export(
+        folder, "01", "2022-06-28", FolderSuffixe.VR, Subject="S01", Date="June 28"
+    )
+    _write_export(folder, "03", "2022-06-28", FolderSuffixe.CAMP)  # Not selected
+
+    output = str(tmp_path / "merged.csv")
+    trial_args = ["--trial", "01", "2022-06-28", "2022-06-30", "--trial", "02", "2022-06-28"]
+    merge_actigraph_data.main(["--input", folder, "--output", output, "--n-workers", "2"] + trial_args)
+
+    rows = _read(output)
+    assert rows[0] == output_header
+    assert rows[1:] == [
+        row for subject, date in trials for suffixe in FolderSuffixe for row in written[(subject, date, suffixe)]
+    ]
+    assert rows[1][:4] == ["01", "2022-06-28", "CAMP", "01 2022-06-28 CAMP METs 0"]
+    assert rows[5][:3] == ["S01", "June 28", "VR"]
+
+
+def test_all_files_are_merged_when_more_files_than_the_pending_window(tmp_path):
+    folder = str(tmp_path / "actigraph")
+    expected = []
+    for i in range(10):
+        for suffixe in FolderSuffixe:
+            expected += _write_export(folder, f"{i:02d}", "2022-06-28", suffixe)
+    output = str(tmp_path / "merged.csv")
+    files = merge_actigraph_data.discover_files(folder)
+    assert len(files) == 30
+    assert merge_actigraph_data.merge(files, output, n_workers=1) == 30
+    assert _read(output)[1:] == expected
+
+
+def test_missing_files_and_columns_are_reported(tmp_path):
+    folder = str(tmp_path / "actigraph")
+    _write_export(folder, "01", "2022-06-28", FolderSuffixe.CAMP)
+    with pytest.raises(FileNotFoundError, match="01_2022-06-28_ActiGraph_VR.csv"):
+        merge_actigraph_data.discover_files(folder, {"01": ["2022-06-28"]})
+
+    path = os.path.join(folder, "CAMP", "01_2022-06-28_ActiGraph_CAMP.csv")
+    with open(path, "w") as file:
+        file.write("METs\n1.0\n")
+    files = merge_actigraph_data.discover_files(folder)
+    with pytest.raises(ValueError, match="% in Sedentary"):
+        merge_actigraph_data.merge(files, str(tmp_path / "merged.csv"))
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from empatica import ActivityType, DataType, MetricsTable, NativeEdaEngine, Subjects
+
+
+def _table() -> MetricsTable:
+    return MetricsTable(
+        ("a", "b"),
+        [
+            ("01", "2022-06-27", "camp", (1.0, 10.0)),
+            ("01", "2022-06-28", "camp", (3.0, 20.0)),
+            ("02", "2022-06-27", "camp", (5.0, 60.0)),
+            ("01", "2022-06-27", "vr", (2.0, 0.0)),
+        ],
+    )
+
+
+def test_get_and_column():
+    table = _table()
+    assert len(table) == 4
+    assert table.get("01", "2022-06-28", ActivityType.Camp) == (3.0, 20.0)
+    np.testing.assert_array_equal(table.column("b"), (10.0, 20.0, 60.0, 0.0))
+    with pytest.raises(KeyError):
+        table.get("02", "2022-06-28", ActivityType.Camp)
+
+
+@pytest.mark.parametrize(
+    "reduction, percentile, expected",
+    (
+        ("mean", None, ((3.0, 30.0), (2.0, 0.0))),
+        ("median", None, ((3.0, 20.0), (2.0, 0.0))),
+        ("std", None, ((np.sqrt(8 / 3), np.sqrt(1400 / 3)), (0.0, 0.0))),
+        ("count", None, ((3.0, 3.0), (1.0, 1.0))),
+        ("percentile", 25, ((2.0, 15.0), (2.0, 0.0))),
+    ),
+)
+def test_reduce_by_activity(reduction, percentile, expected):
+    keys, values = _table().reduce(by=("activity",), reduction=reduction, percentile=percentile)
+    assert keys["activity"].tolist() == ["camp", "vr"]
+    np.testing.assert_allclose(values, expected)
+
+
+def test_reduce_by_several_keys_and_by_nothing():
+    keys, values = _table().reduce(by=("subject", "activity"))
+    assert [(key["subject"], key["activity"]) for key in keys] == [("01", "camp"), ("01", "vr"), ("02", "camp")]
+    np.testing.assert_allclose(values, ((2.0, 15.0), (2.0, 0.0), (5.0, 60.0)))
+
+    keys, values = _table().reduce(by=())
+    assert keys.shape == (1,)
+    np.testing.assert_allclose(values, ((2.75, 22.5),))
+
+
+def test_reduce_errors():
+    with pytest.raises(ValueError):
+        _table().reduce(by=("time",))
+    with pytest.raises(ValueError):
+        _table().reduce(reduction="percentile")
+    with pytest.raises(ValueError):
+        _table().reduce(reduction="max")
+
+
+def test_table_of_subjects_holds_the_values_of_the_readers(data_folder):
+    subjects = Subjects(data_folder, eda_engine=NativeEdaEngine(), load_eda=False)
+    subjects.add("01", ["2022-06-27", "2022-06-28"])
+    activity_types = (ActivityType.Camp, ActivityType.VR)
+    table = subjects.metrics_table(DataType.EDA, activity_types=activity_types)
+
+    assert len(table) == 4
+    assert table.metric_names == ("n_peaks", "total_time", "peak_per_minute", "max_peak_value")
+    for date_index, date in enumerate(subjects[0].dates):
+        for activity_type in activity_types:
+            expected = subjects[0].eda[date_index].get_table_value(activity_type)
+            assert table.get("01", date, activity_type) == expected
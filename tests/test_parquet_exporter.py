@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+from empatica import DataType, NativeEdaEngine, ParquetExporter, Subjects
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _subjects(data_folder: str) -> Subjects:
+    subjects = Subjects(data_folder, eda_engine=NativeEdaEngine(), load_eda=False)
+    subjects.add("01", ["2022-06-27"])
+    return subjects
+
+
+def test_signals_and_peaks_are_exported_by_partition(data_folder, tmp_path):
+    subjects = _subjects(data_folder)
+    folder = str(tmp_path / "parquet")
+    paths = subjects.export_parquet(folder, data_types=(DataType.EDA, DataType.ACC), chunk_size=1000)
+    partition = ParquetExporter(folder).partition("01", "2022-06-27", DataType.EDA)
+    assert paths[:2] == [os.path.join(partition, "signal.parquet"), os.path.join(partition, "peaks.parquet")]
+    assert len(paths) == 3
+
+    reader = subjects[0].eda[0]
+    signal = pq.read_table(paths[0]).to_pydict()
+    assert pq.ParquetFile(paths[0]).metadata.num_row_groups == -(-reader.n_samples // 1000)
+    np.testing.assert_allclose(signal["t"], reader.t_data)
+    np.testing.assert_allclose(signal["EDA"], reader.actual_data[:, 0])
+    for activity_type, (first, last) in reader.activity_indices.items():
+        assert set(signal["activity"][first:last]) == {activity_type.value}
+    labelled = sum(last - first for first, last in reader.activity_indices.values())
+    assert signal["activity"].count(None) == reader.n_samples - labelled
+
+    peaks = pq.read_table(paths[1]).to_pydict()
+    n_peaks = sum(reader.peak(activity_type).size for activity_type in reader.activity_indices)
+    assert len(peaks["value"]) == n_peaks > 0
+    np.testing.assert_allclose(np.array(signal["t"])[peaks["index"]], peaks["t"])
+    values = [reader.peak(activity_type) for activity_type in reader.activity_indices]
+    np.testing.assert_allclose(peaks["value"], np.concatenate(values))
+
+    acc = pq.read_table(paths[2]).to_pydict()
+    assert sorted(acc) == ["ACC_x", "ACC_y", "ACC_z", "activity", "daytime", "t"]
+    np.testing.assert_allclose(acc["ACC_y"], subjects[0].acc[0].actual_data[:, 1])
+
+
+def test_reader_without_samples_is_exported_as_an_empty_table(data_folder, tmp_path, monkeypatch):
+    reader = _subjects(data_folder)[0].hr_bpm[0]
+    monkeypatch.setattr(reader, "iter_chunks", lambda **_: iter(()))
+    path, *_ = ParquetExporter(str(tmp_path)).export(reader, DataType.HR_BPM)
+
+    table = pq.read_table(path)
+    assert table.num_rows == 0
+    assert table.column_names == ["t", "daytime", "activity", "HR"]
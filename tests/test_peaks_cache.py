@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+
+from empatica.peaks_cache import PeaksCache
+
+
+def test_key_depends_on_the_data_and_on_every_parameter():
+    data = np.arange(10.0)
+    key = PeaksCache.key(data, 1.0, 60, 4, engine="native")
+    assert PeaksCache.key(data.copy(), 1.0, 60, 4, engine="native") == key
+    assert PeaksCache.key(data.astype(np.float32), 1.0, 60, 4, engine="native") == key
+    changed = data.copy()
+    changed[3] += 1e-9
+    for other in (
+        PeaksCache.key(changed, 1.0, 60, 4, engine="native"),
+        PeaksCache.key(data, 2.0, 60, 4, engine="native"),
+        PeaksCache.key(data, 1.0, 30, 4, engine="native"),
+        PeaksCache.key(data, 1.0, 60, 8, engine="native"),
+        PeaksCache.key(data, 1.0, 60, 4, engine="pyEDA"),
+    ):
+        assert other != key
+
+
+def test_entries_are_saved_and_loaded(tmp_path):
+    cache = PeaksCache(str(tmp_path / "cache"))
+    assert cache.load("missing") is None
+    cache.save("key", {"peaks": [1, 2]})
+    assert cache.load("key") == {"peaks": [1, 2]}
+
+    with open(os.path.join(cache.folder, "corrupted.pyeda"), "wb") as file:
+        file.write(b"not a pickle")
+    assert cache.load("corrupted") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    entry = np.zeros(1000)  # About 8 kB once pickled
+    cache = PeaksCache(str(tmp_path), max_size=30000)
+    for i, key in enumerate(("a", "b", "c")):
+        cache.save(key, entry)
+        os.utime(cache._entry_path(key), (i, i))  # Saved one after the other, whatever the resolution of the times
+    cache.load("a")  # Now the most recently used
+
+    cache.save("d", entry)
+    assert sorted(os.listdir(str(tmp_path))) == ["a.pyeda", "c.pyeda", "d.pyeda"]
+
+    # The entry just saved is kept even if it does not fit
+    PeaksCache(str(tmp_path), max_size=0).save("e", entry)
+    assert os.listdir(str(tmp_path)) == ["e.pyeda"]
+
+
+def test_nothing_is_saved_when_the_folder_cannot_be_written(tmp_path):
+    path = str(tmp_path / "file")
+    with open(path, "w") as file:
+        file.write("a file where the cache folder should be")
+    cache = PeaksCache(path)
+    cache.save("key", [1, 2])  # Does not raise
+    assert cache.load("key") is None
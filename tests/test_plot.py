@@ -0,0 +1,62 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib import pyplot as plt  # noqa: E402 (the backend is chosen first)
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from empatica import ActivityType  # noqa: E402
+from empatica.acc_reader import AccReader  # noqa: E402
+from empatica.empatica_reader import EmpaticaReader  # noqa: E402
+
+
+@pytest.mark.parametrize("n_samples", (1000, 1001, 12345))
+def test_min_max_decimation_keeps_the_extrema_of_each_bucket(n_samples):
+    rng = np.random.default_rng(0)
+    t = np.arange(n_samples) / 32
+    data = rng.normal(size=(n_samples, 3))
+    n_buckets = 97
+
+    decimated_t, decimated_data = EmpaticaReader._min_max_decimate(t, data, n_buckets)
+    size = int(np.ceil(n_samples / n_buckets))
+    assert decimated_t.shape == decimated_data.shape == (2 * -(-n_samples // size), 3)
+    for col in range(3):
+        # The points are samples of the column, in the order they occur
+        indices = np.searchsorted(t, decimated_t[:, col])
+        np.testing.assert_array_equal(data[indices, col], decimated_data[:, col])
+        assert np.all(np.diff(indices) >= 0)
+
+        # Each bucket is reduced to its min and max
+        for bucket, first in enumerate(range(0, n_samples, size)):
+            values = decimated_data[2 * bucket : 2 * bucket + 2, col]
+            assert values.min() == data[first : first + size, col].min()
+            assert values.max() == data[first : first + size, col].max()
+
+
+def test_min_max_decimation_leaves_short_signals_untouched():
+    t = np.arange(10.0)
+    data = np.arange(10.0)[:, np.newaxis]
+    decimated_t, decimated_data = EmpaticaReader._min_max_decimate(t, data, 5)
+    assert decimated_t is t and decimated_data is data
+
+
+def test_decimated_plot_keeps_the_range_of_the_data(data_folder):
+    path = f"{data_folder}01_2022-06-27_Empatica_ACC.csv"
+    streamed = AccReader(path, f"{data_folder}timings.xlsx", streaming=True)
+    reader = AccReader(path, f"{data_folder}timings.xlsx")
+    data = reader.data(ActivityType.Camp)
+
+    lines = []
+    for plotted in (reader, streamed):
+        fig = plt.figure()
+        ax = plotted.add_to_plot(ActivityType.Camp, ax=fig.gca(), n_buckets=200)
+        lines.append([(line.get_xdata(), line.get_ydata()) for line in ax.get_lines()])
+        plt.close(fig)
+
+    for col, (t, values) in enumerate(lines[0]):
+        assert values.size <= 400
+        assert values.min() == data[:, col].min() and values.max() == data[:, col].max()
+        # The streamed reader is decimated chunk by chunk to the same points
+        np.testing.assert_allclose(lines[1][col][0], t)
+        np.testing.assert_allclose(lines[1][col][1], values)
@@ -0,0 +1,84 @@
+import os
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib import pyplot as plt  # noqa: E402 (the backend is chosen first)
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from empatica import DataType, FigureSpec, PlotUtils  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def low_resolution(monkeypatch):
+    """The figures are compared pixel by pixel, a low resolution is enough"""
+    monkeypatch.setattr(PlotUtils, "dpi", 40)
+
+
+def _line_figure() -> plt.Figure:
+    fig = plt.figure()
+    ax = fig.gca()
+    ax.plot(np.arange(10), np.arange(10) ** 2, "r-o", label="square")
+    ax.plot([0, 9], [3, 1], color="k", linewidth=3)
+    ax.set_title("title")
+    ax.set_xlabel("x")
+    ax.set_ylabel("y")
+    ax.set_ylim(-1, 50)
+    return fig
+
+
+def test_spec_describes_the_lines_and_labels():
+    fig = _line_figure()
+    spec = FigureSpec.from_figure(fig, "figure.png")
+    plt.close(fig)
+
+    assert len(spec.lines) == 2
+    np.testing.assert_array_equal(spec.lines[0].x, np.arange(10))
+    np.testing.assert_array_equal(spec.lines[0].y, np.arange(10) ** 2)
+    assert spec.lines[0].options["marker"] == "o" and spec.lines[0].options["label"] == "square"
+    assert list(spec.lines[1].x) == [0, 9] and spec.lines[1].options["linewidth"] == 3
+    assert (spec.title, spec.x_label, spec.y_label) == ("title", "x", "y")
+    assert spec.x_lim is None and spec.y_lim == (-1, 50)
+
+
+def test_rendered_spec_matches_savefig(tmp_path):
+    folder = str(tmp_path)
+    fig = _line_figure()
+    spec = PlotUtils.figure_spec(folder, fig, DataType.EDA, postfix="spec")
+    PlotUtils.savefig(folder, fig, DataType.EDA, postfix="savefig")
+    plt.close(fig)
+
+    paths = PlotUtils.render_figures([spec, None], n_workers=1)
+    assert paths == {"EDA_spec": f"{folder}/EDA_spec.png"}
+    np.testing.assert_array_equal(plt.imread(paths["EDA_spec"]), plt.imread(f"{folder}/EDA_savefig.png"))
+
+
+def test_figures_that_cannot_be_described_are_saved_right_away(tmp_path):
+    folder = str(tmp_path)
+    figures = [plt.figure() for _ in range(3)]
+    figures[0].gca().scatter([0, 1], [1, 0], label="scatter")
+    figures[1].subplots(2, 1)[1].plot([0, 1], label="second axes")
+    figures[2].gca().plot([0, 1], label="line")
+    figures[2].suptitle("suptitle")
+
+    for i, fig in enumerate(figures):
+        assert not FigureSpec.can_describe(fig)
+        with pytest.raises(ValueError):
+            FigureSpec.from_figure(fig, "figure.png")
+        assert PlotUtils.figure_spec(folder, fig, DataType.ACC, postfix=str(i)) is None
+        assert os.path.isfile(PlotUtils.figure_path(folder, DataType.ACC, str(i)))
+        plt.close(fig)
+
+
+def test_figures_are_rendered_in_parallel(tmp_path):
+    specs = []
+    for i in range(3):
+        fig = _line_figure()
+        specs.append(PlotUtils.figure_spec(str(tmp_path), fig, DataType.HR_BPM, postfix=str(i)))
+        plt.close(fig)
+    parallel = PlotUtils.render_figures(specs, n_workers=2)
+    assert sorted(parallel) == ["HR_0", "HR_1", "HR_2"]
+    for path in parallel.values():
+        np.testing.assert_array_equal(plt.imread(path), plt.imread(parallel["HR_0"]))
@@ -0,0 +1,66 @@
+import json
+import time
+
+import numpy as np
+
+from empatica import NativeEdaEngine, Profiler
+from empatica.eda_reader import EdaReader
+from empatica.profiler import count, profile
+
+
+def test_stages_are_only_collected_by_the_active_profiler():
+    with profile("ignored"):
+        count("ignored")
+    assert Profiler.active is None
+
+    with Profiler() as profiler:
+        with profile("outer", "folder/file.csv"):
+            with profile("inner", "folder/file.csv"):
+                time.sleep(0.01)
+            with profile("inner", "folder/other.csv"):
+                pass
+        count("items", 2, "folder/file.csv")
+        count("items", 3, "folder/file.csv")
+    assert Profiler.active is None
+
+    assert set(profiler.stages) == {("outer", "file.csv"), ("inner", "file.csv"), ("inner", "other.csv")}
+    assert profiler.stages[("inner", "file.csv")]["time"] >= 0.01
+    assert profiler.stages[("outer", "file.csv")]["time"] >= profiler.stages[("inner", "file.csv")]["time"]
+    assert profiler.per_stage()["inner"]["calls"] == 2
+    assert profiler.counters == {("items", "file.csv"): 5}
+
+    summary = profiler.summary(per_file=True).splitlines()
+    assert summary[1].startswith("outer [file.csv]")
+    assert summary[-1] == "items [file.csv]: 5"
+
+
+def test_memory_of_a_stage_is_tracked():
+    with Profiler(track_memory=True) as profiler:
+        with profile("allocate"):
+            data = np.ones(2**20)  # 8 MiB
+        del data
+    assert profiler.stages[("allocate", "")]["peak_memory"] >= 8 * 2**20
+
+
+def test_loading_stages_are_profiled(data_folder, tmp_path):
+    path = f"{data_folder}01_2022-06-27_Empatica_EDA.csv"
+    with Profiler() as profiler:
+        EdaReader(
+            path,
+            f"{data_folder}timings.xlsx",
+            segment_width=60,
+            reprocess_eda=False,
+            engine=NativeEdaEngine(),
+            incremental=True,
+        )
+
+    for name in ("parse csv", "apply baseline", "load peaks cache", "load activities cache", "find peaks"):
+        assert profiler.stages[(name, "01_2022-06-27_Empatica_EDA.csv")]["calls"] == 1, name
+    assert profiler.counters[("activities processed", "01_2022-06-27_Empatica_EDA.csv")] == 3
+
+    trace_path = str(tmp_path / "trace.json")
+    profiler.save_trace(trace_path)
+    with open(trace_path) as file:
+        trace = json.load(file)
+    assert len(trace["traceEvents"]) == sum(stage["calls"] for stage in profiler.stages.values())
+    assert {"name": "activities reused", "file": "01_2022-06-27_Empatica_EDA.csv", "value": 0} in trace["counters"]
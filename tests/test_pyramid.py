@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+from empatica import Pyramid
+
+
+def _data(n_samples: int) -> np.ndarray:
+    return np.random.default_rng(0).normal(size=(n_samples, 2))
+
+
+@pytest.mark.parametrize("n_samples", (1024, 3001))
+def test_each_block_holds_the_min_max_and_mean_of_its_samples(n_samples):
+    data = _data(n_samples)
+    pyramid = Pyramid.build(data)
+    assert pyramid.n_levels == Pyramid.n_levels_for(n_samples) == int(np.log2(n_samples / Pyramid.min_blocks))
+
+    for k, level in enumerate(pyramid.levels, start=1):
+        size = 2**k
+        assert level.shape == (-(-n_samples // size), 3, 2)
+        for block, first in enumerate(range(0, n_samples, size)):
+            samples = data[first : first + size]
+            np.testing.assert_allclose(level[block], (samples.min(0), samples.max(0), samples.mean(0)))
+
+
+def test_pyramid_built_from_chunks_matches_the_pyramid_of_the_whole_signal(tmp_path):
+    n_samples = 5000
+    data = _data(n_samples)
+    chunk_size = 3 * Pyramid.chunk_multiple(n_samples)
+    chunks = (data[first : first + chunk_size] for first in range(0, n_samples, chunk_size))
+    folder = str(tmp_path / "pyramid")
+    built = Pyramid.build_from_chunks(chunks, n_samples, 2, folder=folder)
+
+    reference = Pyramid.build(data)
+    loaded = Pyramid.load(folder, reference_path=folder)
+    for pyramid in (built, loaded):
+        assert pyramid.n_levels == reference.n_levels
+        for level, reference_level in zip(pyramid.levels, reference.levels):
+            np.testing.assert_allclose(level, reference_level)
+
+
+def test_saved_pyramid_is_only_loaded_if_newer_than_its_source(tmp_path):
+    source = str(tmp_path / "source.csv")
+    with open(source, "w") as file:
+        file.write("")
+    folder = str(tmp_path / "pyramid")
+    Pyramid.build(_data(1024)).save(folder)
+    assert Pyramid.load(folder, source).n_levels == 2
+
+    modified = os.path.getmtime(os.path.join(folder, "levels.txt")) + 1
+    os.utime(source, (modified, modified))
+    assert Pyramid.load(folder, source) is None
+    assert Pyramid.load(str(tmp_path / "missing"), source) is None
+
+
+def test_envelope_of_the_level_of_a_zoom():
+    data = _data(4096)
+    pyramid = Pyramid.build(data)
+    assert pyramid.level_for(100, 200) == 0
+    assert pyramid.level_for(4096, 1000) == 2
+    assert pyramid.level_for(4096, 1) == pyramid.n_levels
+
+    indices, values = pyramid.envelope(2, 10, 30)  # The blocks of 4 samples covering the samples 10 to 29
+    np.testing.assert_array_equal(indices, np.repeat((8, 12, 16, 20, 24, 28), 2))
+    for i, first in enumerate(range(8, 32, 4)):
+        np.testing.assert_allclose(values[2 * i], data[first : first + 4].min(0))
+        np.testing.assert_allclose(values[2 * i + 1], data[first : first + 4].max(0))
@@ -0,0 +1,91 @@
+import io
+import threading
+import time
+
+from empatica import ActivityType, DataType, NativeEdaEngine, ReportWriter, Subjects, TableUtils
+
+
+class _CountingSink(io.StringIO):
+    """In memory sink that counts its writes"""
+
+    def __init__(self):
+        super(_CountingSink, self).__init__()
+        self.n_writes = 0
+
+    def write(self, text: str) -> int:
+        self.n_writes += 1
+        return super(_CountingSink, self).write(text)
+
+
+def test_lines_are_buffered_until_the_buffer_is_full():
+    sink = _CountingSink()
+    report = ReportWriter(sink, buffer_size=10)
+    report.write_line("1234")
+    assert sink.n_writes == 0
+    report.write_line("5678")  # 10 characters with the line breaks
+    assert sink.n_writes == 1 and sink.getvalue() == "1234\n5678\n"
+    report.write("9")
+    report.close()
+    assert sink.n_writes == 2 and sink.getvalue() == "1234\n5678\n9"
+    assert not sink.closed  # The sink is not owned by the report
+
+
+def test_report_written_to_a_file(tmp_path):
+    path = str(tmp_path / "report" / "tables.tex")
+    with ReportWriter.open(path) as report:
+        report.write_line("first")
+        section = report.section()
+        section.write_line("section")
+        report.write_section(section)
+    assert report.sink.closed
+    with open(path) as file:
+        assert file.read() == "first\nsection\n"
+
+
+def test_stdout_is_not_buffered(capsys):
+    report = ReportWriter.stdout()
+    report.write_line("line")
+    assert capsys.readouterr().out == "line\n"
+
+
+def test_sections_are_written_in_order_whatever_their_rendering_time():
+    durations = (0.05, 0.0, 0.02, 0.0)
+    threads = set()
+
+    def render(section: ReportWriter, i: int) -> None:
+        time.sleep(durations[i])
+        threads.add(threading.get_ident())
+        section.write_line(f"section {i}")
+
+    expected = "".join(f"section {i}\n" for i in range(len(durations)))
+    for n_workers in (1, 4):
+        report = ReportWriter()
+        report.render_sections(render, range(len(durations)), n_workers=n_workers)
+        assert report.getvalue() == expected
+    assert len(threads) > 1
+
+
+def test_sections_of_the_subjects_match_their_tables(data_folder):
+    subjects = Subjects(data_folder, eda_engine=NativeEdaEngine(), load_eda=False)
+    subjects.add("01", ["2022-06-27"])
+    subjects.add("02", ["2022-06-28"])
+    activity_types = (ActivityType.BASELINE, ActivityType.Camp)
+
+    report = ReportWriter()
+    subjects.print_sections(report, DataType.EDA, activity_types=activity_types, n_workers=2)
+    text = report.getvalue()
+    assert text.index(r"\section*{Values of subject 01}") < text.index(r"\section*{Values of subject 02}")
+    for subject in subjects:
+        table = ReportWriter()
+        subject.print_table(DataType.EDA, activity_types=activity_types, report=table)
+        assert table.getvalue() in text
+
+
+def test_document_is_written_to_tables_tex(tmp_path):
+    report = TableUtils.print_document_header(str(tmp_path))
+    report.write_line("content")
+    TableUtils.print_document_tail(report)
+    with open(tmp_path / "tables.tex") as file:
+        text = file.read()
+    assert text.startswith(r"\documentclass") and r"\end{document}" in text
+    assert text.index(r"\begin{document}") < text.index("content") < text.index(r"\end{document}")
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from empatica import ActivityType, DataType, NativeEdaEngine, Resampler, Subjects
+
+
+def test_grid_includes_its_last_point_when_it_falls_on_the_grid():
+    np.testing.assert_allclose(Resampler(rate=4).grid(1, 2), (1, 1.25, 1.5, 1.75, 2))
+    np.testing.assert_allclose(Resampler(rate=4).grid(1, 1.9), (1, 1.25, 1.5, 1.75))
+
+
+def test_interpolation_is_nan_outside_of_the_samples_and_in_the_gaps():
+    t = np.array((0.0, 1.0, 2.0, 10.0))
+    data = np.array((0.0, 10.0, 20.0, 100.0))[:, np.newaxis]
+    grid = np.array((-1.0, 0.5, 1.5, 6.0, 9.5, 11.0))
+
+    np.testing.assert_allclose(Resampler.interpolate(t, data, grid)[:, 0], (np.nan, 5, 15, 60, 95, np.nan))
+    resampled = Resampler.interpolate(t, data, grid, max_gap=3)[:, 0]
+    np.testing.assert_allclose(resampled, (np.nan, 5, 15, np.nan, 95, np.nan))
+
+
+def test_mean_averages_the_samples_closest_to_each_grid_point():
+    t = np.arange(16) / 8  # 8 Hz for 2 s
+    data = np.column_stack((np.arange(16.0), -np.arange(16.0)))
+    grid = np.arange(5) / 2  # 2 Hz, the samples are in the bin of the closest grid point
+
+    resampled = Resampler.mean(t, data, grid, rate=2)
+    np.testing.assert_allclose(resampled[:, 0], (0.5, 3.5, 7.5, 11.5, 14.5))
+    np.testing.assert_allclose(resampled[:, 1], -resampled[:, 0])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        Resampler(method="nearest")
+
+
+def test_aligned_signals_share_the_activity_grid(data_folder):
+    subjects = Subjects(data_folder, eda_engine=NativeEdaEngine(), load_eda=False, acc_streaming=True)
+    subjects.add("01", ["2022-06-27"])
+    subject = subjects[0]
+    resampler = Resampler(rate=2)
+    aligned = subject.aligned(0, ActivityType.Camp, (DataType.EDA, DataType.ACC, DataType.HR_IBI), resampler)
+    assert subject.aligned(0, ActivityType.Camp, (DataType.EDA, DataType.ACC, DataType.HR_IBI), resampler) is aligned
+
+    eda = subject.eda[0]
+    first, last = eda.activity_index(ActivityType.Camp)
+    assert aligned.t[0] == pytest.approx(eda.t_data[first], abs=1 / eda.rate)
+    assert aligned.t[-1] == pytest.approx(eda.t_data[last - 1], abs=1 / eda.rate)
+    assert np.all(np.diff(aligned.t) == pytest.approx(0.5))
+    assert aligned.daytime[0] == np.datetime64(eda.initial_t, "us") + np.timedelta64(round(aligned.t[0] * 1e6), "us")
+
+    # The EDA (4 Hz) is averaged on the grid, the streamed ACC (32 Hz) too and the IBI is interpolated
+    for data_type, n_cols in ((DataType.EDA, 1), (DataType.ACC, 3), (DataType.HR_IBI, 1)):
+        assert aligned.signals[data_type].shape == (aligned.t.shape[0], n_cols)
+    expected = Resampler.mean(eda.t_data, eda.actual_data, aligned.t, rate=2)
+    np.testing.assert_allclose(aligned.signals[DataType.EDA], expected)
+    acc = subjects[0].acc[0]
+    acc_t, acc_data = zip(*acc.iter_chunks())
+    expected = Resampler.mean(np.concatenate(acc_t), np.concatenate(acc_data), aligned.t, rate=2)
+    np.testing.assert_allclose(aligned.signals[DataType.ACC], expected)
+    assert np.all(np.isfinite(aligned.signals[DataType.ACC]))
+    ibi = subjects[0].hr_ibi[0]
+    expected = Resampler.interpolate(ibi.t_data, ibi.actual_data, aligned.t, max_gap=resampler.max_gap)
+    np.testing.assert_allclose(aligned.signals[DataType.HR_IBI], expected)
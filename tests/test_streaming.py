@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from empatica import ActivityType
+from empatica.acc_reader import AccReader
+
+
+def _readers(data_folder: str) -> tuple[AccReader, AccReader]:
+    """A streamed and an in memory reader of the same file. The streamed one is built first, so there is no raw cache
+    yet and its chunks are read from the csv file"""
+    path = f"{data_folder}01_2022-06-27_Empatica_ACC.csv"
+    streamed = AccReader(path, f"{data_folder}timings.xlsx", streaming=True)
+    in_memory = AccReader(path, f"{data_folder}timings.xlsx")
+    assert streamed.t_data is None
+    return streamed, in_memory
+
+
+@pytest.mark.parametrize("activity_type", (None, ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR))
+def test_streamed_statistics_match_in_memory_statistics(data_folder, activity_type):
+    streamed, in_memory = _readers(data_folder)
+    assert streamed.n_samples == in_memory.n_samples
+    assert streamed.activity_indices == in_memory.activity_indices
+
+    streamed_statistics = streamed.statistics(activity_type, chunk_size=1000)
+    in_memory_statistics = in_memory.statistics(activity_type)
+    assert streamed_statistics.keys() == in_memory_statistics.keys()
+    for name, value in in_memory_statistics.items():
+        np.testing.assert_allclose(streamed_statistics[name], value, err_msg=name)
+
+
+def test_streamed_window_features_match_in_memory_window_features(data_folder):
+    streamed, in_memory = _readers(data_folder)
+    streamed.default_chunk_size = 1000  # Smaller than a window, so the windows span several chunks
+
+    streamed_features = streamed.window_features(ActivityType.Camp, width=60, step=45)
+    in_memory_features = in_memory.window_features(ActivityType.Camp, width=60, step=45)
+    assert streamed_features.keys() == in_memory_features.keys()
+    assert in_memory_features["t"].size > 0
+    for name, value in in_memory_features.items():
+        np.testing.assert_allclose(streamed_features[name], value, err_msg=name)
+
+
+def test_streamed_data_cannot_be_indexed(data_folder):
+    streamed, _ = _readers(data_folder)
+    with pytest.raises(ValueError):
+        streamed.data(ActivityType.Camp)
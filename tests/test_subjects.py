@@ -0,0 +1,57 @@
+import os
+import shutil
+
+import numpy as np
+
+from empatica import ActivityType, DataType, NativeEdaEngine, Subjects
+from empatica.subject import Subject
+
+
+def _load(folder: str, parallel_load: bool) -> Subjects:
+    subjects = Subjects(folder, parallel_load=parallel_load, n_workers=2, eda_engine=NativeEdaEngine())
+    subjects.add("01", ["2022-06-27", "2022-06-28"])
+    subjects.add("02", ["2022-06-28", "2022-06-29"])
+    for data_type in (DataType.EDA, DataType.HR_BPM, DataType.HR_IBI):
+        subjects.load(data_type)
+    return subjects
+
+
+def test_parallel_load_matches_serial_load(data_folder):
+    # Each load gets its own copy of the files, so the parallel one does not read the caches of the serial one
+    parallel_folder = os.path.join(os.path.dirname(os.path.dirname(data_folder)), "parallel", "")
+    shutil.copytree(data_folder, parallel_folder)
+
+    serial = _load(data_folder, parallel_load=False)
+    with _load(parallel_folder, parallel_load=True) as parallel:
+        for serial_subject, parallel_subject in zip(serial, parallel):
+            for data_type in (DataType.EDA, DataType.HR_BPM, DataType.HR_IBI):
+                for serial_reader, parallel_reader in zip(
+                    serial_subject.data(data_type), parallel_subject.data(data_type)
+                ):
+                    np.testing.assert_allclose(parallel_reader.t_data, serial_reader.t_data)
+                    np.testing.assert_allclose(parallel_reader.actual_data, serial_reader.actual_data)
+                    assert parallel_reader.activity_indices == serial_reader.activity_indices
+
+            for serial_reader, parallel_reader in zip(serial_subject.eda, parallel_subject.eda):
+                for activity_type in (ActivityType.BASELINE, ActivityType.Camp, ActivityType.VR):
+                    assert parallel_reader.metrics(activity_type) == serial_reader.metrics(activity_type)
+    assert parallel._executor is None
+
+
+def test_nothing_is_read_until_the_data_are_used(data_folder):
+    subject = Subject("01", ["2022-06-27"], data_folder, load_eda=False, load_hr_bpm=False, load_hr_ibi=False)
+    assert subject._timings_index is None
+    assert not any(subject.is_loaded(data_type) for data_type in DataType)
+
+    assert subject.hr_bpm[0].subject == "01"
+    assert subject._timings_index is not None
+    assert [data_type for data_type in DataType if subject.is_loaded(data_type)] == [DataType.HR_BPM]
+
+
+def test_eda_and_heart_rate_are_loaded_by_default(data_folder):
+    subject = Subject("01", ["2022-06-27"], data_folder, eda_engine=NativeEdaEngine())
+    assert [data_type for data_type in DataType if subject.is_loaded(data_type)] == [
+        DataType.HR_BPM,
+        DataType.HR_IBI,
+        DataType.EDA,
+    ]
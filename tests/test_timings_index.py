@@ -0,0 +1,53 @@
+import datetime
+import os
+
+from empatica import ActivityType, NativeEdaEngine, Subjects, TimingsIndex, synthetic
+from empatica.empatica_vrcamp_reader import EmpaticaVrCampReader
+
+
+def _write(path: str, start_hour: int) -> None:
+    timings = {
+        (subject, date): {
+            activity: (datetime.time(start_hour + i), datetime.time(start_hour + i, 30))
+            for i, activity in enumerate(EmpaticaVrCampReader.activity_timing_columns)
+        }
+        for subject, date in (("01", "2022-06-27"), ("02", "2022-06-28"))
+    }
+    synthetic.write_timings(path, timings)
+
+
+def test_every_subject_and_date_is_indexed(tmp_path):
+    path = str(tmp_path / "timings.xlsx")
+    _write(path, 8)
+    index = TimingsIndex(path)
+
+    assert set(index.timings) == {("01", "2022-06-27"), ("02", "2022-06-28")}
+    names = [name for names in EmpaticaVrCampReader.activity_timing_columns.values() for name in names]
+    values = index.get("02", "2022-06-28")
+    assert list(values) == names
+    assert values[names[0]] == datetime.time(8) and values[names[1]] == datetime.time(8, 30)
+    assert index.get("01", "2022-06-28") == {}
+
+
+def test_a_file_is_parsed_again_only_when_it_changes(tmp_path):
+    path = str(tmp_path / "timings.xlsx")
+    _write(path, 8)
+    index = TimingsIndex.from_file(path)
+    assert TimingsIndex.from_file(path) is index
+
+    _write(path, 9)
+    modified = os.path.getmtime(path) + 1
+    os.utime(path, (modified, modified))
+    changed = TimingsIndex.from_file(path)
+    assert changed is not index
+    assert list(changed.get("01", "2022-06-27").values())[0] == datetime.time(9)
+
+
+def test_readers_get_the_timings_of_their_subject_and_date(data_folder):
+    subjects = Subjects(data_folder, eda_engine=NativeEdaEngine(), load_eda=False)
+    subjects.add("01", ["2022-06-27"])
+    reader = subjects[0].eda[0]
+    index = TimingsIndex.from_file(f"{data_folder}timings.xlsx")
+    start, end = reader.timings[ActivityType.Camp]
+    names = EmpaticaVrCampReader.activity_timing_columns[ActivityType.Camp]
+    assert (start, end) == tuple(index.get("01", "2022-06-27")[name] for name in names)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from empatica.window_features import interbeat_statistics, sliding_windows, window_statistics
+
+
+def test_sliding_windows_are_views_of_the_data():
+    data = np.arange(20.0).reshape(10, 2)
+    windows = sliding_windows(data, 4, 3)
+    assert windows.shape == (3, 2, 4)
+    np.testing.assert_array_equal(windows[1, 0], (6, 8, 10, 12))
+    np.testing.assert_array_equal(windows[2, 1], (13, 15, 17, 19))
+    assert np.shares_memory(windows, data)
+    assert sliding_windows(data, 11, 1).shape == (0, 2, 11)
+
+
+def test_window_statistics():
+    windows = sliding_windows(np.array((1.0, 3.0, 2.0, 6.0, 4.0))[:, np.newaxis], 3, 2)
+    statistics = window_statistics(windows)
+    np.testing.assert_allclose(statistics["mean"], ((2.0,), (4.0,)))
+    np.testing.assert_allclose(statistics["std"], ((np.sqrt(2 / 3),), (np.sqrt(8 / 3),)))
+    np.testing.assert_allclose(statistics["min"], ((1.0,), (2.0,)))
+    np.testing.assert_allclose(statistics["max"], ((3.0,), (6.0,)))
+
+
+def _beats(n_beats: int, ibi_std: float, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Beats around one second apart, one beat out of ten missing"""
+    ibi = 1 + np.random.default_rng(seed).normal(scale=ibi_std, size=n_beats)
+    t = np.cumsum(ibi)
+    kept = np.arange(n_beats) % 10 != 5
+    return t[kept], ibi[kept]
+
+
+@pytest.mark.parametrize("ibi_std", (0.05, 1e-6))
+def test_interbeat_statistics_match_the_statistics_of_each_window(ibi_std):
+    t, ibi = _beats(500, ibi_std)
+    starts = np.arange(t[0], t[-1], 20.0)
+    statistics = interbeat_statistics(t, ibi, starts, width=60)
+
+    for i, start in enumerate(starts):
+        in_window = (t >= start) & (t < start + 60)
+        beats = ibi[in_window]
+        assert statistics["n_beats"][i] == beats.size
+        assert statistics["mean"][i] == pytest.approx(np.mean(beats))
+        if beats.size < 2:
+            assert np.isnan(statistics["sdnn"][i])
+            continue
+        # The intervals around one second are not cancelled out, even when they barely vary
+        assert statistics["sdnn"][i] == pytest.approx(np.std(beats), rel=1e-6)
+
+        # Only the differences between consecutive beats (no missing beat in between) are used
+        indices = np.flatnonzero(in_window)
+        consecutive = np.abs(np.diff(t[indices]) - ibi[indices[1:]]) <= 0.05
+        assert statistics["rmssd"][i] == pytest.approx(np.sqrt(np.mean(np.diff(beats)[consecutive] ** 2)), rel=1e-6)
+
+
+def test_interbeat_statistics_of_empty_windows():
+    t, ibi = _beats(50, 0.05)
+    statistics = interbeat_statistics(t, ibi, np.array((t[-1] + 10, t[0] - 1)), width=1.5)
+    np.testing.assert_array_equal(statistics["n_beats"], (0, 1))
+    assert np.all(np.isnan(statistics["sdnn"]))
+    assert np.isnan(statistics["mean"][0]) and statistics["mean"][1] == ibi[0]